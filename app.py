@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -29,4 +30,6 @@ def main() -> int:
 
 
 if __name__ == "__main__":
+    # Batch export uses a process pool; required for frozen (PyInstaller) builds.
+    multiprocessing.freeze_support()
     raise SystemExit(main())
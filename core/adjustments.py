@@ -2,6 +2,38 @@ from __future__ import annotations
 
 import numpy as np
 
+# Parameters this close to their neutral value are treated as neutral, by
+# every path alike.
+_IDENTITY_TOL = 1e-6
+
+
+def _is_neutral(value: float, neutral: float = 1.0) -> bool:
+    return abs(value - neutral) <= _IDENTITY_TOL
+
+
+def _channel_lut(brightness: float, contrast: float, shift: float, gamma: float) -> np.ndarray:
+    # Per-channel tone curve: brightness -> contrast -> temperature shift -> gamma,
+    # evaluated once for all 256 input levels.
+    v = np.arange(256, dtype=np.float32)
+    v *= brightness
+    v = (v - 127.5) * contrast + 127.5
+    if shift != 0.0:
+        v += shift
+    v = np.clip(v, 0.0, 255.0)
+    if not _is_neutral(gamma):
+        v = np.power(v / 255.0, 1.0 / gamma) * 255.0
+    return np.clip(v, 0.0, 255.0).astype(np.uint8)
+
+
+_GAMMA_LUT_STEPS = 16
+
+
+def _gamma_lut(gamma: float) -> np.ndarray:
+    # Sampled at 1/16 of a level so dark tones keep their precision.
+    v = np.arange(255 * _GAMMA_LUT_STEPS + 1, dtype=np.float32) / float(255 * _GAMMA_LUT_STEPS)
+    v = np.power(v, 1.0 / gamma) * 255.0
+    return np.clip(v, 0.0, 255.0).astype(np.uint8)
+
 
 def apply_adjustments_rgba(
     rgba: np.ndarray,
@@ -11,28 +43,54 @@ def apply_adjustments_rgba(
     gamma: float = 1.0,
     vibrance: float = 1.0,
     temperature: int = 0,
+    out: np.ndarray | None = None,
 ) -> np.ndarray:
+    # `out` may be `rgba` itself to adjust in place; every read of the input
+    # happens before the matching channel is written.
     if rgba.dtype != np.uint8 or rgba.ndim != 3 or rgba.shape[2] != 4:
         raise ValueError("rgba must be HxWx4 uint8")
 
-    out = rgba.astype(np.float32).copy()
-    rgb = out[..., :3]
+    b = float(max(0.1, brightness))
+    c = float(max(0.1, contrast))
+    s = float(max(0.0, saturation))
+    v = float(max(0.0, vibrance))
+    g = float(max(0.1, gamma))
+    t = int(max(-100, min(100, int(temperature))))
+    shift = float(t) * 1.25
+
+    if _is_neutral(b) and _is_neutral(c) and _is_neutral(s) and _is_neutral(g) and _is_neutral(v) and t == 0:
+        # Identity: hand the input back untouched (no copy).
+        if out is None or out is rgba:
+            return rgba
+        np.copyto(out, rgba)
+        return out
 
-    # Brightness
-    rgb *= float(max(0.1, brightness))
+    if out is None:
+        out = rgba.copy()
+    elif out is not rgba:
+        np.copyto(out, rgba)
 
-    # Contrast around mid-gray
-    c = float(max(0.1, contrast))
-    rgb = (rgb - 127.5) * c + 127.5
+    # Brightness, contrast, temperature and gamma are per-channel functions of
+    # the 8-bit input, so without saturation/vibrance they fold into one LUT each.
+    if _is_neutral(s) and _is_neutral(v):
+        for ch, ch_shift in enumerate((shift, 0.0, -shift)):
+            lut = _channel_lut(b, c, ch_shift, g)
+            out[..., ch] = lut[rgba[..., ch]]
+        return out
+
+    # Brightness + contrast (shared affine curve, looked up instead of recomputed)
+    base = np.arange(256, dtype=np.float32)
+    base *= b
+    base = (base - 127.5) * c + 127.5
+    rgb = base[rgba[..., :3]]
 
     # Saturation
-    s = float(max(0.0, saturation))
     luma = rgb[..., 0] * 0.299 + rgb[..., 1] * 0.587 + rgb[..., 2] * 0.114
-    rgb = luma[..., None] + (rgb - luma[..., None]) * s
+    if not _is_neutral(s):
+        rgb = luma[..., None] + (rgb - luma[..., None]) * s
 
     # Vibrance (boost lower-saturation areas more than already saturated areas)
-    v = float(max(0.0, vibrance))
-    if abs(v - 1.0) > 1e-6:
+    if not _is_neutral(v):
         maxc = np.max(rgb, axis=2)
         minc = np.min(rgb, axis=2)
         sat = np.clip((maxc - minc) / 255.0, 0.0, 1.0)
@@ -40,16 +98,15 @@ def apply_adjustments_rgba(
         rgb = luma[..., None] + (rgb - luma[..., None]) * (1.0 + amt[..., None])
 
     # White balance temperature (simple warm/cool shift)
-    t = int(max(-100, min(100, int(temperature))))
     if t != 0:
-        shift = float(t) * 1.25
         rgb[..., 0] += shift
         rgb[..., 2] -= shift
 
-    # Gamma
-    g = float(max(0.1, gamma))
-    rgb = np.clip(rgb, 0.0, 255.0) / 255.0
-    rgb = np.power(rgb, 1.0 / g) * 255.0
-
-    out[..., :3] = np.clip(rgb, 0.0, 255.0)
-    return out.astype(np.uint8)
+    np.clip(rgb, 0.0, 255.0, out=rgb)
+    if _is_neutral(g):
+        out[..., :3] = rgb
+    else:
+        # Gamma on the quantized result via LUT instead of a full-image np.power
+        rgb *= float(_GAMMA_LUT_STEPS)
+        out[..., :3] = _gamma_lut(g)[np.rint(rgb).astype(np.uint16)]
+    return out
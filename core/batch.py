@@ -1,12 +1,25 @@
 from __future__ import annotations
 
+import multiprocessing as mp
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Iterable
 
+from PIL import Image
+
 from core.compositor import composite_to_canvas
 from core.io import load_image_rgba, save_image
 from core.state import ProjectState
 
+# Below this many files the pool startup cost outweighs the parallel speedup.
+_MIN_PARALLEL_FILES = 5
+# Decoded inputs / rendered outputs allowed in flight in the pipelined serial path
+# (default; OPM_PREFETCH overrides within the bounds below).
+_MAX_INFLIGHT = 4
+_PREFETCH_BOUNDS = (2, 5)
+
 
 def iter_images(folder: str) -> Iterable[Path]:
     exts = {".png", ".jpg", ".jpeg", ".bmp", ".webp", ".tif", ".tiff"}
@@ -16,46 +29,109 @@ def iter_images(folder: str) -> Iterable[Path]:
             yield p
 
 
+def _render_with_state(src_img: Image.Image, state: ProjectState) -> Image.Image:
+    return composite_to_canvas(
+        src_rgba_pil=src_img,
+        out_size=(state.out_w, state.out_h),
+        img_scale=state.img_scale,
+        img_offset=(state.img_off_x, state.img_off_y),
+        rotation_deg=state.rotation_deg,
+        palette_rgbs=state.enabled_palette_rgbs(),
+        tolerance=state.tolerance,
+        opacity=state.opacity,
+        color_key_mode=state.color_key_mode,
+        hsv_h_tol=state.hsv_h_tol,
+        hsv_s_tol=state.hsv_s_tol,
+        hsv_v_tol=state.hsv_v_tol,
+        mask_grow_shrink=state.mask_grow_shrink,
+        mask_feather_radius=state.mask_feather_radius,
+        remove_islands_min_size=state.remove_islands_min_size,
+        high_quality=state.high_quality_resample,
+        nearest_neighbor=state.nearest_neighbor,
+        brightness=state.brightness,
+        contrast=state.contrast,
+        saturation=state.saturation,
+        gamma=state.gamma,
+        selection_enabled=state.selection_enabled,
+        selection_invert=state.selection_invert,
+        selection_rect=(state.sel_x, state.sel_y, state.sel_w, state.sel_h),
+    )
+
+
+def _export_one(job: tuple[Path, Path, ProjectState]) -> None:
+    # Top-level so it can be pickled into pool workers.
+    src_path, out_path, state = job
+    src_img = load_image_rgba(str(src_path))
+    save_image(str(out_path), _render_with_state(src_img, state))
+
+
+def _export_pipelined(jobs: list[tuple[Path, Path, ProjectState]], depth: int = _MAX_INFLIGHT) -> None:
+    # Decode ahead and encode behind on I/O threads so disk work overlaps compositing.
+    with ThreadPoolExecutor(max_workers=2) as io_pool:
+        pending = iter(jobs)
+        reads: deque = deque()
+        writes: deque = deque()
+        for job in pending:
+            reads.append((job, io_pool.submit(load_image_rgba, str(job[0]))))
+            if len(reads) >= depth:
+                break
+        while reads:
+            (_, out_path, state), loaded = reads.popleft()
+            nxt = next(pending, None)
+            if nxt is not None:
+                reads.append((nxt, io_pool.submit(load_image_rgba, str(nxt[0]))))
+            rendered = _render_with_state(loaded.result(), state)
+            writes.append(io_pool.submit(save_image, str(out_path), rendered))
+            while len(writes) > depth:
+                writes.popleft().result()
+        for fut in writes:
+            fut.result()
+
+
+def _worker_count(n_files: int) -> int:
+    env = os.environ.get("OPM_WORKERS", "").strip()
+    try:
+        workers = int(env) if env else (os.cpu_count() or 1)
+    except ValueError:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, n_files))
+
+
+def _prefetch_depth(depth: int | None) -> int:
+    if depth is None:
+        env = os.environ.get("OPM_PREFETCH", "").strip()
+        try:
+            depth = int(env) if env else _MAX_INFLIGHT
+        except ValueError:
+            depth = _MAX_INFLIGHT
+    lo, hi = _PREFETCH_BOUNDS
+    return max(lo, min(hi, int(depth)))
+
+
 def batch_export_with_state(
     input_dir: str,
     output_dir: str,
     state: ProjectState,
     suffix: str = "_opm",
     ext: str = ".png",
+    prefetch_depth: int | None = None,
 ) -> int:
     out_root = Path(output_dir)
     out_root.mkdir(parents=True, exist_ok=True)
 
+    jobs = [
+        (src_path, out_root / f"{src_path.stem}{suffix}{ext}", state)
+        for src_path in iter_images(input_dir)
+    ]
+    workers = _worker_count(len(jobs))
+    if len(jobs) < _MIN_PARALLEL_FILES or workers <= 1:
+        _export_pipelined(jobs, _prefetch_depth(prefetch_depth))
+        return len(jobs)
+
     count = 0
-    for src_path in iter_images(input_dir):
-        src_img = load_image_rgba(str(src_path))
-        out_img = composite_to_canvas(
-            src_rgba_pil=src_img,
-            out_size=(state.out_w, state.out_h),
-            img_scale=state.img_scale,
-            img_offset=(state.img_off_x, state.img_off_y),
-            rotation_deg=state.rotation_deg,
-            palette_rgbs=state.enabled_palette_rgbs(),
-            tolerance=state.tolerance,
-            opacity=state.opacity,
-            color_key_mode=state.color_key_mode,
-            hsv_h_tol=state.hsv_h_tol,
-            hsv_s_tol=state.hsv_s_tol,
-            hsv_v_tol=state.hsv_v_tol,
-            mask_grow_shrink=state.mask_grow_shrink,
-            mask_feather_radius=state.mask_feather_radius,
-            remove_islands_min_size=state.remove_islands_min_size,
-            high_quality=state.high_quality_resample,
-            nearest_neighbor=state.nearest_neighbor,
-            brightness=state.brightness,
-            contrast=state.contrast,
-            saturation=state.saturation,
-            gamma=state.gamma,
-            selection_enabled=state.selection_enabled,
-            selection_invert=state.selection_invert,
-            selection_rect=(state.sel_x, state.sel_y, state.sel_w, state.sel_h),
-        )
-        out_name = f"{src_path.stem}{suffix}{ext}"
-        save_image(str(out_root / out_name), out_img)
-        count += 1
+    # Spawn, not fork: the caller may be the GUI, whose render thread can hold
+    # the compositor's cache locks at fork time, and children must not inherit Qt.
+    with mp.get_context("spawn").Pool(processes=workers) as pool:
+        for _ in pool.imap_unordered(_export_one, jobs, chunksize=4):
+            count += 1
     return count
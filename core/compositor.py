@@ -1,6 +1,9 @@
 from __future__ import annotations
+import math
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Sequence
 import numpy as np
 from PIL import Image
 
@@ -10,7 +13,9 @@ from core.adjustments import apply_adjustments_rgba
 
 
 def pil_to_np_rgba(img: Image.Image) -> np.ndarray:
-    arr = np.array(img.convert("RGBA"), dtype=np.uint8)
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    arr = np.array(img, dtype=np.uint8)
     if arr.ndim != 3 or arr.shape[2] != 4:
         raise ValueError("Expected RGBA image")
     return arr
@@ -27,7 +32,7 @@ class LayerRenderInput:
     blend_mode: str = "normal"
     img_scale: float = 1.0
     img_offset: Tuple[float, float] = (0.0, 0.0)
-    palette_rgbs: Optional[List[Tuple[int, int, int]]] = None
+    palette_rgbs: Optional[Sequence[Tuple[int, int, int]]] = None
     tolerance: int = 30
     opacity: float = 1.0
     rotation_deg: int = 0
@@ -51,11 +56,74 @@ class LayerRenderInput:
     alpha_paint_mask: Optional[np.ndarray] = None
 
 
-def _process_layer_rgba(layer: LayerRenderInput) -> Optional[np.ndarray]:
-    if (not layer.visible) or layer.src_rgba_pil is None:
-        return None
+def _scale_alpha(alpha: np.ndarray, paint_mask: Optional[np.ndarray], opacity: float) -> np.ndarray:
+    # Paint mask and layer opacity are both alpha multipliers; apply them in one pass.
+    if paint_mask is None and opacity >= 1.0:
+        return alpha
+    a = alpha.astype(np.float32)
+    if paint_mask is not None:
+        a *= paint_mask.astype(np.float32) * (1.0 / 255.0)
+    if opacity < 1.0:
+        a *= opacity
+    return np.clip(a, 0, 255).astype(np.uint8)
+
+
+# Final layer alpha (key, selection, refinement, paint mask and opacity) from
+# recent renders. Color-grade tweaks change none of those inputs, so they skip
+# straight to the adjustment pass. Entries pin the source image and masks so
+# their ids stay valid.
+_ALPHA_CACHE_SIZE = 4
+_alpha_cache: "OrderedDict[tuple, tuple[tuple, np.ndarray]]" = OrderedDict()
+_alpha_cache_lock = threading.Lock()
+
+
+def _alpha_cache_key(layer: LayerRenderInput) -> Optional[tuple]:
+    # Images are never edited in place; masks only count as stable once frozen
+    # (the editor freezes any mask it shares with its history).
+    for m in (layer.selection_mask, layer.alpha_paint_mask):
+        if m is not None and m.flags.writeable:
+            return None
+    return (
+        id(layer.src_rgba_pil),
+        id(layer.selection_mask),
+        id(layer.alpha_paint_mask),
+        tuple(map(tuple, layer.palette_rgbs or ())),
+        int(layer.tolerance),
+        layer.color_key_mode,
+        int(layer.hsv_h_tol),
+        int(layer.hsv_s_tol),
+        int(layer.hsv_v_tol),
+        bool(layer.selection_enabled),
+        bool(layer.selection_invert),
+        layer.selection_rect,
+        int(layer.mask_grow_shrink),
+        int(layer.mask_feather_radius),
+        int(layer.remove_islands_min_size),
+        float(layer.opacity),
+    )
 
-    src_np = pil_to_np_rgba(layer.src_rgba_pil)
+
+def _layer_alpha(layer: LayerRenderInput, src_np: np.ndarray) -> np.ndarray:
+    key = _alpha_cache_key(layer)
+    if key is not None:
+        with _alpha_cache_lock:
+            cached = _alpha_cache.get(key)
+            if cached is not None:
+                _alpha_cache.move_to_end(key)
+                return cached[1]
+
+    alpha = _compute_layer_alpha(layer, src_np)
+    if key is not None:
+        alpha.flags.writeable = False
+        pinned = (layer.src_rgba_pil, layer.selection_mask, layer.alpha_paint_mask)
+        with _alpha_cache_lock:
+            _alpha_cache[key] = (pinned, alpha)
+            if len(_alpha_cache) > _ALPHA_CACHE_SIZE:
+                _alpha_cache.popitem(last=False)
+    return alpha
+
+
+def _compute_layer_alpha(layer: LayerRenderInput, src_np: np.ndarray) -> np.ndarray:
     remove_mask = build_color_key_remove_mask(
         src_np,
         layer.palette_rgbs or [],
@@ -67,9 +135,17 @@ def _process_layer_rgba(layer: LayerRenderInput) -> Optional[np.ndarray]:
     )
 
     if layer.selection_enabled:
-        sel: Optional[np.ndarray] = None
+        # Restrict the remove mask to the selection in place; no full-size
+        # selection buffer is built for rectangles.
         if layer.selection_mask is not None and layer.selection_mask.shape == remove_mask.shape:
-            sel = layer.selection_mask.astype(bool)
+            sel = layer.selection_mask
+            if sel.dtype != bool:
+                sel = sel.astype(bool)
+            if layer.selection_invert:
+                # a & ~b on bools is a > b; no inverted copy of the selection.
+                np.greater(remove_mask, sel, out=remove_mask)
+            else:
+                remove_mask &= sel
         elif layer.selection_rect is not None:
             sx, sy, sw, sh = layer.selection_rect
             h, w = remove_mask.shape
@@ -77,27 +153,43 @@ def _process_layer_rgba(layer: LayerRenderInput) -> Optional[np.ndarray]:
             y0 = max(0, int(sy))
             x1 = min(w, int(sx + sw))
             y1 = min(h, int(sy + sh))
-            sel = np.zeros_like(remove_mask, dtype=bool)
             if x1 > x0 and y1 > y0:
-                sel[y0:y1, x0:x1] = True
-        if sel is not None:
-            if layer.selection_invert:
-                sel = ~sel
-            remove_mask &= sel
-
-    src_np = src_np.copy()
-    src_np[..., 3] = refine_alpha_mask(
-        src_np[..., 3],
-        remove_mask,
-        grow_shrink=int(layer.mask_grow_shrink),
-        feather_radius=int(layer.mask_feather_radius),
-        remove_islands_min_size=int(layer.remove_islands_min_size),
-    )
+                if layer.selection_invert:
+                    remove_mask[y0:y1, x0:x1] = False
+                else:
+                    remove_mask[:y0] = False
+                    remove_mask[y1:] = False
+                    remove_mask[y0:y1, :x0] = False
+                    remove_mask[y0:y1, x1:] = False
+            elif not layer.selection_invert:
+                remove_mask[:] = False
+
+    if layer.mask_grow_shrink or layer.mask_feather_radius or layer.remove_islands_min_size:
+        alpha = refine_alpha_mask(
+            src_np[..., 3],
+            remove_mask,
+            grow_shrink=int(layer.mask_grow_shrink),
+            feather_radius=int(layer.mask_feather_radius),
+            remove_islands_min_size=int(layer.remove_islands_min_size),
+        )
+    else:
+        # Plain color key: no refinement pass, just knock out the keyed pixels.
+        alpha = np.where(remove_mask, np.uint8(0), src_np[..., 3])
+
+    paint = layer.alpha_paint_mask
+    if paint is not None and paint.shape != alpha.shape:
+        paint = None
+    return _scale_alpha(alpha, paint, float(layer.opacity))
+
+
+def _process_layer_rgba(layer: LayerRenderInput) -> Optional[np.ndarray]:
+    if (not layer.visible) or layer.src_rgba_pil is None:
+        return None
 
-    if layer.alpha_paint_mask is not None and layer.alpha_paint_mask.shape == src_np[..., 3].shape:
-        paint_a = layer.alpha_paint_mask.astype(np.float32) / 255.0
-        src_np[..., 3] = np.clip(src_np[..., 3].astype(np.float32) * paint_a, 0, 255).astype(np.uint8)
+    src_np = pil_to_np_rgba(layer.src_rgba_pil)
+    alpha = _layer_alpha(layer, src_np)
 
+    # src_np is our own copy of the source pixels, so adjust it in place.
     src_np = apply_adjustments_rgba(
         src_np,
         brightness=float(layer.brightness),
@@ -106,49 +198,150 @@ def _process_layer_rgba(layer: LayerRenderInput) -> Optional[np.ndarray]:
         gamma=float(layer.gamma),
         vibrance=float(layer.vibrance),
         temperature=int(layer.temperature),
+        out=src_np,
     )
+    src_np[..., 3] = alpha
+    return src_np
 
-    if layer.opacity < 1.0:
-        a = src_np[..., 3].astype(np.float32)
-        src_np[..., 3] = np.clip(a * float(layer.opacity), 0, 255).astype(np.uint8)
 
-    return src_np
+def _blend_multiply(base_rgb: np.ndarray, top_rgb: np.ndarray) -> np.ndarray:
+    out = base_rgb * top_rgb
+    out += 127
+    out //= 255
+    return out
 
 
-def _blend(base: np.ndarray, top: np.ndarray, mode: str) -> np.ndarray:
-    base_rgb = base[..., :3].astype(np.float32) / 255.0
-    top_rgb = top[..., :3].astype(np.float32) / 255.0
-    base_a = base[..., 3:4].astype(np.float32) / 255.0
-    top_a = top[..., 3:4].astype(np.float32) / 255.0
+def _blend_screen(base_rgb: np.ndarray, top_rgb: np.ndarray) -> np.ndarray:
+    out = (255 - base_rgb) * (255 - top_rgb)
+    out += 127
+    out //= 255
+    np.subtract(255, out, out=out)
+    return out
+
+
+def _blend_overlay(base_rgb: np.ndarray, top_rgb: np.ndarray) -> np.ndarray:
+    out = base_rgb * top_rgb
+    out *= 2
+    out += 127
+    out //= 255
+    hi = (255 - base_rgb) * (255 - top_rgb)
+    hi *= 2
+    hi += 127
+    hi //= 255
+    np.subtract(255, hi, out=hi)
+    np.copyto(out, hi, where=base_rgb > 127)
+    return out
+
+
+_BLEND_FUNCS = {
+    "multiply": _blend_multiply,
+    "screen": _blend_screen,
+    "overlay": _blend_overlay,
+}
 
-    mode = (mode or "normal").lower()
-    if mode == "multiply":
-        blend_rgb = base_rgb * top_rgb
-    elif mode == "screen":
-        blend_rgb = 1.0 - (1.0 - base_rgb) * (1.0 - top_rgb)
-    elif mode == "overlay":
-        blend_rgb = np.where(base_rgb <= 0.5, 2.0 * base_rgb * top_rgb, 1.0 - 2.0 * (1.0 - base_rgb) * (1.0 - top_rgb))
-    else:
-        blend_rgb = top_rgb
 
-    out_a = top_a + base_a * (1.0 - top_a)
-    premul_top = blend_rgb * top_a
-    premul_base = base_rgb * base_a
-    out_premul = premul_top + premul_base * (1.0 - top_a)
-    out_rgb = np.where(out_a > 0, out_premul / np.maximum(out_a, 1e-6), 0.0)
+def _blend(base: np.ndarray, top: np.ndarray, mode: str, out: Optional[np.ndarray] = None) -> np.ndarray:
+    # Blend colors in uint16 (every product of two 8-bit values fits), then
+    # composite the blended color over base like a normal layer.
+    blend_fn = _BLEND_FUNCS.get((mode or "normal").lower())
+    src = top.copy()
+    if blend_fn is not None:
+        src[..., :3] = blend_fn(base[..., :3].astype(np.uint16), top[..., :3].astype(np.uint16))
 
-    out = np.empty_like(base)
-    out[..., :3] = np.clip(out_rgb * 255.0, 0, 255).astype(np.uint8)
-    out[..., 3] = np.clip(out_a[..., 0] * 255.0, 0, 255).astype(np.uint8)
+    if out is None:
+        out = base.copy()
+    elif out is not base:
+        np.copyto(out, base)
+    _alpha_over_inplace(out, src)
     return out
 
 
+def _alpha_over_inplace(dst: np.ndarray, src: np.ndarray) -> None:
+    # Normal-mode "over" in integer fixed point (alpha kept scaled by 255), written into dst.
+    sa = src[..., 3:4].astype(np.uint32)
+    w_dst = dst[..., 3:4].astype(np.uint32)
+    w_dst *= 255 - sa
+    w_src = sa * 255
+    out_a255 = w_src + w_dst
+
+    rgb = src[..., :3] * w_src
+    rgb += dst[..., :3] * w_dst
+    rgb += out_a255 >> 1
+    # Fully transparent results already sum to 0 and are left untouched.
+    np.floor_divide(rgb, out_a255, out=rgb, where=out_a255 > 0)
+
+    dst[..., :3] = rgb
+    dst[..., 3] = (out_a255[..., 0] + 127) // 255
+
+
+def _rotate_and_scale(
+    img: Image.Image,
+    rot: int,
+    scale: float,
+    resample: Image.Resampling,
+    reducing_gap: Optional[float] = None,
+) -> Image.Image:
+    if rot % 90 == 0 or scale < 1.0:
+        # Right angles are lossless transposes; downscales need resize()'s antialiasing.
+        if rot != 0:
+            img = img.rotate(-rot, expand=True, resample=Image.Resampling.BICUBIC)
+        new_w = max(1, int(round(img.width * scale)))
+        new_h = max(1, int(round(img.height * scale)))
+        if reducing_gap is not None and img.mode == "RGBA" and resample != Image.Resampling.NEAREST:
+            # Image.resize premultiplies RGBA itself but then drops reducing_gap;
+            # premultiply here so the integer pre-reduction actually applies.
+            img = img.convert("RGBa").resize((new_w, new_h), resample=resample, reducing_gap=reducing_gap)
+            return img.convert("RGBA")
+        return img.resize((new_w, new_h), resample=resample)
+
+    # Arbitrary angle: rotate + scale in a single affine resampling pass.
+    # Output size matches rotate(expand=True) followed by resize().
+    w, h = img.size
+    angle = math.radians(rot)
+    cos_a = round(math.cos(angle), 15)
+    sin_a = round(math.sin(angle), 15)
+    # Same corner math as PIL's rotate(expand=True), including its centering translation.
+    tx = w * 0.5 - (cos_a * w * 0.5 + sin_a * h * 0.5)
+    ty = h * 0.5 - (-sin_a * w * 0.5 + cos_a * h * 0.5)
+    corners = ((0, 0), (w, 0), (w, h), (0, h))
+    xs = [cos_a * x + sin_a * y + tx for x, y in corners]
+    ys = [-sin_a * x + cos_a * y + ty for x, y in corners]
+    rot_w = math.ceil(max(xs)) - math.floor(min(xs))
+    rot_h = math.ceil(max(ys)) - math.floor(min(ys))
+    new_w = max(1, int(round(rot_w * scale)))
+    new_h = max(1, int(round(rot_h * scale)))
+
+    # Destination -> source: undo the resize ratio, then apply PIL's expanded rotate matrix.
+    sx = new_w / float(rot_w)
+    sy = new_h / float(rot_h)
+    c = cos_a * -(rot_w - w) * 0.5 + sin_a * -(rot_h - h) * 0.5 + tx
+    f = -sin_a * -(rot_w - w) * 0.5 + cos_a * -(rot_h - h) * 0.5 + ty
+    a, b = cos_a / sx, sin_a / sy
+    d, e = -sin_a / sx, cos_a / sy
+    affine_resample = Image.Resampling.NEAREST if resample == Image.Resampling.NEAREST else Image.Resampling.BICUBIC
+    return img.transform((new_w, new_h), Image.Transform.AFFINE, (a, b, c, d, e, f), resample=affine_resample)
+
+
 def composite_layers_to_canvas(
     layers: List[LayerRenderInput],
     out_size: Tuple[int, int],
     high_quality: bool = True,
     nearest_neighbor: bool = False,
 ) -> Image.Image:
+    return np_rgba_to_pil(composite_layers_to_array(layers, out_size, high_quality, nearest_neighbor))
+
+
+def composite_layers_to_array(
+    layers: List[LayerRenderInput],
+    out_size: Tuple[int, int],
+    high_quality: bool = True,
+    nearest_neighbor: bool = False,
+    reducing_gap: Optional[float] = None,
+) -> np.ndarray:
+    # Same as composite_layers_to_canvas, but hands back the HxWx4 uint8 canvas
+    # so callers can wrap it without another copy. `reducing_gap` is passed to
+    # Image.resize: large downscales first shrink by an integer factor (the
+    # thumbnail() shortcut); fine for previews, left off for exports.
     out_w, out_h = out_size
     base = np.zeros((out_h, out_w, 4), dtype=np.uint8)
 
@@ -157,20 +350,16 @@ def composite_layers_to_canvas(
     else:
         resample = Image.Resampling.LANCZOS if high_quality else Image.Resampling.BILINEAR
 
+    # Until the first layer lands, the canvas is all zeros and "over" is a plain copy.
+    canvas_empty = True
     for layer in layers:
         layer_np = _process_layer_rgba(layer)
         if layer_np is None:
             continue
         layer_img = np_rgba_to_pil(layer_np)
-
-        rot = int(layer.rotation_deg) % 360
-        if rot != 0:
-            layer_img = layer_img.rotate(-rot, expand=True, resample=Image.Resampling.BICUBIC)
-
         scale = max(0.01, float(layer.img_scale))
-        new_w = max(1, int(round(layer_img.width * scale)))
-        new_h = max(1, int(round(layer_img.height * scale)))
-        scaled = layer_img.resize((new_w, new_h), resample=resample)
+        scaled = _rotate_and_scale(layer_img, int(layer.rotation_deg) % 360, scale, resample, reducing_gap)
+        new_w, new_h = scaled.size
 
         off_x, off_y = layer.img_offset
         cx = out_w * 0.5
@@ -178,7 +367,6 @@ def composite_layers_to_canvas(
         x = int(round(cx - new_w * 0.5 + off_x))
         y = int(round(cy - new_h * 0.5 + off_y))
 
-        tile = np.zeros_like(base)
         arr = pil_to_np_rgba(scaled)
         x0 = max(0, x)
         y0 = max(0, y)
@@ -191,10 +379,24 @@ def composite_layers_to_canvas(
         sy0 = y0 - y
         sx1 = sx0 + (x1 - x0)
         sy1 = sy0 + (y1 - y0)
-        tile[y0:y1, x0:x1] = arr[sy0:sy1, sx0:sx1]
-        base = _blend(base, tile, layer.blend_mode)
-
-    return np_rgba_to_pil(base)
+        # Only the layer's footprint changes; blend that region of the canvas in place.
+        base_region = base[y0:y1, x0:x1]
+        top_region = arr[sy0:sy1, sx0:sx1]
+        mode = (layer.blend_mode or "normal").lower()
+        top_alpha = top_region[..., 3]
+        if mode in _BLEND_FUNCS:
+            _blend(base_region, top_region, mode, out=base_region)
+        elif canvas_empty:
+            np.copyto(base_region, top_region)
+            base_region[top_alpha == 0] = 0
+        elif top_alpha[0, 0] == 255 and top_alpha[-1, -1] == 255 and bool((top_alpha == 255).all()):
+            # Corner probe first: keyed or rotated layers usually fail it without a full scan.
+            np.copyto(base_region, top_region)
+        else:
+            _alpha_over_inplace(base_region, top_region)
+        canvas_empty = False
+
+    return base
 
 
 def composite_to_canvas(
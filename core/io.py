@@ -1,9 +1,80 @@
 from __future__ import annotations
+import os
+from pathlib import Path
+
+import numpy as np
 from PIL import Image
 
+# Optional faster decoders, only used when OPM_FAST_DECODE=1.
+try:
+    import pyvips
+except ImportError:  # pragma: no cover - optional dependency
+    pyvips = None
+
+try:
+    from turbojpeg import TJPF_RGBA, TurboJPEG
+except ImportError:  # pragma: no cover - optional dependency
+    TurboJPEG = None
+
+_turbo_jpeg = None
+
+
+def _fast_decode_enabled() -> bool:
+    return os.environ.get("OPM_FAST_DECODE", "").strip() == "1"
+
+
+def _load_jpeg_turbo(path: str) -> Image.Image | None:
+    global _turbo_jpeg
+    if TurboJPEG is None:
+        return None
+    try:
+        if _turbo_jpeg is None:
+            _turbo_jpeg = TurboJPEG()
+        with open(path, "rb") as f:
+            arr = _turbo_jpeg.decode(f.read(), pixel_format=TJPF_RGBA)
+    except Exception:
+        return None
+    return Image.fromarray(np.ascontiguousarray(arr), "RGBA")
+
+
+def _load_vips(path: str) -> Image.Image | None:
+    if pyvips is None:
+        return None
+    try:
+        im = pyvips.Image.new_from_file(path, access="sequential")
+        if im.format != "uchar":
+            return None  # leave 16-bit / float images to PIL's conversion rules
+        if im.interpretation not in ("srgb", "rgb", "b-w"):
+            return None  # CMYK, Lab, multiband: 4 bands here are not RGBA; PIL converts them
+        if im.bands < 3:
+            im = im.colourspace("srgb")
+        if im.bands == 3:
+            im = im.addalpha()
+        if im.bands != 4:
+            return None
+        arr = im.numpy()
+    except Exception:
+        return None
+    return Image.fromarray(np.ascontiguousarray(arr), "RGBA")
+
+
 def load_image_rgba(path: str) -> Image.Image:
+    if _fast_decode_enabled():
+        fast = None
+        if Path(path).suffix.lower() in (".jpg", ".jpeg"):
+            fast = _load_jpeg_turbo(path)
+        if fast is None:
+            fast = _load_vips(path)
+        if fast is not None:
+            return fast
+
     img = Image.open(path)
     # Convert to RGBA for consistent alpha work
+    if img.mode == "RGBA" and not getattr(img, "is_animated", False):
+        # convert() to the same mode is a full copy; load() decodes and closes
+        # the file for single-frame images.
+        img.load()
+        return img
     return img.convert("RGBA")
 
 def save_image(path: str, img_rgba: Image.Image) -> None:
@@ -1,6 +1,19 @@
 from __future__ import annotations
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 import numpy as np
-from typing import List, Tuple
+from typing import Sequence, Tuple
+
+# Recently built remove masks, packed to one bit per pixel. Batch frames and
+# re-renders of an unchanged layer hit this instead of re-keying every pixel.
+_MASK_CACHE_SIZE = 64
+# 3 * (tol + 1)^2 must fit in uint16 for the narrow RGB distance path.
+_NARROW_TOL_LIMIT = 147
+_mask_cache: "OrderedDict[tuple, tuple[np.ndarray, int, int]]" = OrderedDict()
+# Previews may composite on a worker thread while the UI thread renders too.
+_mask_cache_lock = threading.Lock()
 
 def _rgb_to_hsv_image(rgb_u8: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     rgb = rgb_u8.astype(np.float32) / 255.0
@@ -12,19 +25,26 @@ def _rgb_to_hsv_image(rgb_u8: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.nd
     cmin = np.minimum(np.minimum(r, g), b)
     delta = cmax - cmin
 
-    h = np.zeros_like(cmax, dtype=np.float32)
     nz = delta > 1e-8
-
-    m = nz & (cmax == r)
-    h[m] = (60.0 * ((g[m] - b[m]) / delta[m])) % 360.0
-    m = nz & (cmax == g)
-    h[m] = 60.0 * (((b[m] - r[m]) / delta[m]) + 2.0)
-    m = nz & (cmax == b)
-    h[m] = 60.0 * (((r[m] - g[m]) / delta[m]) + 4.0)
+    delta_safe = np.where(nz, delta, np.float32(1.0))
+
+    # All three hue candidates are computed densely and picked with one select;
+    # on ties blue wins over green over red, as before.
+    h_r = np.divide(g - b, delta_safe)
+    h_r *= 60.0
+    h_r %= 360.0
+    h_g = np.divide(b - r, delta_safe)
+    h_g += 2.0
+    h_g *= 60.0
+    h_b = np.divide(r - g, delta_safe)
+    h_b += 4.0
+    h_b *= 60.0
+    h = np.select([cmax == b, cmax == g], [h_b, h_g], default=h_r)
+    h[~nz] = 0.0
 
     s = np.zeros_like(cmax, dtype=np.float32)
-    nz_v = cmax > 1e-8
-    s[nz_v] = (delta[nz_v] / cmax[nz_v]) * 255.0
+    np.divide(delta, cmax, out=s, where=cmax > 1e-8)
+    s *= 255.0
     v = cmax * 255.0
     return h, s, v
 
@@ -52,9 +72,24 @@ def _rgb_to_hsv_single(rgb: Tuple[int, int, int]) -> tuple[float, float, float]:
     return h, s, v
 
 
+def _palette_array(palette_rgbs: Sequence[Tuple[int, int, int]]) -> np.ndarray:
+    # Distinct key colors as a sorted (N, 3) array: duplicates cost a full image
+    # pass each, and neither order nor repeats change the union of hits.
+    return _palette_array_cached(tuple(map(tuple, palette_rgbs)))
+
+
+@lru_cache(maxsize=32)
+def _palette_array_cached(palette_rgbs: Tuple[Tuple[int, ...], ...]) -> np.ndarray:
+    # The palette only changes on user edits, so every frame after the first
+    # reuses the same array. Shared between callers, hence read-only.
+    palette = np.unique(np.asarray(palette_rgbs, dtype=np.int16).reshape(-1, 3), axis=0)
+    palette.flags.writeable = False
+    return palette
+
+
 def build_color_key_remove_mask(
     rgba: np.ndarray,
-    palette_rgbs: List[Tuple[int, int, int]],
+    palette_rgbs: Sequence[Tuple[int, int, int]],
     tolerance: int,
     mode: str = "rgb",
     hsv_h_tol: int = 12,
@@ -68,6 +103,48 @@ def build_color_key_remove_mask(
         return np.zeros((rgba.shape[0], rgba.shape[1]), dtype=bool)
 
     mode_norm = mode.strip().lower()
+    if mode_norm != "hsv" and tolerance <= 0:
+        return np.zeros((rgba.shape[0], rgba.shape[1]), dtype=bool)
+
+    palette = _palette_array(palette_rgbs)
+    key = (
+        # A 128-bit digest, not a checksum: a collision would silently hand
+        # back another image's mask.
+        hashlib.blake2b(np.ascontiguousarray(rgba), digest_size=16).digest(),
+        rgba.shape,
+        palette.tobytes(),
+        int(tolerance),
+        mode_norm,
+        int(hsv_h_tol),
+        int(hsv_s_tol),
+        int(hsv_v_tol),
+    )
+    with _mask_cache_lock:
+        cached = _mask_cache.get(key)
+        if cached is not None:
+            _mask_cache.move_to_end(key)
+    if cached is not None:
+        bits, h, w = cached
+        return np.unpackbits(bits, count=h * w).reshape(h, w).astype(bool)
+
+    remove = _compute_remove_mask(rgba, palette, tolerance, mode_norm, hsv_h_tol, hsv_s_tol, hsv_v_tol)
+    packed = np.packbits(remove)
+    with _mask_cache_lock:
+        _mask_cache[key] = (packed, remove.shape[0], remove.shape[1])
+        if len(_mask_cache) > _MASK_CACHE_SIZE:
+            _mask_cache.popitem(last=False)
+    return remove
+
+
+def _compute_remove_mask(
+    rgba: np.ndarray,
+    palette: np.ndarray,
+    tolerance: int,
+    mode_norm: str,
+    hsv_h_tol: int,
+    hsv_s_tol: int,
+    hsv_v_tol: int,
+) -> np.ndarray:
     if mode_norm == "hsv":
         h_img, s_img, v_img = _rgb_to_hsv_image(rgba[..., :3])
         h_tol = float(max(0, min(180, int(hsv_h_tol))))
@@ -75,7 +152,7 @@ def build_color_key_remove_mask(
         v_tol = float(max(0, min(255, int(hsv_v_tol))))
 
         remove = np.zeros((rgba.shape[0], rgba.shape[1]), dtype=bool)
-        for rgb in palette_rgbs:
+        for rgb in palette.tolist():
             h0, s0, v0 = _rgb_to_hsv_single(rgb)
             dh = np.abs(h_img - h0)
             dh = np.minimum(dh, 360.0 - dh)  # circular hue distance
@@ -85,25 +162,40 @@ def build_color_key_remove_mask(
         return remove
 
     # default: RGB euclidean
-    if tolerance <= 0:
-        return np.zeros((rgba.shape[0], rgba.shape[1]), dtype=bool)
-    rgb = rgba[..., :3].astype(np.int32)
-    tol2 = int(tolerance) * int(tolerance)
-    remove = np.zeros((rgba.shape[0], rgba.shape[1]), dtype=bool)
-
-    for (R, G, B) in palette_rgbs:
-        dr = rgb[..., 0] - int(R)
-        dg = rgb[..., 1] - int(G)
-        db = rgb[..., 2] - int(B)
-        d2 = dr * dr + dg * dg + db * db
-        remove |= (d2 <= tol2)
+    h, w = rgba.shape[0], rgba.shape[1]
+    # Contiguous per-channel planes; channel differences fit in int16.
+    planes = [rgba[..., c].astype(np.int16) for c in range(3)]
+    tol = int(tolerance)
+    tol2 = tol * tol
+    # For small tolerances, clamping |diff| to tol + 1 cannot change the
+    # comparison and keeps the squared sum within uint16; otherwise use int32.
+    narrow = tol < _NARROW_TOL_LIMIT
+    sq_dtype = np.uint16 if narrow else np.int32
+    remove = np.zeros((h, w), dtype=bool)
+
+    diff = np.empty((h, w), dtype=np.int16)
+    sq = np.empty((h, w), dtype=sq_dtype)
+    d2 = np.empty((h, w), dtype=sq_dtype)
+    hit = np.empty((h, w), dtype=bool)
+    for rgb in palette.tolist():
+        for c, plane in enumerate(planes):
+            np.subtract(plane, int(rgb[c]), out=diff)
+            if narrow:
+                np.abs(diff, out=diff)
+                np.minimum(diff, tol + 1, out=diff)
+            dst = d2 if c == 0 else sq
+            np.multiply(diff, diff, out=dst, dtype=sq_dtype, casting="unsafe")
+            if c != 0:
+                d2 += sq
+        np.less_equal(d2, tol2, out=hit)
+        remove |= hit
 
     return remove
 
 
 def apply_color_key_alpha(
     rgba: np.ndarray,
-    palette_rgbs: List[Tuple[int, int, int]],
+    palette_rgbs: Sequence[Tuple[int, int, int]],
     tolerance: int,
     mode: str = "rgb",
     hsv_h_tol: int = 12,
@@ -1,17 +1,35 @@
 from __future__ import annotations
 
-from collections import deque
+from bisect import bisect_right
+from typing import Iterable
 
 import numpy as np
 from PIL import Image, ImageFilter
 
+try:
+    from scipy import ndimage
+except ImportError:  # optional: faster connected components / morphology
+    ndimage = None
+
+_FOUR_CONNECTED = np.array([[0, 1, 0], [1, 1, 1], [0, 1, 0]], dtype=bool)
+
 
 def _morph_mask(mask: np.ndarray, steps: int) -> np.ndarray:
     if steps == 0:
         return mask
 
-    img = Image.fromarray(mask.astype(np.uint8) * 255, mode="L")
     count = abs(int(steps))
+    if ndimage is not None:
+        # `count` 3x3 steps (PIL's Max/MinFilter(3) neighbourhood) are one
+        # (2*count+1) square, which separates into a 1-D max/min per axis, so
+        # the cost no longer grows with the radius. Edge replication matches PIL.
+        size = 2 * count + 1
+        rank_filter = ndimage.maximum_filter1d if steps > 0 else ndimage.minimum_filter1d
+        out = rank_filter(mask.view(np.uint8), size, axis=0, mode="nearest")
+        rank_filter(out, size, axis=1, output=out, mode="nearest")
+        return out.view(bool)
+
+    img = Image.fromarray(mask.astype(np.uint8) * 255, mode="L")
     if steps > 0:
         for _ in range(count):
             img = img.filter(ImageFilter.MaxFilter(3))
@@ -21,42 +39,89 @@ def _morph_mask(mask: np.ndarray, steps: int) -> np.ndarray:
     return np.array(img, dtype=np.uint8) > 127
 
 
+def _mask_runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, list[int]]:
+    # Horizontal runs of True pixels in row-major order: (row, start, end-exclusive),
+    # plus the index of each row's first run (row_first[y]..row_first[y + 1]).
+    edges = np.diff(mask.astype(np.int8), axis=1, prepend=0, append=0)
+    rows, starts = np.nonzero(edges == 1)
+    ends = np.nonzero(edges == -1)[1]
+    row_first = np.searchsorted(rows, np.arange(mask.shape[0] + 1)).tolist()
+    return rows, starts, ends, row_first
+
+
+def _label_run_components(
+    rows: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    row_first: list[int],
+    seeds: Iterable[int],
+) -> np.ndarray:
+    # 4-connected component label per run, numbered in seed order; runs not
+    # reachable from any seed get -1. Runs touch when they overlap in adjacent rows.
+    row_l = rows.tolist()
+    start_l = starts.tolist()
+    end_l = ends.tolist()
+    last_row = len(row_first) - 2
+    labels = [-1] * len(start_l)
+    count = 0
+    for seed in seeds:
+        if labels[seed] >= 0:
+            continue
+        labels[seed] = count
+        stack = [seed]
+        while stack:
+            k = stack.pop()
+            y = row_l[k]
+            s, e = start_l[k], end_l[k]
+            for ny in (y - 1, y + 1):
+                if ny < 0 or ny > last_row:
+                    continue
+                last = row_first[ny + 1]
+                j = bisect_right(end_l, s, row_first[ny], last)
+                while j < last and start_l[j] < e:
+                    if labels[j] < 0:
+                        labels[j] = count
+                        stack.append(j)
+                    j += 1
+        count += 1
+    return np.array(labels, dtype=np.int64)
+
+
+def _paint_runs(
+    shape: tuple[int, int],
+    rows: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    keep: np.ndarray,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    h, w = shape
+    acc = np.zeros((h, w + 1), dtype=np.int32)
+    np.add.at(acc, (rows[keep], starts[keep]), 1)
+    np.add.at(acc, (rows[keep], ends[keep]), -1)
+    return np.greater(np.cumsum(acc[:, :w], axis=1), 0, out=out)
+
+
 def _remove_small_opaque_islands(alpha: np.ndarray, min_size: int) -> np.ndarray:
     if min_size <= 0:
         return alpha
 
-    h, w = alpha.shape
-    opaque = alpha > 0
-    visited = np.zeros((h, w), dtype=bool)
+    if ndimage is not None:
+        labels, _ = ndimage.label(alpha > 0, structure=_FOUR_CONNECTED)
+        sizes = np.bincount(labels.ravel())
+        small = sizes < min_size
+        small[0] = False
+        out = alpha.copy()
+        out[small[labels]] = 0
+        return out
+
+    # Fallback: label 4-connected components over horizontal runs rather than pixels.
+    rows, starts, ends, row_first = _mask_runs(alpha > 0)
+    labels = _label_run_components(rows, starts, ends, row_first, range(len(starts)))
+    sizes = np.bincount(labels, weights=ends - starts)
+    small = _paint_runs(alpha.shape, rows, starts, ends, sizes[labels] < min_size)
     out = alpha.copy()
-    dirs = ((1, 0), (-1, 0), (0, 1), (0, -1))
-
-    for y in range(h):
-        for x in range(w):
-            if not opaque[y, x] or visited[y, x]:
-                continue
-
-            q: deque[tuple[int, int]] = deque()
-            comp: list[tuple[int, int]] = []
-            q.append((y, x))
-            visited[y, x] = True
-
-            while q:
-                cy, cx = q.popleft()
-                comp.append((cy, cx))
-                for dy, dx in dirs:
-                    ny, nx = cy + dy, cx + dx
-                    if ny < 0 or nx < 0 or ny >= h or nx >= w:
-                        continue
-                    if visited[ny, nx] or not opaque[ny, nx]:
-                        continue
-                    visited[ny, nx] = True
-                    q.append((ny, nx))
-
-            if len(comp) < min_size:
-                for cy, cx in comp:
-                    out[cy, cx] = 0
-
+    out[small] = 0
     return out
 
 
@@ -1,32 +1,136 @@
 from __future__ import annotations
 
+import base64
+import hashlib
 import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import IO, Callable
 
 from core.state import PaletteColor, ProjectState, LayerState, BrushPreset
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
-PROJECT_VERSION = 2
+try:
+    import simdjson
+except ImportError:  # pragma: no cover - optional dependency
+    simdjson = None
 
+# Reused across loads; parse(recursive=True) returns plain Python objects, so
+# nothing keeps referencing the parser's buffer after a load returns.
+_PARSER = simdjson.Parser() if simdjson is not None else None
 
-def _normalize_src_for_save(src_path: str | None, project_file: Path) -> str | None:
+
+# v3: paint masks are stored as content-named PNG sidecars instead of inline.
+PROJECT_VERSION = 3
+# Up to this many layers, save serially; a thread pool costs more than it saves.
+_SERIAL_LAYER_LIMIT = 2
+
+
+def _json_default(obj: object) -> object:
+    # NumPy scalars (values read back out of image arrays) end up in state;
+    # every one of them converts to the matching Python scalar via .item().
+    item = getattr(obj, "item", None)
+    if callable(item):
+        return item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_payload(payload: dict, compact: bool = False) -> bytes:
+    # compact=True emits single-line JSON, skipping the indenting encoder path.
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(payload, default=_json_default, option=option)
+    if compact:
+        return json.dumps(payload, separators=(",", ":"), default=_json_default).encode("utf-8")
+    return json.dumps(payload, indent=2, default=_json_default).encode("utf-8")
+
+
+# Encoded layer subtrees from the last save, keyed by layer identity and
+# validated against the layer's current raw dict (unchanged alpha mask strings
+# compare by identity, so the check is cheap).
+_LAYER_CACHE: dict[int, tuple[dict, bool, bytes]] = {}
+_LAYERS_PLACEHOLDER = "__opm_layers__"
+# Layer objects sit three levels deep: payload -> state -> layers -> item.
+_LAYER_INDENT = b"\n      "
+
+
+def _encode_layers(raw_layers: list[tuple[int, dict]], compact: bool = False) -> bytes:
+    cache: dict[int, tuple[dict, bool, bytes]] = {}
+    chunks: list[bytes] = []
+    for key, raw in raw_layers:
+        cached = _LAYER_CACHE.get(key)
+        if cached is not None and cached[1] == compact and cached[0] == raw:
+            encoded = cached[2]
+        elif compact:
+            encoded = _dumps_payload(raw, compact=True)
+        else:
+            # JSON strings never hold raw newlines, so re-indenting is a plain replace.
+            encoded = _dumps_payload(raw).replace(b"\n", _LAYER_INDENT)
+        cache[key] = (raw, compact, encoded)
+        chunks.append(encoded)
+    _LAYER_CACHE.clear()
+    _LAYER_CACHE.update(cache)
+    if not chunks:
+        return b"[]"
+    if compact:
+        return b"[" + b",".join(chunks) + b"]"
+    return b"[" + _LAYER_INDENT + (b"," + _LAYER_INDENT).join(chunks) + b"\n    ]"
+
+
+def _write_atomic(project_file: Path, data: bytes) -> None:
+    # Write next to the target and swap it in, so a failed save never leaves a
+    # truncated project behind.
+    tmp = project_file.with_name(project_file.name + ".tmp")
+    try:
+        # The payload is fully serialized up front, so this is a single
+        # unbuffered write; a buffered writer would only add a copy.
+        with open(tmp, "wb", buffering=0) as f:
+            view = memoryview(data)
+            while view:
+                view = view[f.write(view):]
+        os.replace(tmp, project_file)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _loads_payload(data: bytes) -> dict:
+    if _PARSER is not None:
+        return _PARSER.parse(data, recursive=True)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def _normalize_src_for_save(src_path: str | None, base_dir: Path) -> str | None:
+    # base_dir: the project file's directory, already resolved by the caller.
     if not src_path:
         return None
     try:
         src = Path(src_path).resolve()
-        base = project_file.parent.resolve()
-        return str(src.relative_to(base))
+        return str(src.relative_to(base_dir))
     except Exception:
         return src_path
 
 
-def _normalize_src_for_load(src_path: str | None, project_file: Path) -> str | None:
+def _normalize_src_for_load(src_path: str | None, base_dir: Path) -> str | None:
     if not src_path:
         return None
     p = Path(src_path)
     if p.is_absolute():
         return str(p)
-    return str((project_file.parent / p).resolve())
+    return str((base_dir / p).resolve())
 
 
 def _palette_from_raw(raw_palette: list[dict]) -> list[PaletteColor]:
@@ -84,10 +188,63 @@ def _preset_from_raw(raw: dict, idx: int) -> BrushPreset:
     )
 
 
-def _layer_to_raw(layer: LayerState, project_file: Path) -> dict:
+def _read_layer_mask(idx: int, layer: LayerState) -> bytes | None:
+    # The PNG bytes of a layer's paint mask, inline or from its current sidecar.
+    if layer.alpha_paint_mask_data:
+        return base64.b64decode(layer.alpha_paint_mask_data.encode("ascii"))
+    if layer.alpha_paint_mask_path:
+        try:
+            return Path(layer.alpha_paint_mask_path).read_bytes()
+        except OSError as exc:
+            raise OSError(f"cannot read paint mask of layer {idx + 1} ({layer.alpha_paint_mask_path}): {exc}") from exc
+    return None
+
+
+def _mask_sidecar_name(project_name: str, data: bytes) -> str:
+    # Named by content, so no save can overwrite a file another layer still
+    # has to read, whatever the layer order. The full project file name keeps
+    # foo.opm and foo.json in one folder from sharing sidecars.
+    return f"{project_name}_mask_{hashlib.blake2b(data, digest_size=8).hexdigest()}.png"
+
+
+def _sidecar_refs(project_file: Path) -> set[str]:
+    # Sidecars the project file currently on disk references. Only these may be
+    # removed by the next save; anything else in the folder is not ours.
+    try:
+        state_raw = _loads_payload(project_file.read_bytes()).get("state", {})
+        layers_raw = state_raw.get("layers")
+    except (OSError, ValueError, AttributeError):
+        return set()
+    pattern = re.compile(re.escape(project_file.name) + r"_mask_[0-9a-f]{16}\.png")
+    refs: set[str] = set()
+    for raw in layers_raw if isinstance(layers_raw, list) else []:
+        ref = raw.get("alpha_paint_mask_path") if isinstance(raw, dict) else None
+        if isinstance(ref, str) and pattern.fullmatch(ref):
+            refs.add(ref)
+    return refs
+
+
+def _write_mask_sidecar(data: bytes, target: Path) -> None:
+    # Paint masks live in PNG files beside the project instead of as base64 in
+    # the JSON. A content-named file that already exists holds these bytes.
+    if not target.exists():
+        _write_atomic(target, data)
+
+
+def _remove_stale_sidecars(base_dir: Path, stale: set[str]) -> None:
+    # Sidecars the previous save wrote that the file just written no longer
+    # references (deleted layers, erased or repainted masks).
+    for name in stale:
+        try:
+            (base_dir / name).unlink()
+        except OSError:
+            pass
+
+
+def _layer_to_raw(layer: LayerState, base_dir: Path, mask_ref: str | None = None) -> dict:
     return {
         "name": layer.name,
-        "src_path": _normalize_src_for_save(layer.src_path, project_file),
+        "src_path": _normalize_src_for_save(layer.src_path, base_dir),
         "visible": bool(layer.visible),
         "blend_mode": layer.blend_mode,
         "img_scale": layer.img_scale,
@@ -110,14 +267,14 @@ def _layer_to_raw(layer: LayerState, project_file: Path) -> dict:
         "gamma": layer.gamma,
         "vibrance": layer.vibrance,
         "temperature": layer.temperature,
-        "alpha_paint_mask_data": layer.alpha_paint_mask_data,
+        "alpha_paint_mask_path": mask_ref,
     }
 
 
-def _layer_from_raw(state_raw: dict, project_file: Path, idx: int) -> LayerState:
+def _layer_from_raw(state_raw: dict, base_dir: Path, idx: int) -> LayerState:
     return LayerState(
         name=str(state_raw.get("name", f"Layer {idx + 1}")),
-        src_path=_normalize_src_for_load(state_raw.get("src_path"), project_file),
+        src_path=_normalize_src_for_load(state_raw.get("src_path"), base_dir),
         visible=bool(state_raw.get("visible", True)),
         blend_mode=str(state_raw.get("blend_mode", "normal")).lower(),
         img_scale=float(state_raw.get("img_scale", 1.0)),
@@ -140,13 +297,41 @@ def _layer_from_raw(state_raw: dict, project_file: Path, idx: int) -> LayerState
         gamma=float(state_raw.get("gamma", 1.0)),
         vibrance=float(state_raw.get("vibrance", 1.0)),
         temperature=int(state_raw.get("temperature", 0)),
+        # Projects saved before sidecar masks carry the PNG inline as base64.
         alpha_paint_mask_data=state_raw.get("alpha_paint_mask_data"),
+        alpha_paint_mask_path=_normalize_src_for_load(state_raw.get("alpha_paint_mask_path"), base_dir),
     )
 
 
-def save_project(path: str, state: ProjectState) -> None:
+def save_project(path: str, state: ProjectState, compact: bool = False) -> None:
+    # compact=True is meant for machine-written snapshots (autosave, crash
+    # recovery); user-facing saves stay indented so they diff well.
     project_file = Path(path)
+    base_dir = project_file.parent.resolve()
     legacy = state.active_layer()
+    # Every mask is read before any sidecar is written: a layer's current
+    # sidecar may be the file another layer's mask is about to be saved to.
+    masks = [_read_layer_mask(idx, layer) for idx, layer in enumerate(state.layers)]
+    mask_refs = [None if data is None else _mask_sidecar_name(project_file.name, data) for data in masks]
+    previous_refs = _sidecar_refs(project_file)
+    # Written serially, once per name: layers with identical masks share a
+    # sidecar and must not race on its temporary file.
+    for mask_ref, data in dict(zip(mask_refs, masks)).items():
+        if mask_ref is not None:
+            _write_mask_sidecar(data, base_dir / mask_ref)
+
+    def layer_entry(idx: int, layer: LayerState) -> tuple[int, dict]:
+        return (id(layer), _layer_to_raw(layer, base_dir, mask_refs[idx]))
+
+    if len(state.layers) <= _SERIAL_LAYER_LIMIT:
+        raw_layers = [layer_entry(idx, layer) for idx, layer in enumerate(state.layers)]
+    else:
+        # Path resolution is I/O bound; overlap it. The pool never touches sidecars.
+        with ThreadPoolExecutor(max_workers=min(8, len(state.layers))) as pool:
+            raw_layers = list(pool.map(layer_entry, range(len(state.layers)), state.layers))
+    # The entry serialized for the active layer object itself, so the legacy
+    # fields never depend on active_layer_index being in range.
+    legacy_raw = next(raw for key, raw in raw_layers if key == id(legacy))
     payload = {
         "version": PROJECT_VERSION,
         "state": {
@@ -161,13 +346,13 @@ def save_project(path: str, state: ProjectState) -> None:
             "sel_y": state.sel_y,
             "sel_w": state.sel_w,
             "sel_h": state.sel_h,
-            "layers": [_layer_to_raw(layer, project_file) for layer in state.layers],
+            "layers": _LAYERS_PLACEHOLDER,
             "active_layer_index": int(state.active_layer_index),
             "brush_engine_version": int(state.brush_engine_version),
             "active_brush_id": state.active_brush_id,
             "custom_brush_presets": [_preset_to_raw(p) for p in state.custom_brush_presets],
             # legacy active layer fields for downgrade compatibility
-            "src_path": _normalize_src_for_save(legacy.src_path, project_file),
+            "src_path": legacy_raw["src_path"],
             "img_scale": legacy.img_scale,
             "img_off_x": legacy.img_off_x,
             "img_off_y": legacy.img_off_y,
@@ -190,22 +375,13 @@ def save_project(path: str, state: ProjectState) -> None:
             "temperature": legacy.temperature,
         },
     }
-    project_file.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-
-
-def load_project(path: str) -> ProjectState:
-    project_file = Path(path)
-    raw = json.loads(project_file.read_text(encoding="utf-8"))
-    state_raw = raw.get("state", {})
+    layers = _encode_layers(raw_layers, compact)
+    data = _dumps_payload(payload, compact).replace(f'"{_LAYERS_PLACEHOLDER}"'.encode("utf-8"), layers, 1)
+    _write_atomic(project_file, data)
+    _remove_stale_sidecars(base_dir, previous_refs.difference(mask_refs))
 
-    layers_raw = state_raw.get("layers")
-    layers: list[LayerState]
-    if isinstance(layers_raw, list) and layers_raw:
-        layers = [_layer_from_raw(item, project_file, idx) for idx, item in enumerate(layers_raw)]
-    else:
-        # Backward-compatible migration from single-layer schema
-        layers = [_layer_from_raw(state_raw, project_file, 0)]
 
+def _state_from_raw(state_raw: dict, layers: list[LayerState]) -> ProjectState:
     presets_raw = state_raw.get("custom_brush_presets", [])
     custom_presets: list[BrushPreset] = []
     if isinstance(presets_raw, list):
@@ -233,3 +409,42 @@ def load_project(path: str) -> ProjectState:
     )
     state._ensure_layers()
     return state
+
+
+def _load_v1(state_raw: dict, base_dir: Path) -> ProjectState:
+    # Single-layer schema: the layer fields sit directly on the state.
+    return _state_from_raw(state_raw, [_layer_from_raw(state_raw, base_dir, 0)])
+
+
+def _load_v2(state_raw: dict, base_dir: Path) -> ProjectState:
+    layers_raw = state_raw.get("layers")
+    if not (isinstance(layers_raw, list) and layers_raw):
+        return _load_v1(state_raw, base_dir)
+    layers = [_layer_from_raw(item, base_dir, idx) for idx, item in enumerate(layers_raw)]
+    return _state_from_raw(state_raw, layers)
+
+
+# Files without a "version" or with an unknown (newer) one get the latest
+# loader, which still reads the single-layer schema when "layers" is absent.
+_LOADERS: dict[int, Callable[[dict, Path], ProjectState]] = {
+    1: _load_v1,
+    2: _load_v2,
+    3: _load_v2,
+}
+
+
+def load_project(path: str | IO[bytes]) -> ProjectState:
+    # A binary file object is read in memory; its relative paths resolve
+    # against the working directory since there is no project file location.
+    if hasattr(path, "read"):
+        base_dir = Path.cwd()
+        raw = _loads_payload(path.read())
+    else:
+        project_file = Path(path)
+        base_dir = project_file.parent.resolve()
+        raw = _loads_payload(project_file.read_bytes())
+    try:
+        version = int(raw.get("version", PROJECT_VERSION))
+    except (TypeError, ValueError):
+        version = PROJECT_VERSION
+    return _LOADERS.get(version, _load_v2)(raw.get("state", {}), base_dir)
@@ -1,20 +1,40 @@
 from __future__ import annotations
 
-from collections import deque
+from bisect import bisect_right
+from dataclasses import dataclass
 from typing import Optional, Tuple
 
 import numpy as np
 from PIL import Image, ImageDraw
 
+from core.mask_color_key import _NARROW_TOL_LIMIT
+from core.mask_ops import _label_run_components, _mask_runs, _paint_runs
+
+try:
+    from scipy import ndimage
+except ImportError:  # optional: faster contiguous magic wand
+    ndimage = None
+
+_FOUR_CONNECTED = np.array([[0, 1, 0], [1, 1, 1], [0, 1, 0]], dtype=bool)
+
 
 def _distance_mask(rgb: np.ndarray, ref: Tuple[int, int, int], tolerance: int) -> np.ndarray:
-    tol2 = int(tolerance) * int(tolerance)
-    r, g, b = int(ref[0]), int(ref[1]), int(ref[2])
-    arr = rgb.astype(np.int32)
-    dr = arr[..., 0] - r
-    dg = arr[..., 1] - g
-    db = arr[..., 2] - b
-    d2 = dr * dr + dg * dg + db * db
+    tol = int(tolerance)
+    tol2 = tol * tol
+    # Channel differences fit in int16. As in the color key, small tolerances
+    # clamp |diff| to tol + 1 so the squared sum fits uint16 (half the traffic).
+    narrow = tol < _NARROW_TOL_LIMIT
+    sq_dtype = np.uint16 if narrow else np.int32
+    d2 = np.zeros(rgb.shape[:2], dtype=sq_dtype)
+    sq = np.empty(rgb.shape[:2], dtype=sq_dtype)
+    diff = np.empty(rgb.shape[:2], dtype=np.int16)
+    for c in range(3):
+        np.subtract(rgb[..., c], int(ref[c]), out=diff, dtype=np.int16)
+        if narrow:
+            np.abs(diff, out=diff)
+            np.minimum(diff, tol + 1, out=diff)
+        np.multiply(diff, diff, out=sq, dtype=sq_dtype, casting="unsafe")
+        d2 += sq
     return d2 <= tol2
 
 
@@ -27,6 +47,17 @@ def color_range_mask(rgb: np.ndarray, seed_xy: Tuple[int, int], tolerance: int)
     return _distance_mask(rgb, ref, tolerance)
 
 
+def _scanline_fill(ok: np.ndarray, x0: int, y0: int) -> np.ndarray:
+    # 4-connected flood fill from (x0, y0) over `ok`, walking horizontal runs
+    # instead of pixels. `ok` is consumed: the filled region is written back
+    # into it once its runs have been extracted.
+    ok[y0, x0] = True  # the seed itself is always selected
+    rows, starts, ends, row_first = _mask_runs(ok)
+    seed = bisect_right(starts.tolist(), x0, row_first[y0], row_first[y0 + 1]) - 1
+    labels = _label_run_components(rows, starts, ends, row_first, (seed,))
+    return _paint_runs(ok.shape, rows, starts, ends, labels == 0, out=ok)
+
+
 def magic_wand_mask(
     rgb: np.ndarray,
     seed_xy: Tuple[int, int],
@@ -44,34 +75,25 @@ def magic_wand_mask(
     ref = tuple(int(v) for v in rgb[y0, x0, :3])
     dist_ok = _distance_mask(rgb, ref, tolerance)
 
-    out = np.zeros((h, w), dtype=bool)
-    q: deque[tuple[int, int]] = deque()
-    q.append((x0, y0))
-    out[y0, x0] = True
-    dirs = ((1, 0), (-1, 0), (0, 1), (0, -1))
-
-    while q:
-        cx, cy = q.popleft()
-        for dx, dy in dirs:
-            nx, ny = cx + dx, cy + dy
-            if nx < 0 or ny < 0 or nx >= w or ny >= h:
-                continue
-            if out[ny, nx] or not dist_ok[ny, nx]:
-                continue
-            out[ny, nx] = True
-            q.append((nx, ny))
+    if ndimage is not None and dist_ok[y0, x0]:
+        # The seed's 4-connected component, labelled in one C pass.
+        # The candidate buffer is reused for the result.
+        labels, _ = ndimage.label(dist_ok, structure=_FOUR_CONNECTED)
+        return np.equal(labels, labels[y0, x0], out=dist_ok)
 
-    return out
+    return _scanline_fill(dist_ok, x0, y0)
 
 
 def bounding_rect(mask: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
-    ys, xs = np.where(mask)
-    if ys.size == 0 or xs.size == 0:
+    # Axis reductions only; no coordinate arrays for every selected pixel.
+    rows = np.any(mask, axis=1)
+    if not rows.any():
         return None
-    x0 = int(xs.min())
-    y0 = int(ys.min())
-    x1 = int(xs.max()) + 1
-    y1 = int(ys.max()) + 1
+    cols = np.any(mask, axis=0)
+    y0 = int(np.argmax(rows))
+    y1 = int(rows.size - np.argmax(rows[::-1]))
+    x0 = int(np.argmax(cols))
+    x1 = int(cols.size - np.argmax(cols[::-1]))
     return (x0, y0, x1 - x0, y1 - y0)
 
 
@@ -79,27 +101,105 @@ def polygon_mask(shape_hw: Tuple[int, int], points_xy: list[Tuple[int, int]]) ->
     h, w = shape_hw
     if h <= 0 or w <= 0 or len(points_xy) < 3:
         return np.zeros((h, w), dtype=bool)
-    img = Image.new("L", (w, h), 0)
+    mask = np.zeros((h, w), dtype=bool)
+    xs = [int(p[0]) for p in points_xy]
+    ys = [int(p[1]) for p in points_xy]
+    x0 = max(0, min(xs))
+    y0 = max(0, min(ys))
+    x1 = min(w - 1, max(xs))
+    y1 = min(h - 1, max(ys))
+    if x1 < x0 or y1 < y0:
+        return mask
+    # Rasterize only the polygon's clipped bounding box; the rest stays zero.
+    # 1-bit canvas: np.array() of a mode "1" image is already a bool mask.
+    img = Image.new("1", (x1 - x0 + 1, y1 - y0 + 1), 0)
     draw = ImageDraw.Draw(img)
-    draw.polygon(points_xy, fill=255, outline=255)
-    arr = np.array(img, dtype=np.uint8)
-    return arr > 0
+    draw.polygon([(x - x0, y - y0) for x, y in zip(xs, ys)], fill=1, outline=1)
+    mask[y0:y1 + 1, x0:x1 + 1] = np.array(img)
+    return mask
+
+
+# Boolean masks only: "subtract" is current & ~incoming, i.e. current > incoming.
+_COMBINE_OPS = {
+    "add": np.logical_or,
+    "subtract": np.greater,
+    "intersect": np.logical_and,
+}
 
 
 def combine_selection_masks(
     current: Optional[np.ndarray],
     incoming: np.ndarray,
     op: str,
+    inplace: bool = False,
+    consume_incoming: bool = False,
+) -> np.ndarray:
+    # inplace=True writes the result into `current` instead of allocating a new mask.
+    # consume_incoming=True hands `incoming` over: it is returned as-is or used as
+    # the output buffer, so no path allocates.
+    fn = _COMBINE_OPS.get(op)
+    if fn is None:
+        fn = _COMBINE_OPS.get(op.strip().lower())
+    if fn is None or current is None or current.shape != incoming.shape:
+        # "replace", unknown ops and shape mismatches all take the incoming mask.
+        return incoming if consume_incoming else incoming.copy()
+    if inplace:
+        out = current
+    elif consume_incoming:
+        out = incoming
+    else:
+        out = None
+    return fn(current, incoming, out=out)
+
+
+def combine_rect_selection(
+    rect: Tuple[int, int, int, int],
+    incoming: np.ndarray,
+    op: str,
+    consume_incoming: bool = False,
 ) -> np.ndarray:
-    op_norm = op.strip().lower()
-    if current is None or op_norm == "replace":
-        return incoming.copy()
-    if current.shape != incoming.shape:
-        return incoming.copy()
+    # Same result as combine_selection_masks with a mask of `rect` as current,
+    # without building that mask: every op only writes inside or outside the rect.
+    op_norm = op if op in _COMBINE_OPS else op.strip().lower()
+    out = incoming if consume_incoming else incoming.copy()
+    if op_norm not in _COMBINE_OPS:
+        return out
+    h, w = out.shape
+    x, y, rw, rh = rect
+    x0 = max(0, int(x))
+    y0 = max(0, int(y))
+    x1 = min(w, int(x + rw))
+    y1 = min(h, int(y + rh))
+    if x1 <= x0 or y1 <= y0:
+        if op_norm == "add":
+            return out
+        out[:] = False
+        return out
     if op_norm == "add":
-        return current | incoming
+        out[y0:y1, x0:x1] = True
+        return out
     if op_norm == "subtract":
-        return current & (~incoming)
-    if op_norm == "intersect":
-        return current & incoming
-    return incoming.copy()
+        inner = out[y0:y1, x0:x1]
+        np.logical_not(inner, out=inner)
+    out[:y0] = False
+    out[y1:] = False
+    out[y0:y1, :x0] = False
+    out[y0:y1, x1:] = False
+    return out
+
+
+@dataclass(frozen=True, slots=True)
+class PackedMask:
+    # Boolean mask stored at one bit per pixel, for masks that are kept around
+    # (history, snapshots) rather than read every frame.
+    bits: np.ndarray
+    shape: Tuple[int, int]
+
+
+def pack_mask(mask: np.ndarray) -> PackedMask:
+    return PackedMask(np.packbits(mask, axis=None), (int(mask.shape[0]), int(mask.shape[1])))
+
+
+def unpack_mask(packed: PackedMask) -> np.ndarray:
+    h, w = packed.shape
+    return np.unpackbits(packed.bits, count=h * w).reshape(h, w).view(bool)
@@ -1,16 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from operator import attrgetter
+from typing import Any, Callable, List, Optional, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class PaletteColor:
     rgb: Tuple[int, int, int]
     enabled: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class BrushPreset:
     preset_id: str
     name: str
@@ -28,7 +29,7 @@ class BrushPreset:
     symmetry_y: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class LayerState:
     name: str = "Layer 1"
     src_path: Optional[str] = None
@@ -66,12 +67,34 @@ class LayerState:
     # Non-destructive alpha painting mask stored as PNG(base64) grayscale
     # (same pixel size as source image). None means fully opaque.
     alpha_paint_mask_data: Optional[str] = None
+    # Same mask as a PNG sidecar file next to the project (set on load).
+    # The inline data wins when both are present.
+    alpha_paint_mask_path: Optional[str] = None
 
-    def enabled_palette_rgbs(self) -> List[Tuple[int, int, int]]:
-        return [p.rgb for p in self.palette if p.enabled]
+    def enabled_palette_rgbs(self) -> Tuple[Tuple[int, int, int], ...]:
+        # A tuple, so render-cache keys and the palette-array cache can hash it as is.
+        return tuple(p.rgb for p in self.palette if p.enabled)
 
+    def clone(self) -> "LayerState":
+        # Every other field is immutable, so only the palette needs its own entries.
+        # Entries are built directly; replace() re-reads the field list per call.
+        return replace(self, palette=[PaletteColor(p.rgb, p.enabled) for p in self.palette])
 
-@dataclass
+
+def _active_layer_field(name: str, cast: Optional[Callable[[Any], Any]] = None) -> property:
+    # Property forwarding `name` to the active layer, optionally casting on set.
+    get_field = attrgetter(name)
+
+    def fget(self: "ProjectState") -> Any:
+        return get_field(self._active())
+
+    def fset(self: "ProjectState", value: Any) -> None:
+        setattr(self._active(), name, value if cast is None else cast(value))
+
+    return property(fget, fset)
+
+
+@dataclass(slots=True)
 class ProjectState:
     # Output canvas settings
     out_w: int = 512
@@ -99,6 +122,15 @@ class ProjectState:
     active_brush_id: str = "soft_round"
     custom_brush_presets: List[BrushPreset] = field(default_factory=list)
 
+    def clone(self) -> "ProjectState":
+        # Independent copy for undo/snapshots: one shallow replace per object
+        # instead of deepcopy's recursive walk and memo bookkeeping.
+        return replace(
+            self,
+            layers=[layer.clone() for layer in self.layers],
+            custom_brush_presets=[replace(p) for p in self.custom_brush_presets],
+        )
+
     def _ensure_layers(self) -> None:
         if not self.layers:
             self.layers = [LayerState()]
@@ -108,174 +140,36 @@ class ProjectState:
         self._ensure_layers()
         return self.layers[self.active_layer_index]
 
-    # ---- Legacy compatibility accessors (active-layer mapped) ----
-    @property
-    def src_path(self) -> Optional[str]:
-        return self.active_layer().src_path
-
-    @src_path.setter
-    def src_path(self, value: Optional[str]) -> None:
-        self.active_layer().src_path = value
-
-    @property
-    def img_scale(self) -> float:
-        return self.active_layer().img_scale
-
-    @img_scale.setter
-    def img_scale(self, value: float) -> None:
-        self.active_layer().img_scale = float(value)
-
-    @property
-    def img_off_x(self) -> float:
-        return self.active_layer().img_off_x
-
-    @img_off_x.setter
-    def img_off_x(self, value: float) -> None:
-        self.active_layer().img_off_x = float(value)
-
-    @property
-    def img_off_y(self) -> float:
-        return self.active_layer().img_off_y
-
-    @img_off_y.setter
-    def img_off_y(self, value: float) -> None:
-        self.active_layer().img_off_y = float(value)
-
-    @property
-    def rotation_deg(self) -> int:
-        return self.active_layer().rotation_deg
-
-    @rotation_deg.setter
-    def rotation_deg(self, value: int) -> None:
-        self.active_layer().rotation_deg = int(value)
-
-    @property
-    def tolerance(self) -> int:
-        return self.active_layer().tolerance
-
-    @tolerance.setter
-    def tolerance(self, value: int) -> None:
-        self.active_layer().tolerance = int(value)
-
-    @property
-    def color_key_mode(self) -> str:
-        return self.active_layer().color_key_mode
-
-    @color_key_mode.setter
-    def color_key_mode(self, value: str) -> None:
-        self.active_layer().color_key_mode = str(value)
-
-    @property
-    def hsv_h_tol(self) -> int:
-        return self.active_layer().hsv_h_tol
-
-    @hsv_h_tol.setter
-    def hsv_h_tol(self, value: int) -> None:
-        self.active_layer().hsv_h_tol = int(value)
-
-    @property
-    def hsv_s_tol(self) -> int:
-        return self.active_layer().hsv_s_tol
-
-    @hsv_s_tol.setter
-    def hsv_s_tol(self, value: int) -> None:
-        self.active_layer().hsv_s_tol = int(value)
+    def _active(self) -> LayerState:
+        # Hot path for the legacy accessors: skip the clamp when the index is already valid.
+        layers = self.layers
+        idx = self.active_layer_index
+        if type(idx) is int and 0 <= idx < len(layers):
+            return layers[idx]
+        return self.active_layer()
 
-    @property
-    def hsv_v_tol(self) -> int:
-        return self.active_layer().hsv_v_tol
-
-    @hsv_v_tol.setter
-    def hsv_v_tol(self, value: int) -> None:
-        self.active_layer().hsv_v_tol = int(value)
-
-    @property
-    def palette(self) -> List[PaletteColor]:
-        return self.active_layer().palette
-
-    @palette.setter
-    def palette(self, value: List[PaletteColor]) -> None:
-        self.active_layer().palette = value
-
-    @property
-    def mask_feather_radius(self) -> int:
-        return self.active_layer().mask_feather_radius
-
-    @mask_feather_radius.setter
-    def mask_feather_radius(self, value: int) -> None:
-        self.active_layer().mask_feather_radius = int(value)
-
-    @property
-    def mask_grow_shrink(self) -> int:
-        return self.active_layer().mask_grow_shrink
-
-    @mask_grow_shrink.setter
-    def mask_grow_shrink(self, value: int) -> None:
-        self.active_layer().mask_grow_shrink = int(value)
-
-    @property
-    def remove_islands_min_size(self) -> int:
-        return self.active_layer().remove_islands_min_size
-
-    @remove_islands_min_size.setter
-    def remove_islands_min_size(self, value: int) -> None:
-        self.active_layer().remove_islands_min_size = int(value)
-
-    @property
-    def opacity(self) -> float:
-        return self.active_layer().opacity
-
-    @opacity.setter
-    def opacity(self, value: float) -> None:
-        self.active_layer().opacity = float(value)
-
-    @property
-    def brightness(self) -> float:
-        return self.active_layer().brightness
-
-    @brightness.setter
-    def brightness(self, value: float) -> None:
-        self.active_layer().brightness = float(value)
-
-    @property
-    def contrast(self) -> float:
-        return self.active_layer().contrast
-
-    @contrast.setter
-    def contrast(self, value: float) -> None:
-        self.active_layer().contrast = float(value)
-
-    @property
-    def saturation(self) -> float:
-        return self.active_layer().saturation
-
-    @saturation.setter
-    def saturation(self, value: float) -> None:
-        self.active_layer().saturation = float(value)
-
-    @property
-    def gamma(self) -> float:
-        return self.active_layer().gamma
-
-    @gamma.setter
-    def gamma(self, value: float) -> None:
-        self.active_layer().gamma = float(value)
-
-    @property
-    def vibrance(self) -> float:
-        return self.active_layer().vibrance
-
-    @vibrance.setter
-    def vibrance(self, value: float) -> None:
-        self.active_layer().vibrance = float(value)
-
-    @property
-    def temperature(self) -> int:
-        return self.active_layer().temperature
-
-    @temperature.setter
-    def temperature(self, value: int) -> None:
-        self.active_layer().temperature = int(value)
-
-    def enabled_palette_rgbs(self) -> List[Tuple[int, int, int]]:
-        return self.active_layer().enabled_palette_rgbs()
+    # ---- Legacy compatibility accessors (active-layer mapped) ----
+    src_path = _active_layer_field("src_path")
+    img_scale = _active_layer_field("img_scale", float)
+    img_off_x = _active_layer_field("img_off_x", float)
+    img_off_y = _active_layer_field("img_off_y", float)
+    rotation_deg = _active_layer_field("rotation_deg", int)
+    tolerance = _active_layer_field("tolerance", int)
+    color_key_mode = _active_layer_field("color_key_mode", str)
+    hsv_h_tol = _active_layer_field("hsv_h_tol", int)
+    hsv_s_tol = _active_layer_field("hsv_s_tol", int)
+    hsv_v_tol = _active_layer_field("hsv_v_tol", int)
+    palette = _active_layer_field("palette")
+    mask_feather_radius = _active_layer_field("mask_feather_radius", int)
+    mask_grow_shrink = _active_layer_field("mask_grow_shrink", int)
+    remove_islands_min_size = _active_layer_field("remove_islands_min_size", int)
+    opacity = _active_layer_field("opacity", float)
+    brightness = _active_layer_field("brightness", float)
+    contrast = _active_layer_field("contrast", float)
+    saturation = _active_layer_field("saturation", float)
+    gamma = _active_layer_field("gamma", float)
+    vibrance = _active_layer_field("vibrance", float)
+    temperature = _active_layer_field("temperature", int)
+
+    def enabled_palette_rgbs(self) -> Tuple[Tuple[int, int, int], ...]:
+        return self._active().enabled_palette_rgbs()
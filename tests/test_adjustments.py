@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import unittest
+
+
+class AdjustmentsTests(unittest.TestCase):
+    def test_tone_curve_matches_float_pipeline(self) -> None:
+        try:
+            import numpy as np
+            from core.adjustments import apply_adjustments_rgba
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        levels = np.arange(256, dtype=np.uint8)
+        rgba = np.stack([levels, levels[::-1], levels, np.full(256, 77, dtype=np.uint8)], axis=-1)[None, ...]
+        out = apply_adjustments_rgba(rgba, brightness=1.2, contrast=1.5, gamma=2.2, temperature=40)
+
+        ref = rgba[..., :3].astype(np.float32)
+        ref *= 1.2
+        ref = (ref - 127.5) * 1.5 + 127.5
+        ref[..., 0] += 50.0
+        ref[..., 2] -= 50.0
+        ref = np.power(np.clip(ref, 0.0, 255.0) / 255.0, 1.0 / 2.2) * 255.0
+        ref = np.clip(ref, 0.0, 255.0).astype(np.uint8)
+
+        np.testing.assert_array_equal(out[..., :3], ref)
+        np.testing.assert_array_equal(out[..., 3], rgba[..., 3])
+
+    def test_saturation_zero_produces_gray(self) -> None:
+        try:
+            import numpy as np
+            from core.adjustments import apply_adjustments_rgba
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        rgba = np.array([[[200, 40, 90, 255], [10, 250, 30, 128]]], dtype=np.uint8)
+        out = apply_adjustments_rgba(rgba, saturation=0.0)
+        self.assertLessEqual(int(np.ptp(out[0, 0, :3].astype(int))), 1)
+        self.assertLessEqual(int(np.ptp(out[0, 1, :3].astype(int))), 1)
+        self.assertEqual(int(out[0, 1, 3]), 128)
+
+    def test_identity_returns_input(self) -> None:
+        try:
+            import numpy as np
+            from core.adjustments import apply_adjustments_rgba
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        rgba = np.zeros((3, 3, 4), dtype=np.uint8)
+        self.assertIs(apply_adjustments_rgba(rgba), rgba)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+
+class BatchExportTests(unittest.TestCase):
+    def test_parallel_export_matches_serial(self) -> None:
+        try:
+            import numpy as np
+            from PIL import Image
+            from core.batch import _MIN_PARALLEL_FILES, batch_export_with_state
+            from core.state import PaletteColor, ProjectState
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        state = ProjectState(out_w=8, out_h=6)
+        state.palette = [PaletteColor(rgb=(0, 255, 0))]
+        n_files = _MIN_PARALLEL_FILES + 1
+
+        with TemporaryDirectory() as td:
+            src_dir = Path(td) / "in"
+            src_dir.mkdir()
+            for i in range(n_files):
+                arr = np.zeros((6, 8, 4), dtype=np.uint8)
+                arr[..., 1] = 255
+                arr[..., 3] = 255
+                arr[:, : i + 1, 0] = 200
+                Image.fromarray(arr, "RGBA").save(src_dir / f"f{i}.png")
+
+            with mock.patch.dict(os.environ, {"OPM_WORKERS": "2"}):
+                count = batch_export_with_state(str(src_dir), str(Path(td) / "par"), state)
+            with mock.patch.dict(os.environ, {"OPM_WORKERS": "1"}):
+                batch_export_with_state(str(src_dir), str(Path(td) / "ser"), state)
+
+            self.assertEqual(count, n_files)
+            for i in range(n_files):
+                par = np.asarray(Image.open(Path(td) / "par" / f"f{i}_opm.png"))
+                ser = np.asarray(Image.open(Path(td) / "ser" / f"f{i}_opm.png"))
+                np.testing.assert_array_equal(par, ser)
+                self.assertEqual(int((par[..., 3] == 0).sum()), 6 * (8 - i - 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -32,6 +32,28 @@ class CompositorAlphaPaintMaskTests(unittest.TestCase):
         self.assertEqual(int(arr[0, 1, 3]), 0)
         self.assertLess(abs(int(arr[1, 0, 3]) - 128), 2)
 
+    def test_in_place_mask_edits_are_not_served_from_cache(self) -> None:
+        try:
+            import numpy as np
+            from PIL import Image
+            from core.compositor import LayerRenderInput, composite_layers_to_array
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        src = Image.new("RGBA", (2, 2), (255, 0, 0, 255))
+        mask = np.full((2, 2), 255, dtype=np.uint8)
+
+        def alpha(brightness: float) -> np.ndarray:
+            layer = LayerRenderInput(src_rgba_pil=src, alpha_paint_mask=mask, brightness=brightness)
+            return composite_layers_to_array([layer], (2, 2), high_quality=False, nearest_neighbor=True)[..., 3]
+
+        self.assertEqual(int(alpha(1.0)[0, 0]), 255)
+        mask[0, 0] = 0
+        self.assertEqual(int(alpha(1.0)[0, 0]), 0)
+        # Frozen masks may be reused across color-grade changes; the result must match.
+        mask.flags.writeable = False
+        np.testing.assert_array_equal(alpha(1.0), alpha(1.5))
+
 
 if __name__ == "__main__":
     unittest.main()
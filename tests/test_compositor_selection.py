@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import unittest
+
+
+class CompositorSelectionRectTests(unittest.TestCase):
+    def _keyed_alpha(self, **kwargs):
+        import numpy as np
+        from PIL import Image
+        from core.compositor import LayerRenderInput, composite_layers_to_canvas
+
+        src = Image.new("RGBA", (6, 5), (0, 255, 0, 255))
+        out = composite_layers_to_canvas(
+            layers=[
+                LayerRenderInput(
+                    src_rgba_pil=src,
+                    palette_rgbs=[(0, 255, 0)],
+                    tolerance=10,
+                    selection_enabled=True,
+                    **kwargs,
+                )
+            ],
+            out_size=(6, 5),
+            high_quality=False,
+            nearest_neighbor=True,
+        )
+        return np.array(out.convert("RGBA"), dtype=np.uint8)[..., 3]
+
+    def test_rect_limits_color_key_to_selection(self) -> None:
+        try:
+            import numpy as np
+            from core.compositor import composite_layers_to_canvas  # noqa: F401
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        expected = np.full((5, 6), 255, dtype=np.uint8)
+        expected[1:3, 2:5] = 0
+        np.testing.assert_array_equal(self._keyed_alpha(selection_rect=(2, 1, 3, 2)), expected)
+        np.testing.assert_array_equal(
+            self._keyed_alpha(selection_rect=(2, 1, 3, 2), selection_invert=True),
+            255 - expected,
+        )
+
+    def test_empty_rect(self) -> None:
+        try:
+            import numpy as np
+            from core.compositor import composite_layers_to_canvas  # noqa: F401
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        self.assertTrue((self._keyed_alpha(selection_rect=(9, 9, 2, 2)) == 255).all())
+        self.assertTrue((self._keyed_alpha(selection_rect=(9, 9, 2, 2), selection_invert=True) == 0).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+
+
+class LassoSelectionTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        try:
+            from PIL import Image
+            from PySide6.QtWidgets import QApplication
+            from ui.main_window import MainWindow
+        except Exception as exc:  # pragma: no cover - environment dependency
+            raise unittest.SkipTest(f"missing runtime dependency: {exc}")
+        cls.app = QApplication.instance() or QApplication([])
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "src.png")
+        Image.new("RGBA", (60, 50), (10, 20, 30, 255)).save(cls.path)
+        cls.MainWindow = MainWindow
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tmp.cleanup()
+
+    def _window(self):
+        w = self.MainWindow()
+        self.addCleanup(w.deleteLater)
+        self.app.processEvents()
+        w._load_path(self.path)
+        w._pick_mode = "lasso"
+        return w
+
+    def _draw_triangle(self, w, points=((10, 10), (50, 10), (10, 45))) -> None:
+        x0, y0 = w._image_placement()[:2]
+        for sx, sy in points:
+            w._pick_drag_at_canvas_xy(x0 + sx + 0.5, y0 + sy + 0.5)
+
+    def _close(self, w, op: str, **kwargs):
+        import numpy as np
+        from core.selection import polygon_mask
+
+        w.sel_op_combo.setCurrentIndex(w.sel_op_combo.findData(op))
+        self._draw_triangle(w, **kwargs)
+        polygon = polygon_mask((50, 60), list(w._lasso_points))
+        w._close_lasso()
+        mask = w._selection_mask
+        return np.zeros((50, 60), dtype=bool) if mask is None else mask, polygon
+
+    def test_lasso_without_prior_selection_is_the_polygon(self) -> None:
+        import numpy as np
+
+        # With nothing selected before the path, every op takes the polygon as is.
+        for op in ("replace", "add", "subtract"):
+            with self.subTest(op=op):
+                mask, polygon = self._close(self._window(), op)
+                self.assertGreater(int(polygon.sum()), 0)
+                np.testing.assert_array_equal(mask, polygon)
+
+    def test_lasso_combines_with_rect_from_before_the_drag(self) -> None:
+        import numpy as np
+
+        w = self._window()
+        w.sel_x_spin.setValue(40)
+        w.sel_y_spin.setValue(30)
+        w.sel_w_spin.setValue(20)
+        w.sel_h_spin.setValue(20)
+        w.sel_enable_chk.setChecked(True)
+        mask, polygon = self._close(w, "add")
+        expected = polygon.copy()
+        expected[30:50, 40:60] = True
+        np.testing.assert_array_equal(mask, expected)
+
+    def test_lasso_add_ignores_disabled_selection(self) -> None:
+        import numpy as np
+
+        w = self._window()
+        first, _ = self._close(w, "replace")
+        self.assertGreater(int(first.sum()), 0)
+        w.sel_enable_chk.setChecked(False)
+        self.assertIsNone(w._selection_mask)
+        mask, polygon = self._close(w, "add", points=((55, 45), (55, 20), (30, 45)))
+        np.testing.assert_array_equal(mask, polygon)
+
+
+if __name__ == "__main__":
+    unittest.main()
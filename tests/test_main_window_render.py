@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import unittest
+
+
+class RenderSnapshotTests(unittest.TestCase):
+    def test_worker_inputs_do_not_share_writable_masks(self) -> None:
+        try:
+            import numpy as np
+            from core.compositor import LayerRenderInput
+            from ui.main_window import _frozen_render_input
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        live = np.zeros((4, 4), dtype=np.float32)
+        frozen_mask = np.ones((4, 4), dtype=bool)
+        frozen_mask.flags.writeable = False
+        layer = LayerRenderInput(src_rgba_pil=None, alpha_paint_mask=live, selection_mask=frozen_mask)
+
+        snapshot = _frozen_render_input(layer)
+        live[0, 0] = 1.0
+
+        self.assertIsNot(snapshot.alpha_paint_mask, live)
+        self.assertFalse(snapshot.alpha_paint_mask.flags.writeable)
+        self.assertEqual(float(snapshot.alpha_paint_mask[0, 0]), 0.0)
+        self.assertIs(snapshot.selection_mask, frozen_mask)
+        self.assertIs(_frozen_render_input(snapshot), snapshot)
+
+
+if __name__ == "__main__":
+    unittest.main()
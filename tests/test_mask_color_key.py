@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import unittest
+
+
+class ColorKeyMaskCacheTests(unittest.TestCase):
+    def test_cached_mask_matches_and_is_independent(self) -> None:
+        try:
+            import numpy as np
+            from core.mask_color_key import build_color_key_remove_mask
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        rng = np.random.default_rng(3)
+        rgba = rng.integers(0, 256, (13, 17, 4), dtype=np.uint8)
+        rgba[2:5, 3:9, :3] = (10, 200, 30)
+
+        first = build_color_key_remove_mask(rgba, [(10, 200, 30)], 20)
+        first[:] = False  # callers may edit the result in place
+        second = build_color_key_remove_mask(rgba, [(10, 200, 30)], 20)
+
+        self.assertEqual(second.shape, (13, 17))
+        self.assertEqual(second.dtype, bool)
+        self.assertTrue(second[2:5, 3:9].all())
+
+        rgba[2, 3, :3] = (255, 0, 255)
+        third = build_color_key_remove_mask(rgba, [(10, 200, 30)], 20)
+        self.assertFalse(third[2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
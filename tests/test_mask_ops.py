@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import unittest
+
+
+class MorphMaskTests(unittest.TestCase):
+    def test_grow_shrink_matches_pil_fallback(self) -> None:
+        try:
+            import numpy as np
+            from unittest import mock
+            import core.mask_ops as mask_ops
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+        if mask_ops.ndimage is None:
+            self.skipTest("scipy not installed")
+
+        rng = np.random.default_rng(3)
+        mask = rng.random((23, 29)) < 0.4
+        for steps in (1, 3, -1, -4):
+            got = mask_ops._morph_mask(mask, steps)
+            with mock.patch.object(mask_ops, "ndimage", None):
+                expected = mask_ops._morph_mask(mask, steps)
+            np.testing.assert_array_equal(got, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import base64
+import io
+import os
 from pathlib import Path
 from tempfile import TemporaryDirectory
 import unittest
@@ -37,10 +40,12 @@ class ProjectIOBrushPresetTests(unittest.TestCase):
             path = Path(td) / "brushes.opm"
             save_project(str(path), state)
             loaded = load_project(str(path))
+            mask_bytes = Path(loaded.layers[0].alpha_paint_mask_path).read_bytes()
 
         self.assertEqual(loaded.brush_engine_version, 3)
         self.assertEqual(loaded.active_brush_id, "textured_round")
-        self.assertEqual(loaded.layers[0].alpha_paint_mask_data, "maskdata")
+        self.assertIsNone(loaded.layers[0].alpha_paint_mask_data)
+        self.assertEqual(mask_bytes, base64.b64decode("maskdata"))
         self.assertEqual(len(loaded.custom_brush_presets), 1)
         preset = loaded.custom_brush_presets[0]
         self.assertEqual(preset.preset_id, "textured_round")
@@ -60,6 +65,21 @@ class ProjectIOBrushPresetTests(unittest.TestCase):
         self.assertEqual(loaded.active_brush_id, "soft_round")
         self.assertEqual(loaded.custom_brush_presets, [])
 
+    def test_file_object_resolves_relative_paths_against_cwd(self) -> None:
+        with TemporaryDirectory() as td:
+            cwd = os.getcwd()
+            os.chdir(td)
+            try:
+                loaded = load_project(
+                    io.BytesIO(b'{"version": 2, "state": {"layers": [{"src_path": "art/in.png"}], "brush_engine_version": 2}}')
+                )
+            finally:
+                os.chdir(cwd)
+            expected = Path(td).resolve() / "art" / "in.png"
+
+        self.assertEqual(Path(loaded.layers[0].src_path), expected)
+        self.assertEqual(loaded.brush_engine_version, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import base64
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import unittest
+
+from core.project_io import save_project, load_project
+from core.state import LayerState, PaletteColor, ProjectState
+
+
+class ProjectIOLayerTests(unittest.TestCase):
+    def test_repeated_saves_pick_up_layer_edits(self) -> None:
+        state = ProjectState()
+        state.layers.append(
+            LayerState(name="Top", palette=[PaletteColor(rgb=(1, 2, 3))], alpha_paint_mask_data="mask")
+        )
+
+        with TemporaryDirectory() as td:
+            path = Path(td) / "layers.opm"
+            save_project(str(path), state)
+            first = path.read_bytes()
+
+            state.layers[1].palette[0].enabled = False
+            state.layers[0].opacity = 0.5
+            save_project(str(path), state)
+            second = path.read_bytes()
+            loaded = load_project(str(path))
+            mask_path = Path(loaded.layers[1].alpha_paint_mask_path)
+            mask_bytes = mask_path.read_bytes()
+            resaved = Path(td) / "copy.opm"
+            save_project(str(resaved), loaded)
+            copied_mask = (Path(td) / json.loads(resaved.read_bytes())["state"]["layers"][1]["alpha_paint_mask_path"]).read_bytes()
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(json.loads(second)["state"]["layers"][0]["opacity"], 0.5)
+        self.assertEqual(len(loaded.layers), 2)
+        self.assertFalse(loaded.layers[1].palette[0].enabled)
+        self.assertTrue(mask_path.name.startswith("layers.opm_mask_"))
+        self.assertEqual(mask_bytes, base64.b64decode("mask"))
+        self.assertEqual(copied_mask, mask_bytes)
+        self.assertNotIn(b"alpha_paint_mask_data", second)
+        self.assertIsNone(loaded.layers[0].alpha_paint_mask_path)
+        self.assertEqual(loaded.layers[0].opacity, 0.5)
+
+    def test_masks_survive_reorder_and_resave(self) -> None:
+        masks = {"A": base64.b64encode(b"A" * 100).decode("ascii"), "B": base64.b64encode(b"B" * 200).decode("ascii")}
+        state = ProjectState(layers=[LayerState(name=name, alpha_paint_mask_data=data) for name, data in masks.items()])
+
+        with TemporaryDirectory() as td:
+            path = Path(td) / "order.opm"
+            save_project(str(path), state)
+            (Path(td) / "order_layer0_mask.png").write_bytes(b"stale")
+            loaded = load_project(str(path))
+            loaded.layers.reverse()
+            save_project(str(path), loaded)
+            loaded.layers.pop()
+            save_project(str(path), loaded)
+            reloaded = load_project(str(path))
+            contents = {layer.name: Path(layer.alpha_paint_mask_path).read_bytes() for layer in reloaded.layers}
+            sidecars = sorted(entry.name for entry in Path(td).iterdir() if entry.suffix == ".png")
+            version = json.loads(path.read_bytes())["version"]
+
+        self.assertEqual(contents, {"B": b"B" * 200})
+        self.assertEqual(sidecars, sorted([Path(reloaded.layers[0].alpha_paint_mask_path).name, "order_layer0_mask.png"]))
+        self.assertEqual(version, 3)
+
+    def test_many_layers_share_identical_mask_sidecars(self) -> None:
+        data = [base64.b64encode(payload).decode("ascii") for payload in (b"x" * 50, b"y" * 60, b"x" * 50, b"z" * 70)]
+        state = ProjectState(layers=[LayerState(name=str(idx), alpha_paint_mask_data=d) for idx, d in enumerate(data)])
+
+        with TemporaryDirectory() as td:
+            path = Path(td) / "many.opm"
+            save_project(str(path), state)
+            loaded = load_project(str(path))
+            loaded.layers.reverse()
+            save_project(str(path), loaded)
+            reloaded = load_project(str(path))
+            contents = [Path(layer.alpha_paint_mask_path).read_bytes() for layer in reloaded.layers]
+            sidecars = [entry for entry in Path(td).iterdir() if entry.suffix == ".png"]
+
+        self.assertEqual(contents, [b"z" * 70, b"x" * 50, b"y" * 60, b"x" * 50])
+        self.assertEqual(len(sidecars), 3)
+
+    def test_saving_another_project_keeps_foreign_sidecars(self) -> None:
+        mask = base64.b64encode(b"M" * 80).decode("ascii")
+        first = ProjectState(layers=[LayerState(name="Masked", alpha_paint_mask_data=mask)])
+        second = ProjectState(layers=[LayerState(name="Other", alpha_paint_mask_data=mask)])
+
+        with TemporaryDirectory() as td:
+            opm = Path(td) / "foo.opm"
+            save_project(str(opm), first)
+            save_project(str(Path(td) / "foo.json"), second)
+            save_project(str(Path(td) / "foo.json"), ProjectState())
+            loaded = load_project(str(opm))
+            content = Path(loaded.layers[0].alpha_paint_mask_path).read_bytes()
+            save_project(str(opm), loaded)
+            sidecars = sorted(entry.name for entry in Path(td).iterdir() if entry.suffix == ".png")
+
+        self.assertEqual(content, b"M" * 80)
+        self.assertEqual(len(sidecars), 1)
+        self.assertTrue(sidecars[0].startswith("foo.opm_mask_"))
+
+    def test_unreadable_mask_sidecar_fails_the_save(self) -> None:
+        state = ProjectState()
+        with TemporaryDirectory() as td:
+            state.layers[0].alpha_paint_mask_path = str(Path(td) / "missing_mask.png")
+            path = Path(td) / "broken.opm"
+            with self.assertRaises(OSError):
+                save_project(str(path), state)
+            self.assertFalse(path.exists())
+
+    def test_versionless_file_keeps_its_layers(self) -> None:
+        with TemporaryDirectory() as td:
+            path = Path(td) / "noversion.json"
+            path.write_text(
+                '{"state": {"out_w": 64, "layers": [{"name": "Base"}, {"name": "Top", "opacity": 0.25}]}}',
+                encoding="utf-8",
+            )
+            loaded = load_project(str(path))
+
+        self.assertEqual([layer.name for layer in loaded.layers], ["Base", "Top"])
+        self.assertEqual(loaded.layers[1].opacity, 0.25)
+        self.assertEqual(loaded.out_w, 64)
+
+    def test_legacy_src_path_follows_clamped_active_layer(self) -> None:
+        state = ProjectState()
+        state.layers[0].src_path = "a.png"
+        state.layers.append(LayerState(name="Top", src_path="b.png"))
+
+        with TemporaryDirectory() as td:
+            path = Path(td) / "legacy.opm"
+            for index, expected in ((5, "b.png"), (-1, "a.png")):
+                state.active_layer_index = index
+                save_project(str(path), state)
+                raw = json.loads(path.read_bytes())["state"]
+                self.assertEqual(Path(raw["src_path"]).name, expected)
+
+    def test_numpy_scalars_serialize(self) -> None:
+        try:
+            import numpy as np
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        state = ProjectState()
+        state.out_w = np.int32(64)
+        state.layers[0].img_scale = np.float32(1.5)
+        state.layers[0].palette = [PaletteColor(rgb=tuple(np.array([9, 8, 7], dtype=np.uint8)))]
+
+        with TemporaryDirectory() as td:
+            path = Path(td) / "numpy.opm"
+            save_project(str(path), state)
+            loaded = load_project(str(path))
+
+        self.assertEqual(loaded.out_w, 64)
+        self.assertEqual(loaded.layers[0].img_scale, 1.5)
+        self.assertEqual(tuple(loaded.layers[0].palette[0].rgb), (9, 8, 7))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import unittest
+
+
+class MagicWandTests(unittest.TestCase):
+    def test_contiguous_selects_only_seed_region(self) -> None:
+        try:
+            import numpy as np
+            from core.selection import magic_wand_mask
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        rgb = np.zeros((5, 7, 3), dtype=np.uint8)
+        rgb[:, 3] = 255  # wall splits the image into two black regions
+        rgb[2, 3] = (0, 0, 0)  # ...except for one gap
+        rgb[0, 6] = (255, 255, 255)
+
+        mask = magic_wand_mask(rgb, (0, 0), 10, contiguous=True)
+        expected = np.all(rgb == 0, axis=2)
+        np.testing.assert_array_equal(mask, expected)
+
+        rgb[2, 3] = (255, 255, 255)  # close the gap
+        mask = magic_wand_mask(rgb, (0, 0), 10, contiguous=True)
+        self.assertTrue(mask[:, :3].all())
+        self.assertFalse(mask[:, 3:].any())
+
+    def test_scanline_fallback_matches_labelled_region(self) -> None:
+        try:
+            import numpy as np
+            from unittest import mock
+            import core.selection as selection
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        rng = np.random.default_rng(7)
+        rgb = (rng.random((24, 31, 1)) < 0.3).repeat(3, axis=2).astype(np.uint8) * 255
+        rgb[5, 9] = 0
+        expected = selection.magic_wand_mask(rgb, (9, 5), 10)
+        with mock.patch.object(selection, "ndimage", None):
+            mask = selection.magic_wand_mask(rgb, (9, 5), 10)
+        np.testing.assert_array_equal(mask, expected)
+        self.assertTrue(mask[5, 9])
+
+
+class CombineSelectionTests(unittest.TestCase):
+    def test_ops_and_buffer_reuse(self) -> None:
+        try:
+            import numpy as np
+            from core.selection import combine_selection_masks
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        cur = np.array([[True, True, False, False]])
+        inc = np.array([[True, False, True, False]])
+        expected = {
+            "add": [[True, True, True, False]],
+            "subtract": [[False, True, False, False]],
+            "intersect": [[True, False, False, False]],
+            "replace": inc.tolist(),
+        }
+        for op, want in expected.items():
+            out = combine_selection_masks(cur, inc, op)
+            np.testing.assert_array_equal(out, want)
+            self.assertIsNot(out, cur)
+            self.assertIsNot(out, inc)
+
+        incoming = inc.copy()
+        out = combine_selection_masks(cur, incoming, "subtract", consume_incoming=True)
+        self.assertIs(out, incoming)
+        np.testing.assert_array_equal(out, expected["subtract"])
+        incoming = inc.copy()
+        self.assertIs(combine_selection_masks(cur, incoming, "replace", consume_incoming=True), incoming)
+
+    def test_rect_combine_matches_mask_combine(self) -> None:
+        try:
+            import numpy as np
+            from core.selection import combine_rect_selection, combine_selection_masks
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        inc = np.random.default_rng(5).random((9, 11)) > 0.5
+        for rect in ((2, 1, 5, 4), (-3, -2, 6, 20), (20, 0, 3, 3)):
+            x, y, w, h = rect
+            cur = np.zeros_like(inc)
+            cur[max(0, y):max(0, y + h), max(0, x):max(0, x + w)] = True
+            for op in ("add", "subtract", "intersect", "replace"):
+                want = combine_selection_masks(cur, inc, op)
+                got = combine_rect_selection(rect, inc.copy(), op, consume_incoming=True)
+                np.testing.assert_array_equal(got, want)
+
+    def test_packed_mask_roundtrip(self) -> None:
+        try:
+            import numpy as np
+            from core.selection import pack_mask, unpack_mask
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        mask = np.random.default_rng(3).random((7, 13)) > 0.5
+        packed = pack_mask(mask)
+        self.assertEqual(packed.bits.nbytes, (7 * 13 + 7) // 8)
+        out = unpack_mask(packed)
+        self.assertEqual(out.dtype, np.bool_)
+        np.testing.assert_array_equal(out, mask)
+
+
+if __name__ == "__main__":
+    unittest.main()
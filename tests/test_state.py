@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import unittest
+
+
+class ProjectStateCloneTests(unittest.TestCase):
+    def test_clone_is_independent(self) -> None:
+        try:
+            from core.state import BrushPreset, LayerState, PaletteColor, ProjectState
+        except Exception as exc:  # pragma: no cover - environment dependency
+            self.skipTest(f"missing runtime dependency: {exc}")
+
+        state = ProjectState(
+            layers=[LayerState(palette=[PaletteColor((1, 2, 3))]), LayerState(name="Top")],
+            custom_brush_presets=[BrushPreset(preset_id="p", name="P")],
+        )
+        clone = state.clone()
+        self.assertEqual(clone, state)
+
+        clone.tolerance = 99
+        clone.layers[0].palette[0].enabled = False
+        clone.layers.append(LayerState())
+        clone.custom_brush_presets[0].size = 1.0
+        self.assertEqual(state.tolerance, 30)
+        self.assertTrue(state.layers[0].palette[0].enabled)
+        self.assertEqual(len(state.layers), 2)
+        self.assertEqual(state.custom_brush_presets[0].size, 24.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,35 @@
 from __future__ import annotations
+import os
 from typing import Optional, Callable, Tuple
 
-from PySide6.QtCore import Qt, QPoint, QRectF, QTimer
+import numpy as np
+from PySide6.QtCore import Qt, QLine, QPoint, QPointF, QRect, QRectF, QTimer
 from PySide6.QtGui import (
-    QPainter, QImage, QPixmap, QColor, QPen, QBrush
+    QPainter, QPainterPath, QImage, QPixmap, QColor, QPen, QPolygonF, QRegion, QTransform
 )
 from PySide6.QtWidgets import QWidget
 
-class CanvasWidget(QWidget):
+# GPU-backed canvas surface, opt-in with OPM_GL_CANVAS=1. QPainter drawing is
+# unchanged; Qt binds its OpenGL paint engine on a QOpenGLWidget.
+_CanvasBase = QWidget
+if os.environ.get("OPM_GL_CANVAS", "").strip() == "1":
+    try:
+        from PySide6.QtOpenGLWidgets import QOpenGLWidget
+    except ImportError:  # pragma: no cover - Qt built without OpenGL support
+        pass
+    else:
+        _CanvasBase = QOpenGLWidget
+
+# Marching-ants dash period in px (8 white, 8 black).
+_ANTS_PERIOD = 16
+
+_CHECKER_CELLS = np.array([[60, 90], [90, 60]], dtype=np.uint8)
+
+# Largest pre-scaled preview kept around (pixels); beyond this Qt scales per paint.
+_SCALED_PREVIEW_LIMIT = 4096 * 4096
+
+
+class CanvasWidget(_CanvasBase):
     """
     Shows output canvas preview (QImage) with view zoom/pan.
     Supports:
@@ -17,6 +39,15 @@ class CanvasWidget(QWidget):
       - middle-drag: pan view
       - eyedropper mode: click to sample color from source via callback
     """
+    # Paint constants, built once instead of on every paintEvent.
+    _COL_BG = QColor(30, 30, 30)
+    _COL_SHADE = QColor(0, 0, 0, 60)
+    _PEN_TEXT = QPen(QColor(220, 220, 220))
+    _PEN_BORDER = QPen(QColor(240, 240, 240), 1)
+    _PEN_GRID = QPen(QColor(255, 255, 255, 45), 1)
+    _PEN_LASSO = QPen(QColor(80, 210, 255), 2)
+    _PEN_LASSO_DOTS = QPen(QColor(80, 210, 255), 8, Qt.SolidLine, Qt.RoundCap)
+
     def __init__(
         self,
         on_move_image: Callable[[float, float], None],
@@ -27,6 +58,7 @@ class CanvasWidget(QWidget):
         on_paint_start_at_canvas_pos: Optional[Callable[[int, int], None]] = None,
         on_paint_drag_at_canvas_pos: Optional[Callable[[int, int], None]] = None,
         on_paint_finish: Optional[Callable[[], None]] = None,
+        on_view_zoom_changed: Optional[Callable[[float], None]] = None,
         parent: Optional[QWidget] = None,
     ):
         super().__init__(parent)
@@ -34,6 +66,10 @@ class CanvasWidget(QWidget):
         self.setFocusPolicy(Qt.StrongFocus)
 
         self._preview: Optional[QImage] = None
+        # Uploaded once per set_preview; the scaled copy is keyed by draw size.
+        self._preview_pm: Optional[QPixmap] = None
+        self._scaled_pm: Optional[QPixmap] = None
+        self._scaled_pm_size: Tuple[int, int] = (0, 0)
         self._out_size: Tuple[int, int] = (512, 512)
 
         # View transform
@@ -47,8 +83,14 @@ class CanvasWidget(QWidget):
         self._dragging_pick = False
         self._dragging_paint = False
         self._last_pos = QPoint()
-        self._last_pick_canvas_xy: Optional[Tuple[int, int]] = None
-        self._last_paint_canvas_xy: Optional[Tuple[int, int]] = None
+        # Last canvas px reported during a pick/paint drag (-1: none yet).
+        self._last_pick_x = -1
+        self._last_pick_y = -1
+        self._last_paint_x = -1
+        self._last_paint_y = -1
+        # View geometry (draw rect, canvas->widget transform and its inverse),
+        # rebuilt lazily after _mark_geom_dirty().
+        self._geom: Optional[Tuple[Tuple[float, float, float, float], QTransform, Optional[QTransform]]] = None
 
         self.eyedropper_enabled = False
         self.paint_enabled = False
@@ -66,17 +108,41 @@ class CanvasWidget(QWidget):
         self._on_paint_start_at_canvas_pos = on_paint_start_at_canvas_pos
         self._on_paint_drag_at_canvas_pos = on_paint_drag_at_canvas_pos
         self._on_paint_finish = on_paint_finish
+        self._on_view_zoom_changed = on_view_zoom_changed
+
+        # Checkerboard tile (2x2 cells) for the current cell size.
+        self._checker_tile: Optional[QPixmap] = None
+        self._checker_cell = 0
+        self._grid_lines: list[QLine] = []
+        self._grid_lines_key: Optional[tuple] = None
+        self._ants_tile_h: Optional[QPixmap] = None
+        self._ants_tile_v: Optional[QPixmap] = None
 
         self._ants_phase = 0.0
         self._ants_timer = QTimer(self)
         self._ants_timer.setInterval(120)
         self._ants_timer.timeout.connect(self._advance_ants)
 
+        # Pan/zoom input can arrive far faster than the display refreshes;
+        # coalesce it into at most one repaint per ~60 Hz frame.
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.setInterval(16)
+        self._repaint_timer.timeout.connect(self.update)
+
         self.setAcceptDrops(True)
 
     def set_preview(self, qimg: Optional[QImage], out_size: Tuple[int, int]) -> None:
+        # Keep the preview in the raster engine's native format; callers that
+        # already supply ARGB32_Premultiplied skip the conversion entirely.
+        if qimg is not None and qimg.format() != QImage.Format_ARGB32_Premultiplied:
+            qimg = qimg.convertToFormat(QImage.Format_ARGB32_Premultiplied)
         self._preview = qimg
-        self._out_size = out_size
+        self._preview_pm = QPixmap.fromImage(qimg) if qimg is not None else None
+        self._scaled_pm = None
+        if out_size != self._out_size:
+            self._out_size = out_size
+            self._mark_geom_dirty()
         self.update()
 
     def set_selection_overlay(
@@ -90,63 +156,109 @@ class CanvasWidget(QWidget):
         self._selection_rect_canvas = rect_canvas
         self._selection_invert = bool(invert)
         self._lasso_points_canvas = list(lasso_points_canvas or [])
-        if self._selection_enabled and self._selection_rect_canvas is not None:
+        self._sync_ants_timer()
+        self.update()
+
+    def _sync_ants_timer(self) -> None:
+        # Ants only tick while there is a visible selection border to animate.
+        want = self._selection_enabled and self._selection_rect_canvas is not None and self.isVisible()
+        if want:
             if not self._ants_timer.isActive():
                 self._ants_timer.start()
         elif self._ants_timer.isActive():
             self._ants_timer.stop()
-        self.update()
+
+    def _schedule_update(self) -> None:
+        if not self._repaint_timer.isActive():
+            self._repaint_timer.start()
+
+    def view_zoom(self) -> float:
+        return self._view_zoom
 
     def reset_view(self) -> None:
         self._view_zoom = 1.0
         self._view_pan_x = 0.0
         self._view_pan_y = 0.0
+        self._mark_geom_dirty()
         self.update()
-
-    def paintEvent(self, _) -> None:
+        if self._on_view_zoom_changed is not None:
+            self._on_view_zoom_changed(self._view_zoom)
+
+    def _mark_geom_dirty(self) -> None:
+        # Call after any change to widget size, view zoom/pan or output size.
+        self._geom = None
+
+    def _view_geom(self) -> Tuple[Tuple[float, float, float, float], QTransform, Optional[QTransform]]:
+        geom = self._geom
+        if geom is None:
+            # Where the output canvas is drawn in widget coords: centered, then panned.
+            out_w, out_h = self._out_size
+            draw_w = out_w * self._view_zoom
+            draw_h = out_h * self._view_zoom
+            x0 = self.width() * 0.5 + self._view_pan_x - draw_w * 0.5
+            y0 = self.height() * 0.5 + self._view_pan_y - draw_h * 0.5
+            # Canvas px -> widget px, so overlays map whole shapes in C++.
+            t = QTransform()
+            inv: Optional[QTransform] = None
+            if out_w > 0 and out_h > 0:
+                t.translate(x0, y0)
+                t.scale(draw_w / float(out_w), draw_h / float(out_h))
+                inv, ok = t.inverted()
+                if not ok:
+                    inv = None
+            geom = self._geom = ((x0, y0, draw_w, draw_h), t, inv)
+        return geom
+
+    def _canvas_draw_rect(self) -> Tuple[float, float, float, float]:
+        return self._view_geom()[0]
+
+    def _canvas_transform(self) -> QTransform:
+        return self._view_geom()[1]
+
+    def paintEvent(self, e) -> None:
+        # Qt already clips the painter to e.region(); the dirty rect is also
+        # used to skip tiling work outside it.
+        dirty = e.rect()
+        # Antialiasing stays off for the axis-aligned passes (background,
+        # checkerboard, preview blit, border, grid) and is only enabled for
+        # the selection and lasso overlays below.
         p = QPainter(self)
-        p.setRenderHint(QPainter.Antialiasing, True)
 
         # Background
-        p.fillRect(self.rect(), QColor(30, 30, 30))
+        p.fillRect(dirty, self._COL_BG)
 
         if self._preview is None:
-            p.setPen(QPen(QColor(220, 220, 220)))
+            p.setPen(self._PEN_TEXT)
             p.drawText(self.rect(), Qt.AlignCenter, "Drop an image or File → Open…")
             return
 
-        # Compute where the output canvas is drawn in widget coords
         out_w, out_h = self._out_size
-        # Center in widget
-        cx = self.width() * 0.5 + self._view_pan_x
-        cy = self.height() * 0.5 + self._view_pan_y
-
-        draw_w = out_w * self._view_zoom
-        draw_h = out_h * self._view_zoom
-        x0 = cx - draw_w * 0.5
-        y0 = cy - draw_h * 0.5
+        x0, y0, draw_w, draw_h = self._canvas_draw_rect()
 
         # Checkerboard underlay (to visualize transparency)
-        self._draw_checkerboard(p, QRectF(x0, y0, draw_w, draw_h), int(16 * self._view_zoom))
+        self._draw_checkerboard(
+            p, int(x0), int(y0), int(x0 + draw_w), int(y0 + draw_h), int(16 * self._view_zoom), dirty
+        )
 
         # Draw preview
-        pm = QPixmap.fromImage(self._preview)
-        p.drawPixmap(int(x0), int(y0), int(draw_w), int(draw_h), pm)
+        self._draw_preview(p, int(x0), int(y0), int(draw_w), int(draw_h))
 
         # Canvas border
-        p.setPen(QPen(QColor(240, 240, 240), 1))
+        p.setPen(self._PEN_BORDER)
         p.drawRect(QRectF(x0, y0, draw_w, draw_h))
 
         if self.show_pixel_grid and self._view_zoom >= 8.0:
             self._draw_pixel_grid(p, x0, y0, draw_w, draw_h, out_w, out_h)
 
+        p.setRenderHint(QPainter.Antialiasing, True)
+        t = self._canvas_transform()
         if self._selection_enabled and self._selection_rect_canvas is not None:
-            self._draw_selection_overlay(p, x0, y0, draw_w, draw_h, out_w, out_h)
+            self._draw_selection_overlay(p, QRectF(x0, y0, draw_w, draw_h), t)
         if self._lasso_points_canvas:
-            self._draw_lasso_preview(p, x0, y0, draw_w, draw_h, out_w, out_h)
+            self._draw_lasso_preview(p, t)
 
         # Help overlay
-        p.setPen(QPen(QColor(220, 220, 220)))
+        p.setPen(self._PEN_TEXT)
         msg = "Wheel: view zoom | Middle-drag: pan view | Ctrl+Wheel: image zoom | Left-drag: move image"
         if self.eyedropper_enabled:
             msg = "Eyedropper ON: click image to sample color | " + msg
@@ -154,46 +266,69 @@ class CanvasWidget(QWidget):
             msg = "Paint tool ON: drag to paint alpha mask | " + msg
         p.drawText(10, self.height() - 10, msg)
 
-    def _draw_checkerboard(self, p: QPainter, r: QRectF, cell: int) -> None:
+    def _draw_preview(self, p: QPainter, x: int, y: int, w: int, h: int) -> None:
+        pm = self._preview_pm
+        if pm is None or w <= 0 or h <= 0:
+            return
+        if (w, h) == (pm.width(), pm.height()):
+            p.drawPixmap(x, y, pm)
+            return
+        if w * h > _SCALED_PREVIEW_LIMIT:
+            p.drawPixmap(x, y, w, h, pm)
+            return
+        if self._scaled_pm is None or self._scaled_pm_size != (w, h):
+            self._scaled_pm = pm.scaled(w, h, Qt.IgnoreAspectRatio, Qt.FastTransformation)
+            self._scaled_pm_size = (w, h)
+        p.drawPixmap(x, y, self._scaled_pm)
+
+    def _checker_tile_for(self, cell: int) -> QPixmap:
+        if self._checker_tile is None or self._checker_cell != cell:
+            # 2x2 cells of gray 60/90, built as one array instead of painted.
+            tile = np.repeat(np.repeat(_CHECKER_CELLS, cell, axis=0), cell, axis=1)
+            side = 2 * cell
+            img = QImage(tile.data, side, side, side, QImage.Format_Grayscale8)
+            self._checker_tile = QPixmap.fromImage(img)
+            self._checker_cell = cell
+        return self._checker_tile
+
+    def _draw_checkerboard(
+        self, p: QPainter, x0: int, y0: int, x1: int, y1: int, cell: int, dirty: QRect
+    ) -> None:
+        # Integer widget-pixel bounds [x0, x1) x [y0, y1); no QRectF round trip.
         if cell < 4:
             cell = 4
-        c1 = QColor(60, 60, 60)
-        c2 = QColor(90, 90, 90)
 
-        x0 = int(r.left())
-        y0 = int(r.top())
-        x1 = int(r.right())
-        y1 = int(r.bottom())
+        area = QRect(x0, y0, x1 - x0, y1 - y0).intersected(dirty)
+        if area.isEmpty():
+            return
 
-        for y in range(y0, y1, cell):
-            for x in range(x0, x1, cell):
-                use_c1 = ((x // cell) + (y // cell)) % 2 == 0
-                p.fillRect(x, y, cell, cell, c1 if use_c1 else c2)
+        # One native tiled blit instead of a fillRect per cell. The offset keeps
+        # the pattern anchored to the canvas origin (and its parity to the
+        # widget grid) when only part of the canvas is visible.
+        tile = self._checker_tile_for(cell)
+        period = 2 * cell
+        phase = ((x0 // cell) + (y0 // cell)) % 2 * cell
+        p.drawTiledPixmap(
+            area,
+            tile,
+            QPoint((area.left() - x0 + phase) % period, (area.top() - y0) % period),
+        )
 
     def _widget_to_canvas_xy(self, pos: QPoint) -> Optional[Tuple[int, int]]:
         """
         Convert widget coords to output-canvas pixel coords.
         Returns None if outside canvas.
         """
+        inv = self._view_geom()[2]
+        if inv is None:
+            return None
         out_w, out_h = self._out_size
-        cx = self.width() * 0.5 + self._view_pan_x
-        cy = self.height() * 0.5 + self._view_pan_y
-
-        draw_w = out_w * self._view_zoom
-        draw_h = out_h * self._view_zoom
-        x0 = cx - draw_w * 0.5
-        y0 = cy - draw_h * 0.5
-
-        x = pos.x()
-        y = pos.y()
-        if x < x0 or y < y0 or x > x0 + draw_w or y > y0 + draw_h:
+        u, v = inv.map(float(pos.x()), float(pos.y()))
+        if u < 0.0 or v < 0.0 or u > out_w or v > out_h:
             return None
 
-        # Normalize into canvas coords
-        u = (x - x0) / draw_w
-        v = (y - y0) / draw_h
-        cx_px = int(u * out_w)
-        cy_px = int(v * out_h)
+        cx_px = int(u)
+        cy_px = int(v)
         cx_px = max(0, min(out_w - 1, cx_px))
         cy_px = max(0, min(out_h - 1, cy_px))
         return (cx_px, cy_px)
@@ -210,86 +345,103 @@ class CanvasWidget(QWidget):
     ) -> None:
         if out_w <= 0 or out_h <= 0:
             return
-        p.setPen(QPen(QColor(255, 255, 255, 45), 1))
-        step_x = draw_w / float(out_w)
-        step_y = draw_h / float(out_h)
-        for ix in range(1, out_w):
-            x = int(round(x0 + ix * step_x))
-            p.drawLine(x, int(y0), x, int(y0 + draw_h))
-        for iy in range(1, out_h):
-            y = int(round(y0 + iy * step_y))
-            p.drawLine(int(x0), y, int(x0 + draw_w), y)
-
-    def _draw_selection_overlay(
-        self,
-        p: QPainter,
-        x0: float,
-        y0: float,
-        draw_w: float,
-        draw_h: float,
-        out_w: int,
-        out_h: int,
-    ) -> None:
-        if out_w <= 0 or out_h <= 0:
-            return
+        key = (x0, y0, draw_w, draw_h, out_w, out_h, self.width(), self.height())
+        if self._grid_lines_key != key:
+            # Only lines that land inside the widget; the list is reused until
+            # the view or canvas changes.
+            xs = np.rint(x0 + np.arange(1, out_w) * (draw_w / float(out_w))).astype(np.int64)
+            ys = np.rint(y0 + np.arange(1, out_h) * (draw_h / float(out_h))).astype(np.int64)
+            xs = xs[(xs >= 0) & (xs <= self.width())]
+            ys = ys[(ys >= 0) & (ys <= self.height())]
+            top, bottom = int(y0), int(y0 + draw_h)
+            left, right = int(x0), int(x0 + draw_w)
+            lines = [QLine(x, top, x, bottom) for x in xs.tolist()]
+            lines += [QLine(left, y, right, y) for y in ys.tolist()]
+            self._grid_lines = lines
+            self._grid_lines_key = key
+        p.setPen(self._PEN_GRID)
+        p.drawLines(self._grid_lines)
+
+    def _selection_widget_rect(self, t: QTransform) -> Optional[QRectF]:
+        out_w, out_h = self._out_size
+        if out_w <= 0 or out_h <= 0 or self._selection_rect_canvas is None:
+            return None
         cx, cy, cw, ch = self._selection_rect_canvas
-        # Canvas px -> widget px
-        rx = x0 + (cx / float(out_w)) * draw_w
-        ry = y0 + (cy / float(out_h)) * draw_h
-        rw = (cw / float(out_w)) * draw_w
-        rh = (ch / float(out_h)) * draw_h
-        if rw <= 0 or rh <= 0:
+        if cw <= 0 or ch <= 0:
+            return None
+        return t.mapRect(QRectF(cx, cy, cw, ch))
+
+    def _draw_selection_overlay(self, p: QPainter, canvas_rect: QRectF, t: QTransform) -> None:
+        sel = self._selection_widget_rect(t)
+        if sel is None:
             return
+        rx, ry, rw, rh = sel.x(), sel.y(), sel.width(), sel.height()
 
         if self._selection_invert:
-            p.fillRect(QRectF(x0, y0, draw_w, draw_h), QColor(0, 0, 0, 60))
-            p.fillRect(QRectF(rx, ry, rw, rh), QColor(0, 0, 0, 0))
+            p.fillRect(canvas_rect, self._COL_SHADE)
         else:
-            # Shade outside selection
-            p.fillRect(QRectF(x0, y0, draw_w, max(0.0, ry - y0)), QColor(0, 0, 0, 60))
-            p.fillRect(QRectF(x0, ry + rh, draw_w, max(0.0, y0 + draw_h - (ry + rh))), QColor(0, 0, 0, 60))
-            p.fillRect(QRectF(x0, ry, max(0.0, rx - x0), rh), QColor(0, 0, 0, 60))
-            p.fillRect(QRectF(rx + rw, ry, max(0.0, x0 + draw_w - (rx + rw)), rh), QColor(0, 0, 0, 60))
-
-        outer = QPen(QColor(255, 255, 255), 2)
-        outer.setDashPattern([4, 4])
-        outer.setDashOffset(self._ants_phase)
-        p.setPen(outer)
-        p.drawRect(QRectF(rx, ry, rw, rh))
-
-        inner = QPen(QColor(0, 0, 0), 2)
-        inner.setDashPattern([4, 4])
-        inner.setDashOffset(self._ants_phase + 4.0)
-        p.setPen(inner)
-        p.drawRect(QRectF(rx, ry, rw, rh))
-
-    def _draw_lasso_preview(
-        self,
-        p: QPainter,
-        x0: float,
-        y0: float,
-        draw_w: float,
-        draw_h: float,
-        out_w: int,
-        out_h: int,
-    ) -> None:
-        if out_w <= 0 or out_h <= 0:
-            return
-        pts: list[QPoint] = []
-        for cx, cy in self._lasso_points_canvas:
-            x = int(round(x0 + (cx / float(out_w)) * draw_w))
-            y = int(round(y0 + (cy / float(out_h)) * draw_h))
-            pts.append(QPoint(x, y))
-        if not pts:
+            # Shade outside selection: canvas minus selection as one odd-even
+            # path, so a single fill covers the ring without overlapping strips.
+            ring = QPainterPath()
+            ring.setFillRule(Qt.OddEvenFill)
+            ring.addRect(canvas_rect)
+            ring.addRect(sel.intersected(canvas_rect))
+            p.fillPath(ring, self._COL_SHADE)
+
+        # Marching ants: 8px white / 8px black dashes walking clockwise,
+        # blitted from cached 2px tiles instead of stroking two dashed pens.
+        # Offsets are the perimeter distance where each side starts; the
+        # bottom and left sides run backwards along the tile, and -9 maps
+        # the reversed white run onto the tile's white half.
+        tile_h, tile_v = self._ants_tiles()
+        shift = int(self._ants_phase * 2.0)
+        w = int(round(rw))
+        h = int(round(rh))
+        top = QRectF(rx - 1.0, ry - 1.0, rw + 2.0, 2.0)
+        bottom = QRectF(rx - 1.0, ry + rh - 1.0, rw + 2.0, 2.0)
+        left = QRectF(rx - 1.0, ry - 1.0, 2.0, rh + 2.0)
+        right = QRectF(rx + rw - 1.0, ry - 1.0, 2.0, rh + 2.0)
+        p.drawTiledPixmap(top, tile_h, QPointF((shift - 1) % _ANTS_PERIOD, 0))
+        p.drawTiledPixmap(right, tile_v, QPointF(0, (w + shift - 1) % _ANTS_PERIOD))
+        p.drawTiledPixmap(bottom, tile_h, QPointF(-(2 * w + h + shift + 10) % _ANTS_PERIOD, 0))
+        p.drawTiledPixmap(left, tile_v, QPointF(0, -(2 * w + 2 * h + shift + 10) % _ANTS_PERIOD))
+
+    def _ants_tiles(self) -> Tuple[QPixmap, QPixmap]:
+        if self._ants_tile_h is None:
+            strip = np.zeros((2, _ANTS_PERIOD, 4), dtype=np.uint8)
+            strip[..., 3] = 255
+            strip[:, : _ANTS_PERIOD // 2, :3] = 255
+            col = np.ascontiguousarray(strip.transpose(1, 0, 2))
+            self._ants_tile_h = QPixmap.fromImage(
+                QImage(strip.data, _ANTS_PERIOD, 2, _ANTS_PERIOD * 4, QImage.Format_RGBA8888)
+            )
+            self._ants_tile_v = QPixmap.fromImage(QImage(col.data, 2, _ANTS_PERIOD, 8, QImage.Format_RGBA8888))
+        return self._ants_tile_h, self._ants_tile_v
+
+    def _draw_lasso_preview(self, p: QPainter, t: QTransform) -> None:
+        out_w, out_h = self._out_size
+        if out_w <= 0 or out_h <= 0 or not self._lasso_points_canvas:
             return
+        poly = t.map(QPolygonF([QPointF(cx, cy) for cx, cy in self._lasso_points_canvas])).toPolygon()
+
+        # One polyline for the segments and one round-capped point batch for
+        # the vertex dots (radius 3 plus the 2px outline it used to have).
+        p.setPen(self._PEN_LASSO)
+        p.drawPolyline(poly)
+        p.setPen(self._PEN_LASSO_DOTS)
+        p.drawPoints(poly)
 
-        p.setPen(QPen(QColor(80, 210, 255), 2))
-        for i in range(1, len(pts)):
-            p.drawLine(pts[i - 1], pts[i])
+    def resizeEvent(self, e) -> None:
+        super().resizeEvent(e)
+        self._mark_geom_dirty()
 
-        p.setBrush(QBrush(QColor(80, 210, 255)))
-        for pt in pts:
-            p.drawEllipse(pt, 3, 3)
+    def showEvent(self, e) -> None:
+        super().showEvent(e)
+        self._sync_ants_timer()
+
+    def hideEvent(self, e) -> None:
+        super().hideEvent(e)
+        self._sync_ants_timer()
 
     def wheelEvent(self, e) -> None:
         delta = e.angleDelta().y()
@@ -306,7 +458,10 @@ class CanvasWidget(QWidget):
         # View zoom
         factor = 1.1 if delta > 0 else (1.0 / 1.1)
         self._view_zoom = max(0.05, min(20.0, self._view_zoom * factor))
-        self.update()
+        self._mark_geom_dirty()
+        self._schedule_update()
+        if self._on_view_zoom_changed is not None:
+            self._on_view_zoom_changed(self._view_zoom)
         e.accept()
 
     def mousePressEvent(self, e) -> None:
@@ -318,57 +473,73 @@ class CanvasWidget(QWidget):
                 if canvas_xy is not None:
                     self._on_pick_color_at_canvas_pos(canvas_xy[0], canvas_xy[1])
                     self._dragging_pick = True
-                    self._last_pick_canvas_xy = canvas_xy
+                    self._last_pick_x, self._last_pick_y = canvas_xy
                 return
             if self.paint_enabled:
                 canvas_xy = self._widget_to_canvas_xy(self._last_pos)
                 if canvas_xy is not None and self._on_paint_start_at_canvas_pos is not None:
                     self._on_paint_start_at_canvas_pos(canvas_xy[0], canvas_xy[1])
                     self._dragging_paint = True
-                    self._last_paint_canvas_xy = canvas_xy
+                    self._last_paint_x, self._last_paint_y = canvas_xy
                 return
             self._dragging_left = True
         elif e.button() == Qt.MiddleButton:
             self._dragging_mid = True
 
     def mouseMoveEvent(self, e) -> None:
+        # Runs at mouse-poll rate, including plain hover: keep it to locals and
+        # int compares.
         pos = e.position().toPoint()
-        dx = pos.x() - self._last_pos.x()
-        dy = pos.y() - self._last_pos.y()
+        last = self._last_pos
+        dx = pos.x() - last.x()
+        dy = pos.y() - last.y()
+        if dx == 0 and dy == 0:
+            # Sub-pixel or duplicate move: nothing to drag, pick or repaint.
+            return
         self._last_pos = pos
 
         if self._dragging_left:
             # Convert widget pixels to canvas pixels based on view zoom
-            if self._view_zoom > 1e-6:
-                self._on_move_image(dx / self._view_zoom, dy / self._view_zoom)
+            zoom = self._view_zoom
+            if zoom > 1e-6:
+                self._on_move_image(dx / zoom, dy / zoom)
         elif self._dragging_pick:
-            if self._on_pick_drag_at_canvas_pos is not None:
+            cb = self._on_pick_drag_at_canvas_pos
+            if cb is not None:
                 canvas_xy = self._widget_to_canvas_xy(pos)
-                if canvas_xy is not None and canvas_xy != self._last_pick_canvas_xy:
-                    self._on_pick_drag_at_canvas_pos(canvas_xy[0], canvas_xy[1])
-                    self._last_pick_canvas_xy = canvas_xy
+                if canvas_xy is not None:
+                    cx, cy = canvas_xy
+                    if cx != self._last_pick_x or cy != self._last_pick_y:
+                        cb(cx, cy)
+                        self._last_pick_x = cx
+                        self._last_pick_y = cy
         elif self._dragging_paint:
-            if self._on_paint_drag_at_canvas_pos is not None:
+            cb = self._on_paint_drag_at_canvas_pos
+            if cb is not None:
                 canvas_xy = self._widget_to_canvas_xy(pos)
-                if canvas_xy is not None and canvas_xy != self._last_paint_canvas_xy:
-                    self._on_paint_drag_at_canvas_pos(canvas_xy[0], canvas_xy[1])
-                    self._last_paint_canvas_xy = canvas_xy
+                if canvas_xy is not None:
+                    cx, cy = canvas_xy
+                    if cx != self._last_paint_x or cy != self._last_paint_y:
+                        cb(cx, cy)
+                        self._last_paint_x = cx
+                        self._last_paint_y = cy
         elif self._dragging_mid:
             self._view_pan_x += dx
             self._view_pan_y += dy
-            self.update()
+            self._mark_geom_dirty()
+            self._schedule_update()
 
     def mouseReleaseEvent(self, e) -> None:
         if e.button() == Qt.LeftButton:
             self._dragging_left = False
             if self._dragging_pick:
                 self._dragging_pick = False
-                self._last_pick_canvas_xy = None
+                self._last_pick_x = self._last_pick_y = -1
                 if self._on_pick_finish is not None:
                     self._on_pick_finish()
             if self._dragging_paint:
                 self._dragging_paint = False
-                self._last_paint_canvas_xy = None
+                self._last_paint_x = self._last_paint_y = -1
                 if self._on_paint_finish is not None:
                     self._on_paint_finish()
         elif e.button() == Qt.MiddleButton:
@@ -376,4 +547,26 @@ class CanvasWidget(QWidget):
 
     def _advance_ants(self) -> None:
         self._ants_phase = (self._ants_phase + 1.0) % 8.0
-        self.update()
+        if self._preview is None:
+            return
+        # Minimized or fully covered: nothing on screen would change. Only
+        # the top-level window sees WindowStateChange, so check at tick time.
+        if self.window().isMinimized() or self.visibleRegion().isEmpty():
+            return
+        sel = self._selection_widget_rect(self._canvas_transform())
+        if sel is None:
+            return
+        # Only the dashed border moves: repaint its four edge strips (the 2px
+        # pen straddles each edge, plus a pixel for antialiasing/rounding).
+        rx, ry, rw, rh = sel.x(), sel.y(), sel.width(), sel.height()
+        left = int(rx) - 2
+        top = int(ry) - 2
+        right = int(rx + rw) - 2
+        bottom = int(ry + rh) - 2
+        width = right - left + 5
+        height = bottom - top + 5
+        border = QRegion(left, top, width, 5)
+        border += QRegion(left, bottom, width, 5)
+        border += QRegion(left, top, 5, height)
+        border += QRegion(right, top, 5, height)
+        self.update(border)
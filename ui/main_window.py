@@ -1,17 +1,19 @@
 ﻿from __future__ import annotations
-from copy import deepcopy
+from collections import deque
+from dataclasses import fields, replace
 import base64
 import io
+import math
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 import random
 import numpy as np
 from PIL import Image
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QObject, QRunnable, QSignalBlocker, Qt, QThreadPool, QTimer, Signal
 from PySide6.QtGui import QAction, QImage, QKeySequence, QIcon
 from PySide6.QtWidgets import (
-    QMainWindow, QWidget, QFileDialog, QVBoxLayout, QHBoxLayout, QLabel,
+    QApplication, QMainWindow, QWidget, QFileDialog, QVBoxLayout, QHBoxLayout, QLabel,
     QSpinBox, QSlider, QCheckBox, QPushButton, QMessageBox, QDockWidget, QDoubleSpinBox, QComboBox, QInputDialog,
     QGroupBox, QScrollArea, QListWidget, QListWidgetItem
 )
@@ -19,7 +21,7 @@ from PySide6.QtWidgets import (
 from core.state import ProjectState, PaletteColor, LayerState, BrushPreset
 from core.io import load_image_rgba, save_image
 from core.project_io import save_project, load_project
-from core.compositor import composite_layers_to_canvas, LayerRenderInput
+from core.compositor import composite_layers_to_array, composite_layers_to_canvas, np_rgba_to_pil, LayerRenderInput
 from core.batch import batch_export_with_state
 from core.selection import (
     magic_wand_mask,
@@ -27,17 +29,120 @@ from core.selection import (
     polygon_mask,
     bounding_rect,
     combine_selection_masks,
+    combine_rect_selection,
+    PackedMask,
+    pack_mask,
+    unpack_mask,
 )
 from ui.canvas_widget import CanvasWidget
 from ui.palette_widget import PaletteWidget
 
-def pil_rgba_to_qimage(img: Image.Image) -> QImage:
-    img = img.convert("RGBA")
-    w, h = img.size
-    data = img.tobytes("raw", "RGBA")
-    qimg = QImage(data, w, h, QImage.Format_RGBA8888)
-    # Important: keep a copy because Python-owned bytes may be freed
-    return qimg.copy()
+def np_rgba_to_qimage(arr: np.ndarray) -> QImage:
+    if arr.dtype != np.uint8 or arr.ndim != 3 or arr.shape[2] != 4:
+        raise ValueError("Expected HxWx4 uint8 RGBA array")
+    arr = np.ascontiguousarray(arr)
+    h, w = arr.shape[:2]
+    # Wraps the array's memory directly (no copy); the canvas converts it to its
+    # native format once in set_preview.
+    qimg = QImage(arr.data, w, h, arr.strides[0], QImage.Format_RGBA8888)
+    # The QImage does not own the buffer, so keep the array alive alongside it.
+    qimg._backing = arr
+    return qimg
+
+def _render_input_key(layer: LayerRenderInput) -> tuple:
+    # Images and masks compare by identity; the cache entry keeps them alive so
+    # their ids cannot be reused while the key is in use.
+    key = []
+    for f in fields(layer):
+        v = getattr(layer, f.name)
+        if isinstance(v, (np.ndarray, Image.Image)):
+            v = id(v)
+        elif isinstance(v, list):
+            v = tuple(v)
+        key.append(v)
+    return tuple(key)
+
+
+def _frozen_render_input(layer: LayerRenderInput) -> LayerRenderInput:
+    # The worker composites while the UI thread keeps stamping dabs into the
+    # live masks; hand it read-only copies of any mask that can still change.
+    changes = {}
+    for f in fields(layer):
+        v = getattr(layer, f.name)
+        if isinstance(v, np.ndarray) and v.flags.writeable:
+            v = v.copy()
+            v.flags.writeable = False
+            changes[f.name] = v
+    return replace(layer, **changes) if changes else layer
+
+
+def _sync_value(widget: QSlider | QSpinBox | QDoubleSpinBox, value: float) -> None:
+    # Programmatic update: skip widgets already showing the value, and keep the
+    # change from re-entering the edit handlers.
+    if widget.value() != value:
+        with QSignalBlocker(widget):
+            widget.setValue(value)
+
+
+def _sync_checked(widget: QCheckBox, checked: bool) -> None:
+    if widget.isChecked() != checked:
+        with QSignalBlocker(widget):
+            widget.setChecked(checked)
+
+
+def _sync_index(widget: QComboBox, index: int) -> None:
+    if widget.currentIndex() != index:
+        with QSignalBlocker(widget):
+            widget.setCurrentIndex(index)
+
+
+_INTERACTIVE_PREVIEW_SCALE = 0.5
+
+
+def _preview_reducing_gap(scale: float) -> Optional[float]:
+    # Reduced (zoomed-out) previews take Pillow's thumbnail() shortcut for big
+    # downscales; full-size previews stay identical to the export.
+    return 2.0 if scale < 1.0 else None
+
+
+class _RenderSignals(QObject):
+    # (generation, HxWx4 canvas or None on failure); queued to the UI thread.
+    done = Signal(int, object)
+
+
+class _RenderTask(QRunnable):
+    def __init__(
+        self,
+        generation: int,
+        layers: list[LayerRenderInput],
+        out_size: tuple[int, int],
+        high_quality: bool,
+        nearest_neighbor: bool,
+        reducing_gap: Optional[float],
+        signals: _RenderSignals,
+    ):
+        super().__init__()
+        self._generation = generation
+        self._layers = layers
+        self._out_size = out_size
+        self._high_quality = high_quality
+        self._nearest_neighbor = nearest_neighbor
+        self._reducing_gap = reducing_gap
+        self._signals = signals
+
+    def run(self) -> None:
+        try:
+            arr = composite_layers_to_array(
+                layers=self._layers,
+                out_size=self._out_size,
+                high_quality=self._high_quality,
+                nearest_neighbor=self._nearest_neighbor,
+                reducing_gap=self._reducing_gap,
+            )
+        except Exception:
+            # The UI thread re-runs the render synchronously to surface the error.
+            arr = None
+        self._signals.done.emit(self._generation, arr)
 
 class MainWindow(QMainWindow):
     def __init__(self, logo_path: Optional[Path] = None):
@@ -47,28 +152,80 @@ class MainWindow(QMainWindow):
             if logo_path is not None
             else (Path(__file__).resolve().parent.parent / "assets" / "Logo.png")
         )
-        if self._logo_path.exists():
+        # Top-level windows inherit the application icon; only decode the logo
+        # again when the app has not already loaded it.
+        if QApplication.windowIcon().isNull() and self._logo_path.exists():
             self.setWindowIcon(QIcon(str(self._logo_path)))
         self.setWindowTitle("OpenPixMod v0.2")
 
         self.state = ProjectState()
         self._layer_images: list[Optional[Image.Image]] = [None]
         self._layer_alpha_masks: list[Optional[np.ndarray]] = [None]
-        self._preview_img: Optional[Image.Image] = None
+        self._preview_arr: Optional[np.ndarray] = None
         self._project_path: Optional[str] = None
-        self._undo_stack: list[tuple[ProjectState, Optional[np.ndarray], list[tuple[int, int]], list[Optional[Image.Image]], list[Optional[np.ndarray]]]] = []
-        self._redo_stack: list[tuple[ProjectState, Optional[np.ndarray], list[tuple[int, int]], list[Optional[Image.Image]], list[Optional[np.ndarray]]]] = []
         self._history_limit = 100
+        # History entries share masks and images with the live document; see _history_entry.
+        self._undo_stack: deque[tuple[ProjectState, Optional[PackedMask], list[tuple[int, int]], list[Optional[Image.Image]], list[Optional[np.ndarray]]]] = deque(maxlen=self._history_limit)
+        self._redo_stack: deque[tuple[ProjectState, Optional[PackedMask], list[tuple[int, int]], list[Optional[Image.Image]], list[Optional[np.ndarray]]]] = deque(maxlen=self._history_limit)
         self._restoring_state = False
-        self._snapshots: dict[str, tuple[ProjectState, Optional[np.ndarray], list[tuple[int, int]], list[Optional[Image.Image]], list[Optional[np.ndarray]]]] = {}
+        self._snapshots: dict[str, tuple[ProjectState, Optional[PackedMask], list[tuple[int, int]], list[Optional[Image.Image]], list[Optional[np.ndarray]]]] = {}
         self._pick_mode: str = "eyedropper"
         self._selection_mask: Optional[np.ndarray] = None
+        # (live selection mask, its packed form) so consecutive history entries
+        # share one PackedMask while the selection is unchanged.
+        self._packed_selection: Optional[tuple[np.ndarray, PackedMask]] = None
+        # (mask, _mask_version, bounding rect) for the selection overlay.
+        self._selection_rect_cache: Optional[tuple[np.ndarray, int, Optional[tuple[int, int, int, int]]]] = None
+        # State clone from the latest history entry; entries never mutate their
+        # state, so an unchanged document reuses it instead of cloning again.
+        self._history_state: Optional[ProjectState] = None
         self._lasso_points: list[tuple[int, int]] = []
+        # (points list, placement, canvas points) -- the list only ever grows by
+        # append, so a drag maps just the new points on each redraw.
+        self._lasso_canvas_cache: Optional[tuple[list, tuple, list[tuple[float, float]]]] = None
+        # (points list, xmin, ymin, xmax, ymax), grown point by point while dragging.
+        self._lasso_extent: Optional[tuple[list, int, int, int, int]] = None
+        # (points list, rect selection as (x, y, w, h) or None) from before the
+        # path started; the drag overwrites sel_* with the path's bounding box.
+        self._lasso_base_rect: Optional[tuple[list, Optional[tuple[int, int, int, int]]]] = None
         self._painting_active = False
         self._paint_changed = False
         self._paint_last_src_xy: Optional[tuple[int, int]] = None
         self._paint_rng = random.Random(0)
         self._paint_stroke_seed = 0
+        # Bumped whenever an alpha or selection mask is edited in place, since
+        # the render cache only tracks masks by identity.
+        self._mask_version = 0
+        self._source_pixels_cache: Optional[tuple[Image.Image, np.ndarray]] = None
+        # compare_before -> (key, render inputs kept alive for the ids, canvas array)
+        self._render_cache: dict[bool, tuple[tuple, list[LayerRenderInput], np.ndarray]] = {}
+        self._render_shown: Optional[bool] = None
+        self._preview_scale_used = 1.0
+        # True while a slider handle is held; previews drop to a reduced size.
+        self._interacting = False
+        # Slider and spinbox drags emit a value per step; coalesce them into
+        # at most one composite per interval.
+        self._rerender_timer = QTimer(self)
+        self._rerender_timer.setSingleShot(True)
+        self._rerender_timer.setInterval(25)
+        self._rerender_timer.timeout.connect(self._rerender_async)
+        # Timer-driven renders composite on a worker; results from a superseded
+        # generation are dropped when they arrive.
+        self._render_pool = QThreadPool(self)
+        self._render_pool.setMaxThreadCount(1)
+        self._render_signals = _RenderSignals(self)
+        self._render_signals.done.connect(self._on_render_done)
+        self._render_generation = 0
+        self._render_busy = False
+        self._render_again = False
+        self._render_pending: Optional[tuple[bool, float, tuple[int, int], tuple, list[LayerRenderInput]]] = None
+        # A drag on one control keeps a single undo entry (the value before the
+        # drag) until the control has been idle for the interval.
+        self._undo_coalesce_key: Optional[str] = None
+        self._undo_coalesce_timer = QTimer(self)
+        self._undo_coalesce_timer.setSingleShot(True)
+        self._undo_coalesce_timer.setInterval(400)
+        self._undo_coalesce_timer.timeout.connect(self._end_undo_coalesce)
 
         self._act_undo: Optional[QAction] = None
         self._act_redo: Optional[QAction] = None
@@ -83,6 +240,7 @@ class MainWindow(QMainWindow):
             on_paint_start_at_canvas_pos=self._paint_start_at_canvas_xy,
             on_paint_drag_at_canvas_pos=self._paint_drag_at_canvas_xy,
             on_paint_finish=self._paint_finish,
+            on_view_zoom_changed=self._on_view_zoom_changed,
         )
         self.canvas.setAcceptDrops(True)
 
@@ -222,7 +380,7 @@ class MainWindow(QMainWindow):
     def _duplicate_layer(self) -> None:
         self._push_undo_state()
         i = self.state.active_layer_index
-        src_layer = deepcopy(self.state.layers[i])
+        src_layer = self.state.layers[i].clone()
         src_layer.name = f"{src_layer.name} Copy"
         self.state.layers.insert(i, src_layer)
         self._layer_images.insert(i, None if self._layer_images[i] is None else self._layer_images[i].copy())
@@ -507,17 +665,16 @@ class MainWindow(QMainWindow):
         self.tol = QSlider(Qt.Horizontal)
         self.tol.setRange(0, 441)
         self.tol.setValue(self.state.tolerance)
-        self.tol.valueChanged.connect(self._on_tol_slider_changed)
         self.tol_spin = QSpinBox()
         self.tol_spin.setRange(0, 441)
         self.tol_spin.setValue(self.state.tolerance)
-        self.tol_spin.valueChanged.connect(self._on_tol_spin_changed)
         self.tol_val = QLabel(str(self.state.tolerance))
         self.tol_val.setMinimumWidth(40)
         self.tol_val.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
         tol_row.addWidget(self.tol, 1)
         tol_row.addWidget(self.tol_spin, 0)
         tol_row.addWidget(self.tol_val, 0)
+        self._bind_slider_spin(self.tol, self.tol_spin, self.tol_val, "tolerance")
         gl_key.addLayout(tol_row)
         mode_row = QHBoxLayout()
         mode_row.addWidget(QLabel("Mode"))
@@ -558,32 +715,30 @@ class MainWindow(QMainWindow):
         self.grow = QSlider(Qt.Horizontal)
         self.grow.setRange(-20, 20)
         self.grow.setValue(int(self.state.mask_grow_shrink))
-        self.grow.valueChanged.connect(self._on_grow_slider_changed)
         self.grow_spin = QSpinBox()
         self.grow_spin.setRange(-20, 20)
         self.grow_spin.setValue(int(self.state.mask_grow_shrink))
-        self.grow_spin.valueChanged.connect(self._on_grow_spin_changed)
         self.grow_val = QLabel(str(int(self.state.mask_grow_shrink)))
         self.grow_val.setMinimumWidth(45)
         grow_row.addWidget(self.grow, 1)
         grow_row.addWidget(self.grow_spin, 0)
         grow_row.addWidget(self.grow_val, 0)
+        self._bind_slider_spin(self.grow, self.grow_spin, self.grow_val, "mask_grow_shrink")
         gl_key.addLayout(grow_row)
         feather_row = QHBoxLayout()
         feather_row.addWidget(QLabel("Feather"))
         self.feather = QSlider(Qt.Horizontal)
         self.feather.setRange(0, 20)
         self.feather.setValue(int(self.state.mask_feather_radius))
-        self.feather.valueChanged.connect(self._on_feather_slider_changed)
         self.feather_spin = QSpinBox()
         self.feather_spin.setRange(0, 20)
         self.feather_spin.setValue(int(self.state.mask_feather_radius))
-        self.feather_spin.valueChanged.connect(self._on_feather_spin_changed)
         self.feather_val = QLabel(str(int(self.state.mask_feather_radius)))
         self.feather_val.setMinimumWidth(45)
         feather_row.addWidget(self.feather, 1)
         feather_row.addWidget(self.feather_spin, 0)
         feather_row.addWidget(self.feather_val, 0)
+        self._bind_slider_spin(self.feather, self.feather_spin, self.feather_val, "mask_feather_radius")
         gl_key.addLayout(feather_row)
         islands_row = QHBoxLayout()
         islands_row.addWidget(QLabel("Remove islands < px"))
@@ -606,17 +761,16 @@ class MainWindow(QMainWindow):
         self.opacity = QSlider(Qt.Horizontal)
         self.opacity.setRange(0, 100)
         self.opacity.setValue(int(round(self.state.opacity * 100)))
-        self.opacity.valueChanged.connect(self._on_opacity_slider_changed)
         self.opacity_spin = QSpinBox()
         self.opacity_spin.setRange(0, 100)
         self.opacity_spin.setSuffix("%")
         self.opacity_spin.setValue(int(round(self.state.opacity * 100)))
-        self.opacity_spin.valueChanged.connect(self._on_opacity_spin_changed)
         self.opacity_val = QLabel(f"{int(round(self.state.opacity * 100))}%")
         self.opacity_val.setMinimumWidth(55)
         op_row.addWidget(self.opacity, 1)
         op_row.addWidget(self.opacity_spin, 0)
         op_row.addWidget(self.opacity_val, 0)
+        self._bind_slider_spin(self.opacity, self.opacity_spin, self.opacity_val, "opacity", lambda v: f"{v}%", 100)
         gl_adj.addLayout(op_row)
         self.hq = QCheckBox("High quality resample (Lanczos)")
         self.hq.setChecked(self.state.high_quality_resample)
@@ -668,6 +822,38 @@ class MainWindow(QMainWindow):
         self._add_labeled_row(gl_adj, "Temperature", self.temperature_spin)
         v.addWidget(g_adj)
 
+        g_flow, gl_flow = self._make_group("Workflow")
+        snap_row = QHBoxLayout()
+        self.snapshot_combo = QComboBox()
+        snap_row.addWidget(self.snapshot_combo, 1)
+        self.snap_save_btn = QPushButton("Save Snap")
+        self.snap_save_btn.clicked.connect(self._save_snapshot)
+        snap_row.addWidget(self.snap_save_btn)
+        self.snap_load_btn = QPushButton("Load Snap")
+        self.snap_load_btn.clicked.connect(self._load_snapshot)
+        snap_row.addWidget(self.snap_load_btn)
+        gl_flow.addLayout(snap_row)
+        self.compare_chk = QCheckBox("Before/After Compare")
+        self.compare_chk.setChecked(False)
+        self.compare_chk.toggled.connect(self._rerender)
+        gl_flow.addWidget(self.compare_chk)
+        v.addWidget(g_flow)
+
+        v.addStretch(1)
+        scroll.setWidget(panel)
+        root_lay.addWidget(scroll)
+        dock.setWidget(root)
+        self.addDockWidget(Qt.RightDockWidgetArea, dock)
+        for slider in (self.tol, self.grow, self.feather, self.opacity):
+            slider.sliderPressed.connect(self._begin_interaction)
+            slider.sliderReleased.connect(self._end_interaction)
+        self._controls_layout = v
+        self._workflow_group = g_flow
+        # Paint widgets are only needed once painting starts and every caller
+        # already checks for them, so they are built on the first event-loop pass.
+        QTimer.singleShot(0, self._build_paint_group)
+
+    def _build_paint_group(self) -> None:
         g_paint, gl_paint = self._make_group("Paint / Retouch")
         self.paint_enable_chk = QCheckBox("Enable paint tools")
         self.paint_enable_chk.toggled.connect(self._on_paint_controls_changed)
@@ -774,30 +960,9 @@ class MainWindow(QMainWindow):
         sym_row.addWidget(self.paint_sym_y_chk)
         gl_paint.addLayout(sym_row)
 
-        v.addWidget(g_paint)
+        layout = self._controls_layout
+        layout.insertWidget(layout.indexOf(self._workflow_group), g_paint)
         self._refresh_brush_preset_combo(self.state.active_brush_id)
-        g_flow, gl_flow = self._make_group("Workflow")
-        snap_row = QHBoxLayout()
-        self.snapshot_combo = QComboBox()
-        snap_row.addWidget(self.snapshot_combo, 1)
-        self.snap_save_btn = QPushButton("Save Snap")
-        self.snap_save_btn.clicked.connect(self._save_snapshot)
-        snap_row.addWidget(self.snap_save_btn)
-        self.snap_load_btn = QPushButton("Load Snap")
-        self.snap_load_btn.clicked.connect(self._load_snapshot)
-        snap_row.addWidget(self.snap_load_btn)
-        gl_flow.addLayout(snap_row)
-        self.compare_chk = QCheckBox("Before/After Compare")
-        self.compare_chk.setChecked(False)
-        self.compare_chk.toggled.connect(self._rerender)
-        gl_flow.addWidget(self.compare_chk)
-        v.addWidget(g_flow)
-
-        v.addStretch(1)
-        scroll.setWidget(panel)
-        root_lay.addWidget(scroll)
-        dock.setWidget(root)
-        self.addDockWidget(Qt.RightDockWidgetArea, dock)
 
     # ---------------------------
     # File IO
@@ -811,7 +976,8 @@ class MainWindow(QMainWindow):
         self._load_path(path)
 
     def save_as(self) -> None:
-        if self._preview_img is None:
+        self._flush_rerender()
+        if self._preview_arr is None:
             QMessageBox.information(self, "Nothing to save", "Load an image first.")
             return
 
@@ -822,40 +988,7 @@ class MainWindow(QMainWindow):
             return
 
         # Render full-res export from current state
-        self._sync_layer_image_slots()
-        export_layers: list[LayerRenderInput] = []
-        for i, layer in enumerate(self.state.layers):
-            export_layers.append(
-                LayerRenderInput(
-                    src_rgba_pil=self._layer_images[i] if i < len(self._layer_images) else None,
-                    visible=layer.visible,
-                    blend_mode=layer.blend_mode,
-                    img_scale=layer.img_scale,
-                    img_offset=(layer.img_off_x, layer.img_off_y),
-                    rotation_deg=layer.rotation_deg,
-                    palette_rgbs=layer.enabled_palette_rgbs(),
-                    tolerance=layer.tolerance,
-                    opacity=layer.opacity,
-                    color_key_mode=layer.color_key_mode,
-                    hsv_h_tol=layer.hsv_h_tol,
-                    hsv_s_tol=layer.hsv_s_tol,
-                    hsv_v_tol=layer.hsv_v_tol,
-                    mask_grow_shrink=layer.mask_grow_shrink,
-                    mask_feather_radius=layer.mask_feather_radius,
-                    remove_islands_min_size=layer.remove_islands_min_size,
-                    brightness=layer.brightness,
-                    contrast=layer.contrast,
-                    saturation=layer.saturation,
-                    gamma=layer.gamma,
-                    vibrance=layer.vibrance,
-                    temperature=layer.temperature,
-                    selection_enabled=self.state.selection_enabled and i == self.state.active_layer_index,
-                    selection_invert=self.state.selection_invert,
-                    selection_rect=(self.state.sel_x, self.state.sel_y, self.state.sel_w, self.state.sel_h),
-                    selection_mask=self._selection_mask if i == self.state.active_layer_index else None,
-                    alpha_paint_mask=self._layer_alpha_masks[i] if i < len(self._layer_alpha_masks) else None,
-                )
-            )
+        export_layers = self._layer_render_inputs()
         export_img = composite_layers_to_canvas(
             layers=export_layers,
             out_size=(self.state.out_w, self.state.out_h),
@@ -868,7 +1001,7 @@ class MainWindow(QMainWindow):
             if ext in {".jpg", ".jpeg"}:
                 # JPG has no alpha, so flatten onto white.
                 flat = Image.new("RGB", export_img.size, (255, 255, 255))
-                flat.paste(export_img.convert("RGBA"), mask=export_img.split()[3])
+                flat.paste(export_img, mask=export_img.split()[3])
                 flat.save(path, quality=95)
             else:
                 save_image(path, export_img)
@@ -900,7 +1033,7 @@ class MainWindow(QMainWindow):
                 except Exception as e:
                     src_error = str(e)
             loaded_images.append(img)
-            loaded_alpha_masks.append(self._decode_alpha_mask_data(layer.alpha_paint_mask_data, img.size if img is not None else None))
+            loaded_alpha_masks.append(self._load_layer_alpha_mask(layer, img.size if img is not None else None))
 
         self.state = loaded_state
         self._layer_images = loaded_images
@@ -952,6 +1085,7 @@ class MainWindow(QMainWindow):
         self._src_img = img
         self._layer_alpha_masks[self.state.active_layer_index] = None
         self.state.active_layer().alpha_paint_mask_data = None
+        self.state.active_layer().alpha_paint_mask_path = None
         self._project_path = None
         self._selection_mask = None
         self._lasso_points = []
@@ -1001,33 +1135,95 @@ class MainWindow(QMainWindow):
         if path:
             self._load_path(path)
 
-    def _push_undo_state(self) -> None:
+    def _history_entry(
+        self,
+    ) -> tuple[ProjectState, Optional[PackedMask], list[tuple[int, int]], list[Optional[Image.Image]], list[Optional[np.ndarray]]]:
+        # Masks and layer images are shared by reference rather than copied.
+        # Layer images are never modified in place; masks are frozen here so an
+        # in-place edit fails loudly, and editors copy a frozen mask before
+        # writing to it (copy-on-write).
+        for mk in (self._selection_mask, *self._layer_alpha_masks):
+            if mk is not None:
+                mk.flags.writeable = False
+        state = self._history_state
+        if state is None or state != self.state:
+            state = self.state.clone()
+            self._history_state = state
+        return (
+            state,
+            self._packed_selection_mask(),
+            list(self._lasso_points),
+            list(self._layer_images),
+            list(self._layer_alpha_masks),
+        )
+
+    @staticmethod
+    def _same_history_entry(a: tuple, b: tuple) -> bool:
+        # Masks and images are frozen or immutable once in history, so identity
+        # is enough for them; only the state and lasso need a field compare.
+        return (
+            a[1] is b[1]
+            and len(a[3]) == len(b[3])
+            and all(x is y for x, y in zip(a[3], b[3]))
+            and len(a[4]) == len(b[4])
+            and all(x is y for x, y in zip(a[4], b[4]))
+            and a[2] == b[2]
+            and (a[0] is b[0] or a[0] == b[0])
+        )
+
+    def _packed_selection_mask(self) -> Optional[PackedMask]:
+        # The selection is stored in history at one bit per pixel. It is frozen
+        # before packing, so a cached packing stays valid for the same array.
+        mask = self._selection_mask
+        if mask is None:
+            return None
+        cached = self._packed_selection
+        if cached is None or cached[0] is not mask:
+            cached = (mask, pack_mask(mask))
+            self._packed_selection = cached
+        return cached[1]
+
+    def _push_undo_state(self, coalesce_key: Optional[str] = None) -> None:
         if self._restoring_state:
             return
-        mask_copy = None if self._selection_mask is None else self._selection_mask.copy()
-        lasso_copy = list(self._lasso_points)
-        imgs_copy = [None if img is None else img.copy() for img in self._layer_images]
-        alpha_copy = [None if mk is None else mk.copy() for mk in self._layer_alpha_masks]
-        self._undo_stack.append((deepcopy(self.state), mask_copy, lasso_copy, imgs_copy, alpha_copy))
-        if len(self._undo_stack) > self._history_limit:
-            self._undo_stack.pop(0)
+        if coalesce_key is not None:
+            self._undo_coalesce_timer.start()
+            if coalesce_key == self._undo_coalesce_key:
+                return
+        self._undo_coalesce_key = coalesce_key
+        entry = self._history_entry()
+        # Handlers push before they know whether anything changes; an entry
+        # identical to the last one would only be an undo step that does nothing.
+        if not (self._undo_stack and self._same_history_entry(self._undo_stack[-1], entry)):
+            self._undo_stack.append(entry)
         self._redo_stack.clear()
         self._update_undo_redo_actions()
 
+    def _end_undo_coalesce(self) -> None:
+        self._undo_coalesce_key = None
+
     def _apply_state(
         self,
         state: ProjectState,
-        selection_mask: Optional[np.ndarray],
+        selection_mask: Optional[PackedMask],
         lasso_points: list[tuple[int, int]],
         layer_images: list[Optional[Image.Image]],
         layer_alpha_masks: list[Optional[np.ndarray]],
     ) -> None:
         self._restoring_state = True
-        self.state = deepcopy(state)
-        self._selection_mask = None if selection_mask is None else selection_mask.copy()
+        self._undo_coalesce_key = None
+        self.state = state.clone()
+        self._history_state = state
+        if selection_mask is None:
+            self._selection_mask = None
+        else:
+            mask = unpack_mask(selection_mask)
+            mask.flags.writeable = False
+            self._selection_mask = mask
+            self._packed_selection = (mask, selection_mask)
         self._lasso_points = list(lasso_points)
-        self._layer_images = [None if img is None else img.copy() for img in layer_images]
-        self._layer_alpha_masks = [None if mk is None else mk.copy() for mk in layer_alpha_masks]
+        self._layer_images = list(layer_images)
+        self._layer_alpha_masks = list(layer_alpha_masks)
         self._sync_layer_image_slots()
         self._sync_ui_from_state()
         self._restoring_state = False
@@ -1036,10 +1232,7 @@ class MainWindow(QMainWindow):
     def _undo(self) -> None:
         if not self._undo_stack:
             return
-        cur_mask = None if self._selection_mask is None else self._selection_mask.copy()
-        cur_imgs = [None if img is None else img.copy() for img in self._layer_images]
-        cur_alpha = [None if mk is None else mk.copy() for mk in self._layer_alpha_masks]
-        self._redo_stack.append((deepcopy(self.state), cur_mask, list(self._lasso_points), cur_imgs, cur_alpha))
+        self._redo_stack.append(self._history_entry())
         prev_state, prev_mask, prev_lasso, prev_imgs, prev_alpha = self._undo_stack.pop()
         self._apply_state(prev_state, prev_mask, prev_lasso, prev_imgs, prev_alpha)
         self._update_undo_redo_actions()
@@ -1047,163 +1240,97 @@ class MainWindow(QMainWindow):
     def _redo(self) -> None:
         if not self._redo_stack:
             return
-        cur_mask = None if self._selection_mask is None else self._selection_mask.copy()
-        cur_imgs = [None if img is None else img.copy() for img in self._layer_images]
-        cur_alpha = [None if mk is None else mk.copy() for mk in self._layer_alpha_masks]
-        self._undo_stack.append((deepcopy(self.state), cur_mask, list(self._lasso_points), cur_imgs, cur_alpha))
+        self._undo_stack.append(self._history_entry())
         nxt_state, nxt_mask, nxt_lasso, nxt_imgs, nxt_alpha = self._redo_stack.pop()
         self._apply_state(nxt_state, nxt_mask, nxt_lasso, nxt_imgs, nxt_alpha)
         self._update_undo_redo_actions()
 
     def _update_undo_redo_actions(self) -> None:
-        if self._act_undo is not None:
-            self._act_undo.setEnabled(bool(self._undo_stack))
-        if self._act_redo is not None:
-            self._act_redo.setEnabled(bool(self._redo_stack))
+        # Runs after every render; only flip actions whose state changed, since
+        # each setEnabled notifies every menu and toolbar showing the action.
+        for act, on in ((self._act_undo, bool(self._undo_stack)), (self._act_redo, bool(self._redo_stack))):
+            if act is not None and act.isEnabled() != on:
+                act.setEnabled(on)
 
     def _sync_ui_from_state(self) -> None:
+        # Only widgets whose value differs are touched (signals blocked), so an
+        # undo of one slider does not reset and repaint every control.
         if hasattr(self, "layers_list"):
             self._refresh_layers_ui()
-        self.out_w.blockSignals(True)
-        self.out_h.blockSignals(True)
-        self.out_w.setValue(int(self.state.out_w))
-        self.out_h.setValue(int(self.state.out_h))
-        self.out_w.blockSignals(False)
-        self.out_h.blockSignals(False)
+        _sync_value(self.out_w, int(self.state.out_w))
+        _sync_value(self.out_h, int(self.state.out_h))
 
-        self.tol.blockSignals(True)
-        self.tol_spin.blockSignals(True)
-        self.tol.setValue(int(self.state.tolerance))
-        self.tol_spin.setValue(int(self.state.tolerance))
-        self.tol.blockSignals(False)
-        self.tol_spin.blockSignals(False)
+        _sync_value(self.tol, int(self.state.tolerance))
+        _sync_value(self.tol_spin, int(self.state.tolerance))
         self.tol_val.setText(str(int(self.state.tolerance)))
 
         mode_index = self.color_mode.findData(self.state.color_key_mode)
-        if mode_index < 0:
-            mode_index = 0
-        self.color_mode.blockSignals(True)
-        self.color_mode.setCurrentIndex(mode_index)
-        self.color_mode.blockSignals(False)
-
-        self.hsv_h_spin.blockSignals(True)
-        self.hsv_s_spin.blockSignals(True)
-        self.hsv_v_spin.blockSignals(True)
-        self.hsv_h_spin.setValue(int(self.state.hsv_h_tol))
-        self.hsv_s_spin.setValue(int(self.state.hsv_s_tol))
-        self.hsv_v_spin.setValue(int(self.state.hsv_v_tol))
-        self.hsv_h_spin.blockSignals(False)
-        self.hsv_s_spin.blockSignals(False)
-        self.hsv_v_spin.blockSignals(False)
+        _sync_index(self.color_mode, max(0, mode_index))
+
+        _sync_value(self.hsv_h_spin, int(self.state.hsv_h_tol))
+        _sync_value(self.hsv_s_spin, int(self.state.hsv_s_tol))
+        _sync_value(self.hsv_v_spin, int(self.state.hsv_v_tol))
         self._set_hsv_controls_enabled(self.state.color_key_mode == "hsv")
 
-        self.sel_enable_chk.blockSignals(True)
-        self.sel_invert_chk.blockSignals(True)
-        self.sel_x_spin.blockSignals(True)
-        self.sel_y_spin.blockSignals(True)
-        self.sel_w_spin.blockSignals(True)
-        self.sel_h_spin.blockSignals(True)
-        self.sel_enable_chk.setChecked(bool(self.state.selection_enabled))
-        self.sel_invert_chk.setChecked(bool(self.state.selection_invert))
-        self.sel_x_spin.setValue(int(self.state.sel_x))
-        self.sel_y_spin.setValue(int(self.state.sel_y))
-        self.sel_w_spin.setValue(int(self.state.sel_w))
-        self.sel_h_spin.setValue(int(self.state.sel_h))
-        self.sel_enable_chk.blockSignals(False)
-        self.sel_invert_chk.blockSignals(False)
-        self.sel_x_spin.blockSignals(False)
-        self.sel_y_spin.blockSignals(False)
-        self.sel_w_spin.blockSignals(False)
-        self.sel_h_spin.blockSignals(False)
+        _sync_checked(self.sel_enable_chk, bool(self.state.selection_enabled))
+        _sync_checked(self.sel_invert_chk, bool(self.state.selection_invert))
+        _sync_value(self.sel_x_spin, int(self.state.sel_x))
+        _sync_value(self.sel_y_spin, int(self.state.sel_y))
+        _sync_value(self.sel_w_spin, int(self.state.sel_w))
+        _sync_value(self.sel_h_spin, int(self.state.sel_h))
 
         pick_idx = self.pick_mode_combo.findData(self._pick_mode)
-        if pick_idx < 0:
-            pick_idx = 0
-        self.pick_mode_combo.blockSignals(True)
-        self.pick_mode_combo.setCurrentIndex(pick_idx)
-        self.pick_mode_combo.blockSignals(False)
-
-        self.grow.blockSignals(True)
-        self.grow_spin.blockSignals(True)
-        self.grow.setValue(int(self.state.mask_grow_shrink))
-        self.grow_spin.setValue(int(self.state.mask_grow_shrink))
-        self.grow.blockSignals(False)
-        self.grow_spin.blockSignals(False)
+        _sync_index(self.pick_mode_combo, max(0, pick_idx))
+
+        _sync_value(self.grow, int(self.state.mask_grow_shrink))
+        _sync_value(self.grow_spin, int(self.state.mask_grow_shrink))
         self.grow_val.setText(str(int(self.state.mask_grow_shrink)))
 
-        self.feather.blockSignals(True)
-        self.feather_spin.blockSignals(True)
-        self.feather.setValue(int(self.state.mask_feather_radius))
-        self.feather_spin.setValue(int(self.state.mask_feather_radius))
-        self.feather.blockSignals(False)
-        self.feather_spin.blockSignals(False)
+        _sync_value(self.feather, int(self.state.mask_feather_radius))
+        _sync_value(self.feather_spin, int(self.state.mask_feather_radius))
         self.feather_val.setText(str(int(self.state.mask_feather_radius)))
 
-        self.islands_spin.blockSignals(True)
-        self.islands_spin.setValue(int(self.state.remove_islands_min_size))
-        self.islands_spin.blockSignals(False)
+        _sync_value(self.islands_spin, int(self.state.remove_islands_min_size))
 
         pct = int(round(self.state.opacity * 100))
-        self.opacity.blockSignals(True)
-        self.opacity_spin.blockSignals(True)
-        self.opacity.setValue(pct)
-        self.opacity_spin.setValue(pct)
-        self.opacity.blockSignals(False)
-        self.opacity_spin.blockSignals(False)
+        _sync_value(self.opacity, pct)
+        _sync_value(self.opacity_spin, pct)
         self.opacity_val.setText(f"{pct}%")
 
-        self.scale_spin.blockSignals(True)
-        self.scale_spin.setValue(self.state.img_scale * 100.0)
-        self.scale_spin.blockSignals(False)
-        self.pos_x_spin.blockSignals(True)
-        self.pos_y_spin.blockSignals(True)
-        self.pos_x_spin.setValue(self.state.img_off_x)
-        self.pos_y_spin.setValue(self.state.img_off_y)
-        self.pos_x_spin.blockSignals(False)
-        self.pos_y_spin.blockSignals(False)
-
-        self.hq.blockSignals(True)
-        self.hq.setChecked(bool(self.state.high_quality_resample))
-        self.hq.blockSignals(False)
-
-        self.nearest_chk.blockSignals(True)
-        self.nearest_chk.setChecked(bool(self.state.nearest_neighbor))
-        self.nearest_chk.blockSignals(False)
-        self.grid_chk.blockSignals(True)
-        self.grid_chk.setChecked(bool(self.state.show_pixel_grid))
-        self.grid_chk.blockSignals(False)
+        _sync_value(self.scale_spin, self.state.img_scale * 100.0)
+        _sync_value(self.pos_x_spin, self.state.img_off_x)
+        _sync_value(self.pos_y_spin, self.state.img_off_y)
+
+        _sync_checked(self.hq, bool(self.state.high_quality_resample))
+        _sync_checked(self.nearest_chk, bool(self.state.nearest_neighbor))
+        _sync_checked(self.grid_chk, bool(self.state.show_pixel_grid))
         self.canvas.show_pixel_grid = bool(self.state.show_pixel_grid)
 
-        self.brightness_spin.blockSignals(True)
-        self.contrast_spin.blockSignals(True)
-        self.saturation_spin.blockSignals(True)
-        self.gamma_spin.blockSignals(True)
-        self.vibrance_spin.blockSignals(True)
-        self.temperature_spin.blockSignals(True)
-        self.brightness_spin.setValue(float(self.state.brightness))
-        self.contrast_spin.setValue(float(self.state.contrast))
-        self.saturation_spin.setValue(float(self.state.saturation))
-        self.gamma_spin.setValue(float(self.state.gamma))
-        self.vibrance_spin.setValue(float(getattr(self.state, "vibrance", 1.0)))
-        self.temperature_spin.setValue(int(getattr(self.state, "temperature", 0)))
-        self.brightness_spin.blockSignals(False)
-        self.contrast_spin.blockSignals(False)
-        self.saturation_spin.blockSignals(False)
-        self.gamma_spin.blockSignals(False)
-        self.vibrance_spin.blockSignals(False)
-        self.temperature_spin.blockSignals(False)
+        _sync_value(self.brightness_spin, float(self.state.brightness))
+        _sync_value(self.contrast_spin, float(self.state.contrast))
+        _sync_value(self.saturation_spin, float(self.state.saturation))
+        _sync_value(self.gamma_spin, float(self.state.gamma))
+        _sync_value(self.vibrance_spin, float(getattr(self.state, "vibrance", 1.0)))
+        _sync_value(self.temperature_spin, int(getattr(self.state, "temperature", 0)))
 
         if hasattr(self, "paint_enable_chk"):
             self._refresh_brush_preset_combo(self.state.active_brush_id)
             self.canvas.paint_enabled = bool(self.paint_enable_chk.isChecked())
 
-        self.palette_widget.listw.blockSignals(True)
-        self.palette_widget.listw.clear()
-        for p in self.state.palette:
-            self.palette_widget.add_color(p.rgb)
-            it = self.palette_widget.listw.item(self.palette_widget.listw.count() - 1)
-            it.setCheckState(Qt.Checked if p.enabled else Qt.Unchecked)
-        self.palette_widget.listw.blockSignals(False)
+        shown = [(tuple(rgb), enabled) for rgb, enabled in self.palette_widget.colors()]
+        if shown == [(tuple(p.rgb), p.enabled) for p in self.state.palette]:
+            return
+        listw = self.palette_widget.listw
+        # One blocker and one repaint for the whole rebuild, not one per item.
+        listw.setUpdatesEnabled(False)
+        try:
+            with QSignalBlocker(listw):
+                listw.clear()
+                for p in self.state.palette:
+                    self.palette_widget.add_color(p.rgb)
+                    listw.item(listw.count() - 1).setCheckState(Qt.Checked if p.enabled else Qt.Unchecked)
+        finally:
+            listw.setUpdatesEnabled(True)
 
     def _builtin_brush_presets(self) -> list[BrushPreset]:
         return [
@@ -1236,56 +1363,33 @@ class MainWindow(QMainWindow):
             return
         presets = self._all_brush_presets()
         wanted = selected_id or self.state.active_brush_id
-        self.paint_preset_combo.blockSignals(True)
-        self.paint_preset_combo.clear()
-        for p in presets:
-            kind = "(Custom)" if any(cp.preset_id == p.preset_id for cp in self.state.custom_brush_presets) else ""
-            label = f"{p.name} {kind}".strip()
-            self.paint_preset_combo.addItem(label, userData=p.preset_id)
-        idx = self.paint_preset_combo.findData(wanted)
-        if idx < 0:
-            idx = 0
-            if presets:
-                self.state.active_brush_id = presets[0].preset_id
-        self.paint_preset_combo.setCurrentIndex(max(0, idx))
-        self.paint_preset_combo.blockSignals(False)
+        with QSignalBlocker(self.paint_preset_combo):
+            self.paint_preset_combo.clear()
+            for p in presets:
+                kind = "(Custom)" if any(cp.preset_id == p.preset_id for cp in self.state.custom_brush_presets) else ""
+                label = f"{p.name} {kind}".strip()
+                self.paint_preset_combo.addItem(label, userData=p.preset_id)
+            idx = self.paint_preset_combo.findData(wanted)
+            if idx < 0:
+                idx = 0
+                if presets:
+                    self.state.active_brush_id = presets[0].preset_id
+            self.paint_preset_combo.setCurrentIndex(max(0, idx))
         self._on_brush_preset_selected(self.paint_preset_combo.currentIndex())
 
     def _apply_preset_to_paint_controls(self, preset: BrushPreset) -> None:
         if not hasattr(self, "paint_tool_combo"):
             return
-        self.paint_tool_combo.blockSignals(True)
-        self.paint_size_spin.blockSignals(True)
-        self.paint_hardness_slider.blockSignals(True)
-        self.paint_spacing_slider.blockSignals(True)
-        self.paint_flow_slider.blockSignals(True)
-        self.paint_strength_slider.blockSignals(True)
-        self.paint_scatter_slider.blockSignals(True)
-        self.paint_sym_x_chk.blockSignals(True)
-        self.paint_sym_y_chk.blockSignals(True)
-
         tool_idx = self.paint_tool_combo.findData("erase" if preset.tool_mode == "erase" else "paint")
-        if tool_idx < 0:
-            tool_idx = 0
-        self.paint_tool_combo.setCurrentIndex(tool_idx)
-        self.paint_size_spin.setValue(max(1, min(256, int(round(preset.size)))))
-        self.paint_hardness_slider.setValue(max(1, min(100, int(round(preset.hardness * 100.0)))))
-        self.paint_spacing_slider.setValue(max(1, min(100, int(round(preset.spacing * 100.0)))))
-        self.paint_flow_slider.setValue(max(1, min(100, int(round(preset.flow * 100.0)))))
-        self.paint_strength_slider.setValue(max(1, min(100, int(round(preset.opacity * 100.0)))))
-        self.paint_scatter_slider.setValue(max(0, min(100, int(round(preset.jitter_scatter * 100.0)))))
-        self.paint_sym_x_chk.setChecked(bool(preset.symmetry_x))
-        self.paint_sym_y_chk.setChecked(bool(preset.symmetry_y))
-
-        self.paint_tool_combo.blockSignals(False)
-        self.paint_size_spin.blockSignals(False)
-        self.paint_hardness_slider.blockSignals(False)
-        self.paint_spacing_slider.blockSignals(False)
-        self.paint_flow_slider.blockSignals(False)
-        self.paint_strength_slider.blockSignals(False)
-        self.paint_scatter_slider.blockSignals(False)
-        self.paint_sym_x_chk.blockSignals(False)
-        self.paint_sym_y_chk.blockSignals(False)
+        _sync_index(self.paint_tool_combo, max(0, tool_idx))
+        _sync_value(self.paint_size_spin, max(1, min(256, int(round(preset.size)))))
+        _sync_value(self.paint_hardness_slider, max(1, min(100, int(round(preset.hardness * 100.0)))))
+        _sync_value(self.paint_spacing_slider, max(1, min(100, int(round(preset.spacing * 100.0)))))
+        _sync_value(self.paint_flow_slider, max(1, min(100, int(round(preset.flow * 100.0)))))
+        _sync_value(self.paint_strength_slider, max(1, min(100, int(round(preset.opacity * 100.0)))))
+        _sync_value(self.paint_scatter_slider, max(0, min(100, int(round(preset.jitter_scatter * 100.0)))))
+        _sync_checked(self.paint_sym_x_chk, bool(preset.symmetry_x))
+        _sync_checked(self.paint_sym_y_chk, bool(preset.symmetry_y))
 
         self._on_paint_controls_changed()
 
@@ -1356,12 +1460,30 @@ class MainWindow(QMainWindow):
         img.save(buf, format="PNG")
         return base64.b64encode(buf.getvalue()).decode("ascii")
 
+    def _load_layer_alpha_mask(self, layer: LayerState, size: Optional[tuple[int, int]]) -> Optional[np.ndarray]:
+        if layer.alpha_paint_mask_data:
+            return self._decode_alpha_mask_data(layer.alpha_paint_mask_data, size)
+        if not layer.alpha_paint_mask_path:
+            return None
+        try:
+            return self._decode_alpha_mask_png(Path(layer.alpha_paint_mask_path).read_bytes(), size)
+        except OSError:
+            return None
+
     def _decode_alpha_mask_data(self, data: Optional[str], size: Optional[tuple[int, int]]) -> Optional[np.ndarray]:
         if not data:
             return None
         try:
             raw = base64.b64decode(data.encode("ascii"))
-            img = Image.open(io.BytesIO(raw)).convert("L")
+        except Exception:
+            return None
+        return self._decode_alpha_mask_png(raw, size)
+
+    def _decode_alpha_mask_png(self, raw: bytes, size: Optional[tuple[int, int]]) -> Optional[np.ndarray]:
+        try:
+            img = Image.open(io.BytesIO(raw))
+            if img.mode != "L":
+                img = img.convert("L")
             if size is not None and img.size != size:
                 img = img.resize(size, resample=Image.Resampling.BILINEAR)
             return np.array(img, dtype=np.uint8)
@@ -1373,6 +1495,7 @@ class MainWindow(QMainWindow):
         for i, layer in enumerate(self.state.layers):
             mask = self._layer_alpha_masks[i] if i < len(self._layer_alpha_masks) else None
             layer.alpha_paint_mask_data = self._encode_alpha_mask_data(mask)
+            layer.alpha_paint_mask_path = None  # in-memory mask is now authoritative
 
     def _update_status(self) -> None:
         src_size = f"{self._src_img.width}x{self._src_img.height}" if self._src_img is not None else "none"
@@ -1385,7 +1508,11 @@ class MainWindow(QMainWindow):
             f"Image Scale: {self.state.img_scale * 100:.1f}% Rot:{self.state.rotation_deg} | Offset: ({self.state.img_off_x:.1f}, {self.state.img_off_y:.1f}) | "
             f"Sel: {'ON' if self.state.selection_enabled else 'OFF'} | Key: {key_info} | Opacity: {self.state.opacity * 100:.0f}%"
         )
-        self.statusBar().showMessage(msg)
+        # Compared with what is on screen, so a timed-out transient message
+        # still gets replaced.
+        bar = self.statusBar()
+        if bar.currentMessage() != msg:
+            bar.showMessage(msg)
 
     def _make_group(self, title: str) -> tuple[QGroupBox, QVBoxLayout]:
         g = QGroupBox(title)
@@ -1400,19 +1527,11 @@ class MainWindow(QMainWindow):
             row.addWidget(widget, 1)
         layout.addLayout(row)
 
-    def _selection_rect_on_output_canvas(self) -> Optional[tuple[float, float, float, float]]:
+    def _image_placement(self) -> Optional[tuple[float, float, float, float, int, int]]:
+        # (x0, y0, img_w, img_h, src_w, src_h): where the unrotated source lands
+        # on the output canvas. Shared by every canvas <-> source mapping.
         if self._src_img is None:
             return None
-        if self.state.rotation_deg % 360 != 0:
-            return None
-        rect = None
-        if self._selection_mask is not None:
-            rect = bounding_rect(self._selection_mask)
-        if rect is None:
-            rect = (self.state.sel_x, self.state.sel_y, self.state.sel_w, self.state.sel_h)
-        sx, sy, sw, sh = rect
-        if sw <= 0 or sh <= 0:
-            return None
         src_w, src_h = self._src_img.size
         if src_w <= 0 or src_h <= 0:
             return None
@@ -1421,6 +1540,33 @@ class MainWindow(QMainWindow):
         img_h = src_h * scale
         x0 = self.state.out_w * 0.5 - img_w * 0.5 + self.state.img_off_x
         y0 = self.state.out_h * 0.5 - img_h * 0.5 + self.state.img_off_y
+        return x0, y0, img_w, img_h, src_w, src_h
+
+    def _selection_mask_rect(self) -> Optional[tuple[int, int, int, int]]:
+        # The overlay asks for this on every render; scanning the mask again is
+        # only needed after it was replaced or edited in place.
+        mask = self._selection_mask
+        if mask is None:
+            return None
+        cached = self._selection_rect_cache
+        if cached is None or cached[0] is not mask or cached[1] != self._mask_version:
+            cached = (mask, self._mask_version, bounding_rect(mask))
+            self._selection_rect_cache = cached
+        return cached[2]
+
+    def _selection_rect_on_output_canvas(self) -> Optional[tuple[float, float, float, float]]:
+        if self.state.rotation_deg % 360 != 0:
+            return None
+        placement = self._image_placement()
+        if placement is None:
+            return None
+        rect = self._selection_mask_rect()
+        if rect is None:
+            rect = (self.state.sel_x, self.state.sel_y, self.state.sel_w, self.state.sel_h)
+        sx, sy, sw, sh = rect
+        if sw <= 0 or sh <= 0:
+            return None
+        x0, y0, img_w, img_h, src_w, src_h = placement
         rx = x0 + (sx / float(src_w)) * img_w
         ry = y0 + (sy / float(src_h)) * img_h
         rw = (sw / float(src_w)) * img_w
@@ -1428,28 +1574,48 @@ class MainWindow(QMainWindow):
         return (rx, ry, rw, rh)
 
     def _lasso_points_on_output_canvas(self) -> list[tuple[float, float]]:
-        if self._src_img is None or self.state.rotation_deg % 360 != 0:
+        if not self._lasso_points or self.state.rotation_deg % 360 != 0:
             return []
-        src_w, src_h = self._src_img.size
-        if src_w <= 0 or src_h <= 0:
+        placement = self._image_placement()
+        if placement is None:
             return []
-        scale = max(0.01, float(self.state.img_scale))
-        img_w = src_w * scale
-        img_h = src_h * scale
-        x0 = self.state.out_w * 0.5 - img_w * 0.5 + self.state.img_off_x
-        y0 = self.state.out_h * 0.5 - img_h * 0.5 + self.state.img_off_y
-        out: list[tuple[float, float]] = []
-        for sx, sy in self._lasso_points:
-            ox = x0 + (float(sx) / float(src_w)) * img_w
-            oy = y0 + (float(sy) / float(src_h)) * img_h
-            out.append((ox, oy))
+        points = self._lasso_points
+        cached = self._lasso_canvas_cache
+        if cached is not None and cached[0] is points and cached[1] == placement:
+            out = cached[2]
+        else:
+            out = []
+            self._lasso_canvas_cache = (points, placement, out)
+        if len(out) < len(points):
+            x0, y0, img_w, img_h, src_w, src_h = placement
+            # Freehand paths run to thousands of points; map them in one array op.
+            pts = np.asarray(points[len(out):], dtype=np.float64)
+            pts *= (img_w / float(src_w), img_h / float(src_h))
+            pts += (x0, y0)
+            out.extend(map(tuple, pts.tolist()))
         return out
 
-    def _apply_new_selection_mask(self, incoming_mask: np.ndarray) -> None:
+    def _apply_new_selection_mask(
+        self, incoming_mask: np.ndarray, base_rect: Optional[tuple[int, int, int, int]] = None
+    ) -> None:
+        # `base_rect` is the rect selection to combine with when there is no mask;
+        # defaults to the current sel_* state.
         op = str(self.sel_op_combo.currentData() or "replace")
-        combined = combine_selection_masks(self._selection_mask, incoming_mask, op)
+        # The live mask can be combined in place unless the history shares it.
+        current = self._selection_mask
+        inplace = current is not None and current.flags.writeable
+        if base_rect is None and self.state.selection_enabled:
+            base_rect = (self.state.sel_x, self.state.sel_y, self.state.sel_w, self.state.sel_h)
+        # Callers pass a freshly built mask, so it can be taken over as well.
+        if current is None and base_rect is not None:
+            # A rectangle selection has no mask; combine against the rect directly.
+            combined = combine_rect_selection(base_rect, incoming_mask, op, consume_incoming=True)
+        else:
+            combined = combine_selection_masks(current, incoming_mask, op, inplace=inplace, consume_incoming=True)
+        if combined is current:
+            self._mask_version += 1
         self._selection_mask = combined
-        rect = bounding_rect(combined)
+        rect = self._selection_mask_rect()
         if rect is None:
             self.state.selection_enabled = False
             self.state.sel_x = self.state.sel_y = self.state.sel_w = self.state.sel_h = 0
@@ -1476,8 +1642,15 @@ class MainWindow(QMainWindow):
             return
         w, h = self._src_img.size
         incoming = polygon_mask((h, w), self._lasso_points)
+        # sel_* currently holds the path's own bounding box; combine with the
+        # selection that existed before the path was started instead.
+        base = self._lasso_base_rect
+        base_rect = base[1] if base is not None and base[0] is self._lasso_points else None
         self._push_undo_state()
-        self._apply_new_selection_mask(incoming)
+        if base_rect is None:
+            self.state.selection_enabled = False
+        self._apply_new_selection_mask(incoming, base_rect)
+        self._lasso_base_rect = None
         self._lasso_points = []
         self._sync_ui_from_state()
         self._rerender()
@@ -1487,42 +1660,69 @@ class MainWindow(QMainWindow):
         self.statusBar().showMessage("Lasso points cleared.", 2000)
 
     def _on_adjustments_changed(self, _) -> None:
-        self._push_undo_state()
-        self.state.brightness = float(self.brightness_spin.value())
-        self.state.contrast = float(self.contrast_spin.value())
-        self.state.saturation = float(self.saturation_spin.value())
-        self.state.gamma = float(self.gamma_spin.value())
-        self.state.vibrance = float(self.vibrance_spin.value())
-        self.state.temperature = int(self.temperature_spin.value())
-        self._rerender()
+        nxt = (
+            float(self.brightness_spin.value()),
+            float(self.contrast_spin.value()),
+            float(self.saturation_spin.value()),
+            float(self.gamma_spin.value()),
+            float(self.vibrance_spin.value()),
+            int(self.temperature_spin.value()),
+        )
+        st = self.state
+        if nxt == (st.brightness, st.contrast, st.saturation, st.gamma, st.vibrance, st.temperature):
+            return
+        self._push_undo_state("adjustments")
+        st.brightness, st.contrast, st.saturation, st.gamma, st.vibrance, st.temperature = nxt
+        self._schedule_rerender()
 
     def _rotate_image(self, delta_deg: int) -> None:
+        if int(delta_deg) % 360 == 0:
+            return
         self._push_undo_state()
         self.state.rotation_deg = (int(self.state.rotation_deg) + int(delta_deg)) % 360
         self._rerender()
 
     def _flip_horizontal(self) -> None:
-        if self._src_img is None:
-            return
-        self._push_undo_state()
-        self._src_img = self._src_img.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
-        self._rerender()
+        self._flip_source(Image.Transpose.FLIP_LEFT_RIGHT)
 
     def _flip_vertical(self) -> None:
+        self._flip_source(Image.Transpose.FLIP_TOP_BOTTOM)
+
+    def _flip_source(self, method: Image.Transpose) -> None:
         if self._src_img is None:
             return
         self._push_undo_state()
-        self._src_img = self._src_img.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+        old = self._src_img
+        self._src_img = old.transpose(method)
+        cached = self._source_pixels_cache
+        if cached is not None and cached[0] is old:
+            # Mirror the cached pixels as a view instead of converting the new image again.
+            arr = cached[1]
+            flipped = arr[:, ::-1] if method == Image.Transpose.FLIP_LEFT_RIGHT else arr[::-1]
+            self._source_pixels_cache = (self._src_img, flipped)
         self._rerender()
 
     def _trim_transparent(self) -> None:
-        if self._preview_img is None:
+        self._flush_rerender()
+        if self._preview_arr is None:
             return
-        bbox = self._preview_img.getbbox()
+        if self._preview_scale_used >= 1.0:
+            full = np_rgba_to_pil(self._preview_arr)
+        else:
+            # The preview is reduced; the bbox has to come from the full-size canvas.
+            full = composite_layers_to_canvas(
+                layers=self._layer_render_inputs(self._render_shown is True),
+                out_size=(self.state.out_w, self.state.out_h),
+                high_quality=self.state.high_quality_resample,
+                nearest_neighbor=self.state.nearest_neighbor,
+            )
+        bbox = full.getbbox()
         if bbox is None:
             return
+        if bbox == (0, 0, self.state.out_w, self.state.out_h) and self.state.img_off_x == 0.0 and self.state.img_off_y == 0.0:
+            return
         self._push_undo_state()
-        cropped = self._preview_img.crop(bbox)
+        cropped = full.crop(bbox)
         self.state.out_w = int(cropped.width)
         self.state.out_h = int(cropped.height)
         self.state.img_off_x = 0.0
@@ -1547,10 +1747,7 @@ class MainWindow(QMainWindow):
         if not ok or not name.strip():
             return
         nm = name.strip()
-        mask_copy = None if self._selection_mask is None else self._selection_mask.copy()
-        imgs_copy = [None if img is None else img.copy() for img in self._layer_images]
-        alpha_copy = [None if mk is None else mk.copy() for mk in self._layer_alpha_masks]
-        self._snapshots[nm] = (deepcopy(self.state), mask_copy, list(self._lasso_points), imgs_copy, alpha_copy)
+        self._snapshots[nm] = self._history_entry()
         if self.snapshot_combo.findText(nm) < 0:
             self.snapshot_combo.addItem(nm)
         self.snapshot_combo.setCurrentText(nm)
@@ -1561,13 +1758,7 @@ class MainWindow(QMainWindow):
             return
         self._push_undo_state()
         st, mk, lp, imgs, alpha = self._snapshots[nm]
-        self._apply_state(
-            deepcopy(st),
-            None if mk is None else mk.copy(),
-            list(lp),
-            [None if img is None else img.copy() for img in imgs],
-            [None if m is None else m.copy() for m in alpha],
-        )
+        self._apply_state(st, mk, lp, imgs, alpha)
 
     def batch_export(self) -> None:
         in_dir = QFileDialog.getExistingDirectory(self, "Batch Input Folder")
@@ -1599,18 +1790,21 @@ class MainWindow(QMainWindow):
         )
         nxt = (enabled, invert, x, y, w, h)
         if cur != nxt:
-            self._push_undo_state()
+            self._push_undo_state("selection_rect")
             self.state.selection_enabled = enabled
             self.state.selection_invert = invert
             self.state.sel_x = x
             self.state.sel_y = y
             self.state.sel_w = w
             self.state.sel_h = h
-            if enabled:
-                self._selection_mask = self._rect_state_to_mask()
-            else:
+            if cur[2:] != nxt[2:] or not enabled:
+                # The compositor clips to sel_x/y/w/h directly when there is no mask,
+                # so spinbox steps don't allocate a full-size mask each; one is only
+                # built when another selection is combined with this rectangle.
+                # Toggling invert keeps the current mask; disabling drops it, so
+                # later picks never combine with a hidden selection.
                 self._selection_mask = None
-            self._rerender()
+            self._schedule_rerender()
 
     def _on_pick_mode_changed(self, index: int) -> None:
         self._pick_mode = str(self.pick_mode_combo.itemData(index) or "eyedropper")
@@ -1620,18 +1814,28 @@ class MainWindow(QMainWindow):
             self._lasso_points = []
 
     def _select_full_canvas(self) -> None:
-        self._push_undo_state()
         if self._src_img is not None:
             sw, sh = self._src_img.size
         else:
             sw, sh = self.state.out_w, self.state.out_h
+        st = self.state
+        if (
+            st.selection_enabled
+            and not st.selection_invert
+            and (st.sel_x, st.sel_y, st.sel_w, st.sel_h) == (0, 0, int(sw), int(sh))
+            and self._selection_mask is None
+            and not self._lasso_points
+        ):
+            return
+        self._push_undo_state()
         self.state.selection_enabled = True
         self.state.selection_invert = False
         self.state.sel_x = 0
         self.state.sel_y = 0
         self.state.sel_w = int(sw)
         self.state.sel_h = int(sh)
-        self._selection_mask = self._rect_state_to_mask()
+        # No mask: the rect itself is the selection, as after a rect edit.
+        self._selection_mask = None
         self._lasso_points = []
         self._sync_ui_from_state()
         self._rerender()
@@ -1654,125 +1858,60 @@ class MainWindow(QMainWindow):
         s = int(self.hsv_s_spin.value())
         v = int(self.hsv_v_spin.value())
         if (h, s, v) != (self.state.hsv_h_tol, self.state.hsv_s_tol, self.state.hsv_v_tol):
-            self._push_undo_state()
+            self._push_undo_state("hsv_tol")
             self.state.hsv_h_tol = h
             self.state.hsv_s_tol = s
             self.state.hsv_v_tol = v
-            self._rerender()
+            self._schedule_rerender()
 
     def _on_scale_spin_changed(self, v: float) -> None:
-        self._push_undo_state()
-        self.state.img_scale = max(0.01, min(50.0, float(v) / 100.0))
-        self._rerender()
+        scale = max(0.01, min(50.0, float(v) / 100.0))
+        if scale == self.state.img_scale:
+            return
+        self._push_undo_state("img_scale")
+        self.state.img_scale = scale
+        self._schedule_rerender()
 
     def _on_position_spin_changed(self, _) -> None:
-        self._push_undo_state()
-        self.state.img_off_x = float(self.pos_x_spin.value())
-        self.state.img_off_y = float(self.pos_y_spin.value())
-        self._rerender()
-
-    def _set_tol_value(self, v: int) -> None:
-        v = int(v)
-        v = max(0, min(441, v))
-        if not self._restoring_state and v != self.state.tolerance:
-            self._push_undo_state()
-        self.state.tolerance = v
-
-        self.tol.blockSignals(True)
-        self.tol.setValue(v)
-        self.tol.blockSignals(False)
-
-        self.tol_spin.blockSignals(True)
-        self.tol_spin.setValue(v)
-        self.tol_spin.blockSignals(False)
-
-        self.tol_val.setText(str(v))
-        self._rerender()
-
-    def _on_tol_slider_changed(self, v: int) -> None:
-        self._set_tol_value(v)
-
-    def _on_tol_spin_changed(self, v: int) -> None:
-        self._set_tol_value(v)
-
-    def _set_grow_value(self, v: int) -> None:
-        v = int(v)
-        v = max(-20, min(20, v))
-        if not self._restoring_state and v != self.state.mask_grow_shrink:
-            self._push_undo_state()
-        self.state.mask_grow_shrink = v
-
-        self.grow.blockSignals(True)
-        self.grow.setValue(v)
-        self.grow.blockSignals(False)
-
-        self.grow_spin.blockSignals(True)
-        self.grow_spin.setValue(v)
-        self.grow_spin.blockSignals(False)
-
-        self.grow_val.setText(str(v))
-        self._rerender()
-
-    def _on_grow_slider_changed(self, v: int) -> None:
-        self._set_grow_value(v)
-
-    def _on_grow_spin_changed(self, v: int) -> None:
-        self._set_grow_value(v)
-
-    def _set_feather_value(self, v: int) -> None:
-        v = int(v)
-        v = max(0, min(20, v))
-        if not self._restoring_state and v != self.state.mask_feather_radius:
-            self._push_undo_state()
-        self.state.mask_feather_radius = v
-
-        self.feather.blockSignals(True)
-        self.feather.setValue(v)
-        self.feather.blockSignals(False)
-
-        self.feather_spin.blockSignals(True)
-        self.feather_spin.setValue(v)
-        self.feather_spin.blockSignals(False)
-
-        self.feather_val.setText(str(v))
-        self._rerender()
-
-    def _on_feather_slider_changed(self, v: int) -> None:
-        self._set_feather_value(v)
+        off = (float(self.pos_x_spin.value()), float(self.pos_y_spin.value()))
+        if off == (self.state.img_off_x, self.state.img_off_y):
+            return
+        self._push_undo_state("img_offset")
+        self.state.img_off_x, self.state.img_off_y = off
+        self._schedule_rerender()
 
-    def _on_feather_spin_changed(self, v: int) -> None:
-        self._set_feather_value(v)
+    def _bind_slider_spin(
+        self,
+        slider: QSlider,
+        spin: QSpinBox,
+        label: QLabel,
+        state_attr: str,
+        fmt: Callable[[int], str] = str,
+        scale: int = 1,
+    ) -> None:
+        # Slider and spinbox edit one value: the widget that fired already holds
+        # it, so only its partner is mirrored (signals blocked), then a single
+        # state write and a coalesced rerender.
+        def on_changed(v: int, partner: QSlider | QSpinBox) -> None:
+            value = v / float(scale) if scale != 1 else int(v)
+            if not self._restoring_state and value != getattr(self.state, state_attr):
+                self._push_undo_state(state_attr)
+            setattr(self.state, state_attr, value)
+            partner.blockSignals(True)
+            partner.setValue(v)
+            partner.blockSignals(False)
+            label.setText(fmt(v))
+            self._schedule_rerender()
+
+        slider.valueChanged.connect(lambda v: on_changed(v, spin))
+        spin.valueChanged.connect(lambda v: on_changed(v, slider))
 
     def _on_islands_changed(self, v: int) -> None:
         v = max(0, int(v))
         if not self._restoring_state and v != self.state.remove_islands_min_size:
-            self._push_undo_state()
+            self._push_undo_state("remove_islands_min_size")
         self.state.remove_islands_min_size = v
-        self._rerender()
-
-    def _set_opacity_percent(self, pct: int) -> None:
-        pct = int(pct)
-        pct = max(0, min(100, pct))
-        if not self._restoring_state and (pct / 100.0) != self.state.opacity:
-            self._push_undo_state()
-        self.state.opacity = pct / 100.0
-
-        self.opacity.blockSignals(True)
-        self.opacity.setValue(pct)
-        self.opacity.blockSignals(False)
-
-        self.opacity_spin.blockSignals(True)
-        self.opacity_spin.setValue(pct)
-        self.opacity_spin.blockSignals(False)
-
-        self.opacity_val.setText(f"{pct}%")
-        self._rerender()
-
-    def _on_opacity_slider_changed(self, v: int) -> None:
-        self._set_opacity_percent(v)
-
-    def _on_opacity_spin_changed(self, v: int) -> None:
-        self._set_opacity_percent(v)
+        self._schedule_rerender()
 
     def _on_hq_changed(self, _) -> None:
         if not self._restoring_state and bool(self.hq.isChecked()) != self.state.high_quality_resample:
@@ -1842,6 +1981,10 @@ class MainWindow(QMainWindow):
         if mask is None or mask.shape != (src.height, src.width):
             mask = np.full((src.height, src.width), 255, dtype=np.uint8)
             self._layer_alpha_masks[idx] = mask
+        elif not mask.flags.writeable:
+            # Shared with the history; take a private copy before painting.
+            mask = mask.copy()
+            self._layer_alpha_masks[idx] = mask
         return mask
 
     def _paint_strength(self) -> float:
@@ -1939,6 +2082,8 @@ class MainWindow(QMainWindow):
             py = int(round(max(0.0, min(float(h - 1), sy))))
             for tx, ty in self._symmetry_points(px, py, w, h):
                 changed = self._apply_brush_dab(mask, tx, ty, radius, mode, strength, hardness) or changed
+        if changed:
+            self._mask_version += 1
         return changed
 
 
@@ -1947,11 +2092,13 @@ class MainWindow(QMainWindow):
         if src_xy is None:
             self._painting_active = False
             return
+        # Push first: it freezes the current mask, so the one painted on below
+        # is a private copy.
+        self._push_undo_state()
         mask = self._ensure_active_layer_alpha_mask()
         if mask is None:
             self._painting_active = False
             return
-        self._push_undo_state()
         self._paint_changed = False
         self._paint_last_src_xy = src_xy
         self._painting_active = True
@@ -1959,8 +2106,7 @@ class MainWindow(QMainWindow):
         self._paint_rng.seed(self._paint_stroke_seed)
         if self._paint_segment(mask, src_xy, src_xy):
             self._paint_changed = True
-            self.state.active_layer().alpha_paint_mask_data = self._encode_alpha_mask_data(mask)
-            self._rerender()
+            self._schedule_rerender()
 
     def _paint_drag_at_canvas_xy(self, cx: int, cy: int) -> None:
         if not self._painting_active or self._paint_last_src_xy is None:
@@ -1973,13 +2119,19 @@ class MainWindow(QMainWindow):
             return
         if self._paint_segment(mask, self._paint_last_src_xy, src_xy):
             self._paint_changed = True
-            self.state.active_layer().alpha_paint_mask_data = self._encode_alpha_mask_data(mask)
-            self._rerender()
+            # Dabs only edit the mask; compositing runs on the render worker,
+            # coalesced like the lasso drag.
+            self._schedule_rerender()
         self._paint_last_src_xy = src_xy
 
     def _paint_finish(self) -> None:
         self._painting_active = False
         self._paint_last_src_xy = None
+        if self._paint_changed:
+            # The PNG copy in the state is written once per stroke, not per move.
+            self._paint_changed = False
+            mask = self._ensure_active_layer_alpha_mask()
+            self.state.active_layer().alpha_paint_mask_data = self._encode_alpha_mask_data(mask)
 
     def _fit_image_to_canvas(self) -> None:
         if self._src_img is None:
@@ -1987,21 +2139,28 @@ class MainWindow(QMainWindow):
         src_w, src_h = self._src_img.size
         if src_w <= 0 or src_h <= 0:
             return
-        self._push_undo_state()
         sx = self.state.out_w / float(src_w)
         sy = self.state.out_h / float(src_h)
-        self.state.img_scale = max(0.01, min(50.0, min(sx, sy)))
+        scale = max(0.01, min(50.0, min(sx, sy)))
+        if (scale, 0.0, 0.0) == (self.state.img_scale, self.state.img_off_x, self.state.img_off_y):
+            return
+        self._push_undo_state()
+        self.state.img_scale = scale
         self.state.img_off_x = 0.0
         self.state.img_off_y = 0.0
         self._rerender()
 
     def _center_image(self) -> None:
+        if self.state.img_off_x == 0.0 and self.state.img_off_y == 0.0:
+            return
         self._push_undo_state()
         self.state.img_off_x = 0.0
         self.state.img_off_y = 0.0
         self._rerender()
 
     def _reset_transform(self) -> None:
+        if (self.state.img_scale, self.state.img_off_x, self.state.img_off_y) == (1.0, 0.0, 0.0):
+            return
         self._push_undo_state()
         self.state.img_scale = 1.0
         self.state.img_off_x = 0.0
@@ -2011,11 +2170,11 @@ class MainWindow(QMainWindow):
     def _move_image(self, dx_canvas_px: float, dy_canvas_px: float) -> None:
         self.state.img_off_x += float(dx_canvas_px)
         self.state.img_off_y += float(dy_canvas_px)
-        self._rerender()
+        self._schedule_rerender()
 
     def _scale_image(self, factor: float) -> None:
         self.state.img_scale = max(0.02, min(50.0, self.state.img_scale * float(factor)))
-        self._rerender()
+        self._schedule_rerender()
 
     def _pick_color_at_canvas_xy(self, cx: int, cy: int) -> None:
         """
@@ -2030,8 +2189,10 @@ class MainWindow(QMainWindow):
             return
         sx, sy = src_xy
 
-        r, g, b, a = self._src_img.getpixel((sx, sy))
         if self._pick_mode == "eyedropper":
+            # Only the eyedropper needs the clicked color; the wand and color
+            # range read the cached source array, and lasso clicks need none.
+            r, g, b = self._src_img.getpixel((sx, sy))[:3]
             self.palette_widget.add_color((int(r), int(g), int(b)))
             self._sync_palette_from_widget()
             return
@@ -2039,22 +2200,15 @@ class MainWindow(QMainWindow):
         if self._pick_mode == "lasso":
             self._append_lasso_point(sx, sy)
             if len(self._lasso_points) >= 2:
-                xs = [p[0] for p in self._lasso_points]
-                ys = [p[1] for p in self._lasso_points]
-                self.state.selection_enabled = True
-                self.state.selection_invert = False
-                self.state.sel_x = int(min(xs))
-                self.state.sel_y = int(min(ys))
-                self.state.sel_w = int(max(xs) - min(xs) + 1)
-                self.state.sel_h = int(max(ys) - min(ys) + 1)
-                self._rerender()
+                self._set_selection_rect_to_lasso()
+                self._schedule_rerender()
             self.statusBar().showMessage(
                 f"Lasso points: {len(self._lasso_points)} (click Close/Apply Lasso to finish).",
                 1500,
             )
             return
 
-        arr = np.array(self._src_img.convert("RGB"), dtype=np.uint8)
+        arr = self._source_pixels()
         tol = int(self.sel_pick_tol_spin.value())
         if self._pick_mode == "wand":
             sel_mask = magic_wand_mask(
@@ -2075,6 +2229,18 @@ class MainWindow(QMainWindow):
         self._sync_ui_from_state()
         self._rerender()
 
+    def _source_pixels(self) -> np.ndarray:
+        # The wand and color-range selectors only read the first three channels,
+        # so the RGBA pixels are used as-is. Layer images are never modified in
+        # place, so the array is cached against the image object across clicks.
+        img = self._src_img
+        cached = self._source_pixels_cache
+        if cached is not None and cached[0] is img:
+            return cached[1]
+        arr = np.asarray(img if img.mode in ("RGB", "RGBA") else img.convert("RGBA"), dtype=np.uint8)
+        self._source_pixels_cache = (img, arr)
+        return arr
+
     def _pick_drag_at_canvas_xy(self, cx: int, cy: int) -> None:
         if self._pick_mode != "lasso" or self._src_img is None:
             return
@@ -2084,63 +2250,84 @@ class MainWindow(QMainWindow):
         sx, sy = src
         self._append_lasso_point(sx, sy)
         if len(self._lasso_points) >= 2:
-            xs = [p[0] for p in self._lasso_points]
-            ys = [p[1] for p in self._lasso_points]
-            self.state.selection_enabled = True
-            self.state.selection_invert = False
-            self.state.sel_x = int(min(xs))
-            self.state.sel_y = int(min(ys))
-            self.state.sel_w = int(max(xs) - min(xs) + 1)
-            self.state.sel_h = int(max(ys) - min(ys) + 1)
-            self._rerender()
+            self._set_selection_rect_to_lasso()
+            # One composite per mouse move would lag the stroke; coalesce them.
+            self._schedule_rerender()
 
     def _pick_finish(self) -> None:
         # Lasso is explicitly applied by button or Enter.
         return
 
     def _append_lasso_point(self, sx: int, sy: int) -> None:
-        if self._lasso_points:
-            lx, ly = self._lasso_points[-1]
-            if abs(int(sx) - int(lx)) + abs(int(sy) - int(ly)) < 2:
+        sx, sy = int(sx), int(sy)
+        points = self._lasso_points
+        if points:
+            lx, ly = points[-1]
+            if abs(sx - lx) + abs(sy - ly) < 2:
                 return
-        self._lasso_points.append((int(sx), int(sy)))
+        else:
+            st = self.state
+            base = (st.sel_x, st.sel_y, st.sel_w, st.sel_h) if st.selection_enabled else None
+            self._lasso_base_rect = (points, base)
+        points.append((sx, sy))
+        ext = self._lasso_extent
+        if ext is not None and ext[0] is points:
+            _, x0, y0, x1, y1 = ext
+            self._lasso_extent = (points, min(x0, sx), min(y0, sy), max(x1, sx), max(y1, sy))
+
+    def _lasso_bounds(self) -> tuple[int, int, int, int]:
+        points = self._lasso_points
+        ext = self._lasso_extent
+        if ext is None or ext[0] is not points:
+            # A new or restored path: scan it once, then appends keep it current.
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            ext = (points, min(xs), min(ys), max(xs), max(ys))
+            self._lasso_extent = ext
+        return ext[1:]
+
+    def _set_selection_rect_to_lasso(self) -> None:
+        # The rect tracks the lasso's bounding box while the path is drawn.
+        x0, y0, x1, y1 = self._lasso_bounds()
+        self.state.selection_enabled = True
+        self.state.selection_invert = False
+        self.state.sel_x = x0
+        self.state.sel_y = y0
+        self.state.sel_w = x1 - x0 + 1
+        self.state.sel_h = y1 - y0 + 1
 
     def _canvas_to_source_xy(self, cx: int, cy: int) -> Optional[tuple[int, int]]:
-        if self._src_img is None:
+        placement = self._image_placement()
+        if placement is None:
             return None
-        out_w, out_h = self.state.out_w, self.state.out_h
-        src_w, src_h = self._src_img.size
-        scale = max(0.01, self.state.img_scale)
-        img_w = src_w * scale
-        img_h = src_h * scale
-        canvas_cx = out_w * 0.5
-        canvas_cy = out_h * 0.5
-        x0 = canvas_cx - img_w * 0.5 + self.state.img_off_x
-        y0 = canvas_cy - img_h * 0.5 + self.state.img_off_y
-        if cx < x0 or cy < y0 or cx >= x0 + img_w or cy >= y0 + img_h:
+        x0, y0, img_w, img_h, src_w, src_h = placement
+        dx = cx - x0
+        dy = cy - y0
+        if dx < 0 or dy < 0 or dx >= img_w or dy >= img_h:
             return None
-        u = (cx - x0) / img_w
-        v = (cy - y0) / img_h
-        sx = max(0, min(src_w - 1, int(u * src_w)))
-        sy = max(0, min(src_h - 1, int(v * src_h)))
+        # Both axes share the scale, so one reciprocal replaces the per-axis
+        # normalize-then-rescale divisions on this mouse-move path.
+        inv_scale = src_w / img_w
+        sx = min(src_w - 1, int(dx * inv_scale))
+        sy = min(src_h - 1, int(dy * inv_scale))
         return (sx, sy)
 
     # ---------------------------
     # Rendering
     # ---------------------------
-    def _rerender(self) -> None:
-        compare_before = getattr(self, "compare_chk", None) is not None and self.compare_chk.isChecked()
+    def _layer_render_inputs(self, compare_before: bool = False, scale: float = 1.0) -> list[LayerRenderInput]:
+        # `scale` shrinks placement for a canvas composited at `scale` x the output size.
         self._sync_layer_image_slots()
-        layers_render: list[LayerRenderInput] = []
+        layers: list[LayerRenderInput] = []
         for i, layer in enumerate(self.state.layers):
             src_img = self._layer_images[i] if i < len(self._layer_images) else None
-            layers_render.append(
+            layers.append(
                 LayerRenderInput(
                     src_rgba_pil=src_img,
                     visible=layer.visible,
                     blend_mode=layer.blend_mode,
-                    img_scale=layer.img_scale,
-                    img_offset=(layer.img_off_x, layer.img_off_y),
+                    img_scale=layer.img_scale * scale,
+                    img_offset=(layer.img_off_x * scale, layer.img_off_y * scale),
                     rotation_deg=layer.rotation_deg,
                     palette_rgbs=layer.enabled_palette_rgbs(),
                     tolerance=0 if compare_before else layer.tolerance,
@@ -2165,30 +2352,146 @@ class MainWindow(QMainWindow):
                     alpha_paint_mask=self._layer_alpha_masks[i] if i < len(self._layer_alpha_masks) else None,
                 )
             )
+        return layers
+
+    def _preview_scale(self) -> float:
+        # Zoomed out, the canvas shows fewer pixels than the output has. Composite
+        # at the next power of two above the displayed size so zooming only
+        # triggers a rerender when it crosses one of those steps.
+        shown = self.canvas.view_zoom() * self.canvas.devicePixelRatioF()
+        scale = 1.0 if shown >= 1.0 else 2.0 ** math.ceil(math.log2(max(shown, 1e-3)))
+        if self._interacting:
+            # Mid-drag frames are replaced within milliseconds; a quarter of the
+            # pixels keeps them responsive, and release restores full detail.
+            scale = min(scale, _INTERACTIVE_PREVIEW_SCALE)
+        return scale
+
+    def _on_view_zoom_changed(self, _zoom: float) -> None:
+        if self._preview_scale() != self._preview_scale_used:
+            self._schedule_rerender()
+
+    def _begin_interaction(self) -> None:
+        self._interacting = True
+
+    def _end_interaction(self) -> None:
+        self._interacting = False
+        if self._preview_scale() != self._preview_scale_used:
+            self._schedule_rerender()
+
+    def _schedule_rerender(self) -> None:
+        if not self._rerender_timer.isActive():
+            self._rerender_timer.start()
+
+    def _flush_rerender(self) -> None:
+        # Callers that read _preview_arr must not see a render that is still queued.
+        if self._rerender_timer.isActive() or self._render_busy or self._render_again:
+            self._rerender()
 
-        self._preview_img = composite_layers_to_canvas(
-            layers=layers_render,
-            out_size=(self.state.out_w, self.state.out_h),
-            high_quality=self.state.high_quality_resample,
-            nearest_neighbor=self.state.nearest_neighbor,
+    def _render_request(
+        self,
+    ) -> tuple[bool, float, tuple[int, int], tuple[int, int], list[LayerRenderInput], tuple]:
+        compare_before = getattr(self, "compare_chk", None) is not None and self.compare_chk.isChecked()
+        scale = self._preview_scale()
+        out_size = (self.state.out_w, self.state.out_h)
+        preview_size = out_size
+        if scale < 1.0:
+            preview_size = (max(1, int(round(out_size[0] * scale))), max(1, int(round(out_size[1] * scale))))
+        layers_render = self._layer_render_inputs(compare_before, scale)
+
+        key = (
+            preview_size,
+            self.state.high_quality_resample,
+            self.state.nearest_neighbor,
+            self._mask_version,
+            tuple(_render_input_key(layer) for layer in layers_render),
         )
-        qimg = pil_rgba_to_qimage(self._preview_img)
-        self.canvas.set_preview(qimg, (self.state.out_w, self.state.out_h))
+        return compare_before, scale, out_size, preview_size, layers_render, key
+
+    def _cached_render(self, compare_before: bool, key: tuple) -> Optional[np.ndarray]:
+        cached = self._render_cache.get(compare_before)
+        if cached is not None and cached[0] == key:
+            return cached[2]
+        return None
+
+    def _rerender(self) -> None:
+        self._rerender_timer.stop()
+        # Supersedes any composite still running on the worker.
+        self._render_generation += 1
+        compare_before, scale, out_size, preview_size, layers_render, key = self._render_request()
+        preview_arr = self._cached_render(compare_before, key)
+        if preview_arr is None:
+            preview_arr = composite_layers_to_array(
+                layers=layers_render,
+                out_size=preview_size,
+                high_quality=self.state.high_quality_resample,
+                nearest_neighbor=self.state.nearest_neighbor,
+                reducing_gap=_preview_reducing_gap(scale),
+            )
+            self._render_cache[compare_before] = (key, layers_render, preview_arr)
+            self._render_shown = None
+        self._show_render(compare_before, scale, out_size, preview_arr)
+
+    def _rerender_async(self) -> None:
+        if self._render_busy:
+            # Picked up again once the running composite lands.
+            self._render_again = True
+            return
+        compare_before, scale, out_size, preview_size, layers_render, key = self._render_request()
+        preview_arr = self._cached_render(compare_before, key)
+        if preview_arr is not None:
+            self._show_render(compare_before, scale, out_size, preview_arr)
+            return
+        self._render_generation += 1
+        self._render_busy = True
+        self._render_pending = (compare_before, scale, out_size, key, layers_render)
+        self._render_pool.start(
+            _RenderTask(
+                self._render_generation,
+                [_frozen_render_input(layer) for layer in layers_render],
+                preview_size,
+                self.state.high_quality_resample,
+                self.state.nearest_neighbor,
+                _preview_reducing_gap(scale),
+                self._render_signals,
+            )
+        )
+
+    def _on_render_done(self, generation: int, preview_arr: Optional[np.ndarray]) -> None:
+        self._render_busy = False
+        pending = self._render_pending
+        self._render_pending = None
+        if generation == self._render_generation and pending is not None:
+            if preview_arr is None:
+                self._rerender()
+            else:
+                compare_before, scale, out_size, key, layers_render = pending
+                self._render_cache[compare_before] = (key, layers_render, preview_arr)
+                self._render_shown = None
+                self._show_render(compare_before, scale, out_size, preview_arr)
+        if self._render_again:
+            self._render_again = False
+            self._rerender_async()
+
+    def _show_render(
+        self, compare_before: bool, scale: float, out_size: tuple[int, int], preview_arr: np.ndarray
+    ) -> None:
+        if self._render_shown != compare_before:
+            # Both views share the compositor's buffer; nothing is copied here.
+            self._preview_arr = preview_arr
+            qimg = np_rgba_to_qimage(preview_arr)
+            # A reduced preview is stretched over the full output rect by the canvas.
+            self.canvas.set_preview(qimg, out_size)
+            self._render_shown = compare_before
+            self._preview_scale_used = scale
         self.canvas.set_selection_overlay(
             enabled=bool(self.state.selection_enabled and self.state.sel_w > 0 and self.state.sel_h > 0),
             rect_canvas=self._selection_rect_on_output_canvas(),
             invert=bool(self.state.selection_invert),
             lasso_points_canvas=self._lasso_points_on_output_canvas(),
         )
-        self.scale_spin.blockSignals(True)
-        self.scale_spin.setValue(self.state.img_scale * 100.0)
-        self.scale_spin.blockSignals(False)
-        self.pos_x_spin.blockSignals(True)
-        self.pos_y_spin.blockSignals(True)
-        self.pos_x_spin.setValue(self.state.img_off_x)
-        self.pos_y_spin.setValue(self.state.img_off_y)
-        self.pos_x_spin.blockSignals(False)
-        self.pos_y_spin.blockSignals(False)
+        _sync_value(self.scale_spin, self.state.img_scale * 100.0)
+        _sync_value(self.pos_x_spin, self.state.img_off_x)
+        _sync_value(self.pos_y_spin, self.state.img_off_y)
         self._update_undo_redo_actions()
         self._update_status()
 
@@ -1,17 +1,17 @@
 from __future__ import annotations
 from typing import Callable, Tuple, Optional
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QSignalBlocker, Qt
 from PySide6.QtGui import QColor
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, QListWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListView, QListWidget, QListWidgetItem,
     QLabel, QCheckBox, QColorDialog, QMessageBox
 )
 
 class PaletteWidget(QWidget):
     """
     Simple palette list:
-    - Each item stores rgb tuple in Qt.UserRole
+    - Each item stores rgb packed as 0xRRGGBB in Qt.UserRole
     - Has enabled checkbox state in item checkstate
     """
     def __init__(
@@ -25,6 +25,10 @@ class PaletteWidget(QWidget):
         self._on_add_color_request = on_add_color_request
 
         self.listw = QListWidget()
+        # Every row is one checkable line of text, so item geometry never needs
+        # measuring per insert; long palettes are laid out in batches.
+        self.listw.setUniformItemSizes(True)
+        self.listw.setLayoutMode(QListView.Batched)
         self.listw.itemChanged.connect(lambda *_: self._on_changed())
 
         add_btn = QPushButton("Add (Picker)")
@@ -68,12 +72,16 @@ class PaletteWidget(QWidget):
             self._on_changed()
 
     def _clear(self) -> None:
-        self.listw.clear()
+        # Report the whole clear as one change rather than per removed item.
+        with QSignalBlocker(self.listw):
+            self.listw.clear()
         self._on_changed()
 
     def add_color(self, rgb: Tuple[int, int, int]) -> None:
         item = QListWidgetItem(self._fmt(rgb))
-        item.setData(Qt.UserRole, rgb)
+        r, g, b = (int(c) for c in rgb)
+        # A plain int is held as a native variant instead of a wrapped Python tuple.
+        item.setData(Qt.UserRole, (r << 16) | (g << 8) | b)
         item.setFlags(item.flags() | Qt.ItemIsUserCheckable | Qt.ItemIsSelectable | Qt.ItemIsEnabled)
         item.setCheckState(Qt.Checked)
         item.setToolTip("Enabled" if item.checkState() == Qt.Checked else "Disabled")
@@ -83,9 +91,9 @@ class PaletteWidget(QWidget):
         out = []
         for i in range(self.listw.count()):
             it = self.listw.item(i)
-            rgb = it.data(Qt.UserRole)
+            packed = int(it.data(Qt.UserRole))
             enabled = (it.checkState() == Qt.Checked)
-            out.append((rgb, enabled))
+            out.append((((packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF), enabled))
         return out
 
     @staticmethod